@@ -0,0 +1,141 @@
+import logging
+import threading
+from typing import Dict, Optional
+
+import httpx
+from google import genai
+from google.genai import types
+
+from app.config import settings
+from app.utils.metrics import metrics
+
+try:
+    import h2  # noqa: F401  # enables httpx HTTP/2
+except ImportError:  # optional: HTTP/1.1 keep-alive is used instead
+    h2 = None
+
+logger = logging.getLogger(__name__)
+
+_CONNECT_EVENTS = (
+    "connection.connect_tcp.complete",
+    "connection.connect_unix_socket.complete",
+)
+
+
+class GeminiClientPool:
+    """One ``genai.Client`` over a shared, bounded keep-alive connection pool.
+
+    Creation is locked, so concurrent first requests build a single client.
+    Every request carries an httpcore trace hook that counts new
+    connections; requests minus connections is how many reused one.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "",
+        max_connections: int = 8,
+        max_keepalive: int = 4,
+        keepalive_seconds: float = 60.0,
+        http2: bool = True,
+        timeout: float = 30.0,
+    ) -> None:
+        self.api_key = api_key
+        self.base_url = base_url
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_seconds,
+        )
+        self.http2 = http2 and h2 is not None
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._http: Optional[httpx.Client] = None
+        self._client: Optional[genai.Client] = None
+        self.requests = 0
+        self.connections = 0
+
+    def _trace(self, event: str, _info: dict) -> None:
+        if event in _CONNECT_EVENTS:
+            with self._stats_lock:
+                self.connections += 1
+
+    def _on_request(self, request: httpx.Request) -> None:
+        request.extensions["trace"] = self._trace
+        with self._stats_lock:
+            self.requests += 1
+
+    def get(self) -> genai.Client:
+        client = self._client
+        if client is not None:
+            return client
+        with self._lock:
+            if self._client is None:
+                self._http = httpx.Client(
+                    limits=self.limits,
+                    http2=self.http2,
+                    timeout=self.timeout,
+                    event_hooks={"request": [self._on_request]},
+                )
+                self._client = genai.Client(
+                    api_key=self.api_key,
+                    http_options=types.HttpOptions(
+                        base_url=self.base_url or None, httpx_client=self._http
+                    ),
+                )
+            return self._client
+
+    def warm_up(self, model: str) -> bool:
+        """Open a connection (DNS, TLS) with a cheap model lookup."""
+        try:
+            self.get().models.get(model=model)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Gemini warm-up failed", extra={"error": str(exc)})
+            return False
+        return True
+
+    def close(self) -> None:
+        with self._lock:
+            if self._http is not None:
+                self._http.close()
+            self._http = None
+            self._client = None
+
+    def stats(self) -> Dict[str, object]:
+        with self._stats_lock:
+            requests, connections = self.requests, self.connections
+        return {
+            "open": self._client is not None,
+            "http2": self.http2,
+            "requests": requests,
+            "connections_opened": connections,
+            "reused": max(0, requests - connections),
+            "reuse_ratio": (requests - connections) / requests if requests else 0.0,
+        }
+
+
+_pool: Optional[GeminiClientPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_client_pool() -> GeminiClientPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = GeminiClientPool(
+                api_key=settings.gemini_api_key,
+                base_url=settings.gemini_base_url,
+                max_connections=settings.gemini_max_connections,
+                max_keepalive=settings.gemini_keepalive_connections,
+                keepalive_seconds=settings.gemini_keepalive_seconds,
+                http2=settings.gemini_http2,
+                timeout=settings.llm_timeout_seconds,
+            )
+            metrics.register_gauge("gemini_pool", _pool.stats)
+        return _pool
+
+
+def close_client_pool() -> None:
+    if _pool is not None:
+        _pool.close()
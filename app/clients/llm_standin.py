@@ -0,0 +1,72 @@
+"""Local stand-in for the Gemini REST API: ``python -m app.clients.llm_standin``.
+
+Answers ``generateContent`` with a fixed valid triage JSON (and usage
+metadata) after an optional delay, so the client, pool, load shedding and
+replay can be exercised without a key or network. Point the app at it with
+``GEMINI_BASE_URL=http://127.0.0.1:8089/`` and any ``GEMINI_API_KEY``.
+"""
+
+import argparse
+import asyncio
+import json
+
+from fastapi import FastAPI, Request
+
+STANDIN_RESULT = {
+    "category": "Produtivo",
+    "confidence": 0.8,
+    "summary": "Resposta do stand-in local do LLM.",
+    "suggested_reply": "Ola! Recebemos sua mensagem e vamos verificar.",
+    "tags": ["standin", "teste", "local"],
+    "needs_human_review": False,
+    "reasons": ["Resposta fixa do stand-in", "Sem consulta ao Gemini"],
+}
+
+
+def create_app(delay: float = 0.0) -> FastAPI:
+    app = FastAPI(title="LLM stand-in")
+    app.state.calls = 0
+
+    @app.get("/{version}/models/{model}")
+    async def get_model(version: str, model: str) -> dict:
+        return {"name": f"models/{model}", "displayName": model}
+
+    @app.post("/{version}/models/{model_action}")
+    async def generate(version: str, model_action: str, request: Request) -> dict:
+        body = await request.body()
+        app.state.calls += 1
+        if delay:
+            await asyncio.sleep(delay)
+        return {
+            "candidates": [
+                {
+                    "content": {
+                        "role": "model",
+                        "parts": [{"text": json.dumps(STANDIN_RESULT)}],
+                    },
+                    "finishReason": "STOP",
+                }
+            ],
+            "usageMetadata": {
+                "promptTokenCount": max(1, len(body) // 4),
+                "candidatesTokenCount": 60,
+                "totalTokenCount": max(1, len(body) // 4) + 60,
+            },
+        }
+
+    return app
+
+
+def main(argv=None) -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Stand-in local da API do Gemini")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--delay", type=float, default=0.0, help="segundos por chamada")
+    args = parser.parse_args(argv)
+    uvicorn.run(create_app(args.delay), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
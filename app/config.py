@@ -10,18 +10,73 @@ class Settings(BaseSettings):
     app_name: str = "EmailTriageAI"
     gemini_api_key: str = ""
     gemini_model: str = "gemini-1.5-flash"
+    gemini_base_url: str = ""
+    gemini_max_connections: int = 8
+    gemini_keepalive_connections: int = 4
+    gemini_keepalive_seconds: float = 60.0
+    gemini_http2: bool = True
+    gemini_warm_up: bool = False
     max_chars: int = 40000
     max_extracted_chars: int = 40000
     max_file_mb: int = 2
     max_body_mb: int = 3
     max_pdf_pages: int = 10
     pdf_timeout_seconds: float = 4.0
+    pdf_workers: int = 2
+    extraction_cache_mb: int = 16
+    extraction_cache_dir: str = ""
+    extraction_cache_disk_mb: int = 256
+    metrics_enabled: bool = True
+    metrics_token: str = ""
+    feedback_db_path: str = ""
+    feedback_batch_size: int = 50
+    feedback_flush_seconds: float = 1.0
+    online_learning_enabled: bool = False
+    learner_interval_seconds: float = 60.0
+    learner_min_holdout: int = 10
+    learner_min_accuracy: float = 0.8
+    learner_feature_ttl_days: int = 30
+    capture_enabled: bool = False
+    capture_path: str = ""
+    capture_bodies: bool = False
+    capture_sample_rate: float = 1.0
     llm_timeout_seconds: float = 12.0
+    llm_max_concurrency: int = 4
+    llm_daily_token_budget: int = 0
+    llm_price_per_1k_prompt_tokens: float = 0.0
+    llm_price_per_1k_response_tokens: float = 0.0
+    load_shedding_enabled: bool = True
+    shed_latency_seconds: float = 8.0
+    shed_max_in_flight: int = 0
+    shed_window_seconds: float = 10.0
+    long_email_mode_enabled: bool = False
+    long_email_chunk_chars: int = 6000
+    long_email_max_chunks: int = 8
     rate_limit_window_seconds: int = 60
     rate_limit_analyze: int = 10
     rate_limit_api: int = 5
     rate_limit_feedback: int = 30
     baseline_threshold: float = 0.85
+    baseline_thresholds_path: str = ""
+    calibration_precision_target: float = 0.95
+    cascade_tiers: List[str] = []
+    rules_enabled: bool = True
+    rules_path: str = ""
+    thread_mode_enabled: bool = False
+    thread_context_chars: int = 1500
+    analysis_db_path: str = ""
+    history_enabled: bool = True
+    history_batch_size: int = 200
+    history_flush_seconds: float = 2.0
+    results_export_token: str = ""
+    server_workers: int = 0
+    forwarded_allow_ips: str = "127.0.0.1"
+    work_queue_url: str = ""
+    worker_concurrency: int = 0
+    worker_lease_seconds: float = 60.0
+    worker_max_attempts: int = 3
+    worker_retry_seconds: float = 30.0
+    html_gzip_min_bytes: int = 1024
     log_level: str = "INFO"
     allowed_hosts: List[str] = ["localhost", "127.0.0.1", "testserver"]
     cors_allow_origins: List[str] = []
@@ -42,7 +97,9 @@ class Settings(BaseSettings):
         enable_decoding=False,
     )
 
-    @field_validator("allowed_hosts", "cors_allow_origins", mode="before")
+    @field_validator(
+        "allowed_hosts", "cors_allow_origins", "cascade_tiers", mode="before"
+    )
     @classmethod
     def split_csv(cls, value):
         if isinstance(value, str):
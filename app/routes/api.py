@@ -1,5 +1,4 @@
 import logging
-from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Request
 from starlette.datastructures import UploadFile
@@ -12,11 +11,13 @@ from app.security.exceptions import (
     RateLimitError,
     UploadValidationError,
 )
-from app.security.limits import RATE_LIMIT_API, RATE_LIMIT_WINDOW_SECONDS
+from app.security.limits import RATE_LIMIT_API, RATE_LIMIT_WINDOW_SECONDS, get_client_ip
 from app.schemas.triage import TriageResponse
 from app.services.analyzer_service import AnalyzerService
-from app.utils.input_reader import extract_text_from_input
+from app.utils.fast_json import FastJSONResponse
+from app.utils.input_reader import extract_text_from_input, input_type
 from app.utils.rate_limit import RateLimiter
+from app.utils.traffic_capture import annotate_capture
 
 logger = logging.getLogger(__name__)
 
@@ -28,16 +29,11 @@ rate_limiter = RateLimiter(
 )
 
 
-def _get_client_ip(request: Request) -> str:
-    forwarded = request.headers.get("x-forwarded-for")
-    if forwarded:
-        return forwarded.split(",")[0].strip()
-    return request.client.host if request.client else "unknown"
-
-
-@router.post("/api/analyze", response_model=TriageResponse)
-async def analyze_api(request: Request) -> TriageResponse:
-    client_ip = _get_client_ip(request)
+@router.post(
+    "/api/analyze", response_model=TriageResponse, response_class=FastJSONResponse
+)
+async def analyze_api(request: Request) -> FastJSONResponse:
+    client_ip = get_client_ip(request)
     try:
         content_type = request.headers.get("content-type", "")
         if content_type.startswith("application/json"):
@@ -56,15 +52,16 @@ async def analyze_api(request: Request) -> TriageResponse:
         validate_csrf(request, csrf_token)
         if not rate_limiter.allow(client_ip):
             raise RateLimitError()
-        content, _source_file = await extract_text_from_input(file, text_input)
-        analysis = analyzer.analyze(content)
-        return TriageResponse(
-            result=analysis.result,
-            source=analysis.source,
+        content, source_file = await extract_text_from_input(file, text_input)
+        analysis = await analyzer.analyze_async(content, route="api", client=client_ip)
+        annotate_capture(
+            request,
             email_hash=analysis.email_hash,
-            stats=analysis.stats,
-            baseline_prob=analysis.baseline_prob,
+            source=analysis.source,
+            input_type=input_type(source_file),
+            text_chars=len(content),
         )
+        return FastJSONResponse(analysis.to_response())
     except (UploadValidationError, CSRFError, RateLimitError, AppError) as exc:
         raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
     except LLMQuotaError as exc:
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, HTTPException, Request
+
+from app.config import settings
+from app.security.tokens import require_bearer
+from app.utils.metrics import metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def metrics_snapshot(request: Request) -> dict:
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    require_bearer(request, settings.metrics_token)
+    return metrics.snapshot()
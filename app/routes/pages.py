@@ -1,9 +1,9 @@
 import logging
+from pathlib import Path
 from typing import Optional
 
 from fastapi import APIRouter, File, Form, Request, UploadFile
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 
 from app.clients.gemini_client import LLMQuotaError, LLMServiceError
 from app.config import settings
@@ -14,16 +14,29 @@ from app.security.exceptions import (
     RateLimitError,
     UploadValidationError,
 )
-from app.security.limits import RATE_LIMIT_ANALYZE, RATE_LIMIT_WINDOW_SECONDS
+from app.security.limits import (
+    RATE_LIMIT_ANALYZE,
+    RATE_LIMIT_WINDOW_SECONDS,
+    get_client_ip,
+)
 from app.schemas.triage import TriageResponse
 from app.services.analyzer_service import AnalyzerService
-from app.utils.input_reader import extract_text_from_input
+from app.utils.input_reader import extract_text_from_input, input_type
+from app.utils.page_shell import PageShell, create_environment, gzip_body
 from app.utils.rate_limit import RateLimiter
+from app.utils.static_assets import static_url
+from app.utils.traffic_capture import annotate_capture
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
+templates = create_environment(Path(__file__).resolve().parents[1] / "templates")
+templates.globals["static_url"] = static_url
+# Built at import, so the pre-fork master compiles and renders it once.
+page_shell = PageShell(
+    templates,
+    {"max_chars": settings.max_chars, "max_file_mb": settings.max_file_mb},
+)
 analyzer = AnalyzerService()
 rate_limiter = RateLimiter(
     limit=RATE_LIMIT_ANALYZE,
@@ -38,33 +51,26 @@ def _render_page(
     status_code: int = 200,
 ) -> HTMLResponse:
     csrf_token = get_or_create_csrf_token(request)
-    result_payload = result.model_dump() if result else {}
-    response = templates.TemplateResponse(
-        "index.html",
-        {
-            "request": request,
-            "result": result.result if result else None,
-            "result_meta": result if result else None,
-            "result_payload": result_payload,
-            "error": error,
-            "max_chars": settings.max_chars,
-            "max_file_mb": settings.max_file_mb,
-            "csrf_token": csrf_token,
-            "csp_nonce": getattr(request.state, "csp_nonce", ""),
-        },
-        status_code=status_code,
-    )
+    body = page_shell.render(
+        csrf_token,
+        getattr(request.state, "csp_nonce", ""),
+        error=error,
+        result=result,
+    ).encode("utf-8")
+    headers = {}
+    # A page with a result mixes the CSRF token with text derived from user
+    # input; it is left uncompressed so it cannot serve as a BREACH oracle.
+    if result is None:
+        body, headers = gzip_body(
+            body,
+            request.headers.get("accept-encoding", ""),
+            settings.html_gzip_min_bytes,
+        )
+    response = HTMLResponse(body, status_code=status_code, headers=headers)
     set_csrf_cookie(response, csrf_token)
     return response
 
 
-def _get_client_ip(request: Request) -> str:
-    forwarded = request.headers.get("x-forwarded-for")
-    if forwarded:
-        return forwarded.split(",")[0].strip()
-    return request.client.host if request.client else "unknown"
-
-
 @router.get("/", response_class=HTMLResponse)
 async def index(request: Request) -> HTMLResponse:
     return _render_page(request)
@@ -77,20 +83,21 @@ async def analyze(
     text_input: Optional[str] = Form(default=None),
     file: Optional[UploadFile] = File(default=None),
 ) -> HTMLResponse:
-    client_ip = _get_client_ip(request)
+    client_ip = get_client_ip(request)
     try:
         validate_csrf(request, csrf_token)
         if not rate_limiter.allow(client_ip):
             raise RateLimitError()
-        content, _source_file = await extract_text_from_input(file, text_input)
-        analysis = analyzer.analyze(content)
-        result = TriageResponse(
-            result=analysis.result,
-            source=analysis.source,
+        content, source_file = await extract_text_from_input(file, text_input)
+        analysis = await analyzer.analyze_async(content, route="page", client=client_ip)
+        annotate_capture(
+            request,
             email_hash=analysis.email_hash,
-            stats=analysis.stats,
-            baseline_prob=analysis.baseline_prob,
+            source=analysis.source,
+            input_type=input_type(source_file),
+            text_chars=len(content),
         )
+        result = analysis.to_response()
         return _render_page(request, result=result)
     except (UploadValidationError, CSRFError, RateLimitError, AppError) as exc:
         return _render_page(request, error=exc.detail, status_code=exc.status_code)
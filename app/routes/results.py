@@ -0,0 +1,118 @@
+import csv
+import io
+import json
+from typing import Iterator, Literal, Optional
+
+import anyio
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+
+from app.config import settings
+from app.security.exceptions import RateLimitError
+from app.security.limits import RATE_LIMIT_API, RATE_LIMIT_WINDOW_SECONDS, get_client_ip
+from app.security.tokens import require_bearer
+from app.services.analysis_store import (
+    EXPORT_PAGE_SIZE,
+    RECORD_COLUMNS,
+    AnalysisRecord,
+    get_analysis_store,
+)
+from app.utils.rate_limit import RateLimiter
+
+router = APIRouter()
+rate_limiter = RateLimiter(
+    limit=RATE_LIMIT_API,
+    window_seconds=RATE_LIMIT_WINDOW_SECONDS,
+)
+
+_META_COLUMNS = ["id", *(name for name in RECORD_COLUMNS if name != "result")]
+
+
+def _jsonl_line(record_id: int, record: AnalysisRecord) -> str:
+    meta = {"id": record_id}
+    for name in _META_COLUMNS[1:]:
+        meta[name] = getattr(record, name)
+    # The stored result is already JSON; splice it in instead of re-parsing.
+    return (
+        json.dumps(meta, ensure_ascii=False)[:-1] + f', "result": {record.result}}}\n'
+    )
+
+
+def _jsonl(records) -> Iterator[str]:
+    for record_id, record in records:
+        yield _jsonl_line(record_id, record)
+
+
+def _csv(records) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([*_META_COLUMNS, "result"])
+    rows = 1
+    for record_id, record in records:
+        writer.writerow(
+            [
+                record_id,
+                *(getattr(record, name) for name in _META_COLUMNS[1:]),
+                record.result,
+            ]
+        )
+        rows += 1
+        if rows >= EXPORT_PAGE_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+    yield buffer.getvalue()
+
+
+@router.get("/api/results/export")
+async def export_results(
+    request: Request,
+    format: Literal["jsonl", "csv"] = "jsonl",
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    category: Optional[str] = None,
+    source: Optional[str] = None,
+) -> StreamingResponse:
+    require_bearer(request, settings.results_export_token)
+    records = get_analysis_store().iter_records(
+        since=since, until=until, category=category, source=source
+    )
+    if format == "csv":
+        body, media_type = _csv(records), "text/csv; charset=utf-8"
+    else:
+        body, media_type = _jsonl(records), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={
+            "Cache-Control": "no-store",
+            "Content-Disposition": f'attachment; filename="analyses.{format}"',
+        },
+    )
+
+
+@router.get("/api/results/{email_hash}")
+async def result_by_hash(request: Request, email_hash: str) -> Response:
+    try:
+        if not rate_limiter.allow(get_client_ip(request)):
+            raise RateLimitError()
+    except RateLimitError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
+    # Email hashes are unsalted SHA-256, so anyone holding an email could
+    # read its analysis; same token as the export.
+    require_bearer(request, settings.results_export_token)
+
+    found = await anyio.to_thread.run_sync(get_analysis_store().latest, email_hash)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Resultado nao encontrado.")
+    record_id, record = found
+    # Rows are append-only, so the row id identifies this exact version.
+    headers = {"ETag": f'"{record_id}"', "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(
+        _jsonl_line(record_id, record).rstrip("\n"),
+        media_type="application/json",
+        headers=headers,
+    )
@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from typing import Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator
@@ -39,6 +40,47 @@ class EmailTriageResult(BaseModel):
         return cleaned
 
 
+@dataclass(frozen=True, slots=True)
+class TriageResult:
+    """Validated ``EmailTriageResult`` held without pydantic's per-instance state.
+
+    Analyses kept in memory (batches, jobs, single-flight waiters) carry this
+    instead of the model; ``to_model`` rebuilds it at the HTTP boundary
+    without validating again.
+    """
+
+    category: str
+    confidence: float
+    summary: str
+    suggested_reply: str
+    tags: List[str]
+    needs_human_review: bool
+    reasons: List[str]
+
+    @classmethod
+    def from_model(cls, model: EmailTriageResult) -> "TriageResult":
+        return cls(
+            model.category,
+            model.confidence,
+            model.summary,
+            model.suggested_reply,
+            model.tags,
+            model.needs_human_review,
+            model.reasons,
+        )
+
+    def to_model(self) -> EmailTriageResult:
+        return EmailTriageResult.model_construct(
+            category=self.category,
+            confidence=self.confidence,
+            summary=self.summary,
+            suggested_reply=self.suggested_reply,
+            tags=list(self.tags),
+            needs_human_review=self.needs_human_review,
+            reasons=list(self.reasons),
+        )
+
+
 class TriageResponse(BaseModel):
     result: EmailTriageResult
     source: str
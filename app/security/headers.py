@@ -1,89 +1,133 @@
 import secrets
-from typing import Callable, Dict
+from typing import Optional, Tuple
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import URL
 from starlette.responses import JSONResponse, PlainTextResponse, RedirectResponse
 
-from app.config import settings
 from app.security.exceptions import PayloadTooLargeError
 
 
-def _header_map(scope) -> Dict[str, str]:
-    return {
-        key.decode("latin-1"): value.decode("latin-1")
-        for key, value in scope.get("headers", [])
-    }
+def _header(scope, name: bytes) -> Optional[bytes]:
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value
+    return None
 
 
-def _is_https_request(request: Request) -> bool:
-    forwarded_proto = request.headers.get("x-forwarded-proto")
+def _is_https(scope) -> bool:
+    forwarded_proto = _header(scope, b"x-forwarded-proto")
     if forwarded_proto:
-        return forwarded_proto.split(",")[0].strip().lower() == "https"
-    return request.url.scheme == "https"
+        return forwarded_proto.split(b",")[0].strip().lower() == b"https"
+    return scope.get("scheme") == "https"
 
 
 def _wants_json(scope) -> bool:
     path = scope.get("path", "")
     if path.startswith("/api"):
         return True
-    headers = _header_map(scope)
-    return "application/json" in headers.get("accept", "")
-
-
-class HTTPSRedirectMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, enabled: bool) -> None:
-        super().__init__(app)
-        self.enabled = enabled
-
-    async def dispatch(self, request: Request, call_next: Callable):
-        if not self.enabled or _is_https_request(request):
-            return await call_next(request)
-        url = request.url.replace(scheme="https")
-        return RedirectResponse(url)
-
-
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app) -> None:
-        super().__init__(app)
-
-    def _build_csp(self, nonce: str) -> str:
-        return (
-            "default-src 'self'; "
-            f"script-src 'self' 'nonce-{nonce}'; "
-            "script-src-attr 'none'; "
-            "style-src 'self' https://fonts.googleapis.com; "
-            "font-src 'self' https://fonts.gstatic.com; "
-            "img-src 'self' data:; "
-            "connect-src 'self'; "
-            "object-src 'none'; "
-            "base-uri 'self'; "
-            "form-action 'self'; "
-            "frame-ancestors 'none'"
+    return b"application/json" in (_header(scope, b"accept") or b"")
+
+
+_CSP_PREFIX = b"default-src 'self'; script-src 'self' 'nonce-"
+_CSP_SUFFIX = (
+    b"'; "
+    b"script-src-attr 'none'; "
+    b"style-src 'self' https://fonts.googleapis.com; "
+    b"font-src 'self' https://fonts.gstatic.com; "
+    b"img-src 'self' data:; "
+    b"connect-src 'self'; "
+    b"object-src 'none'; "
+    b"base-uri 'self'; "
+    b"form-action 'self'; "
+    b"frame-ancestors 'none'"
+)
+_STATIC_HEADERS = [
+    (b"x-frame-options", b"DENY"),
+    (b"x-content-type-options", b"nosniff"),
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+    (b"permissions-policy", b"camera=(), microphone=(), geolocation=()"),
+    (b"cross-origin-opener-policy", b"same-origin"),
+    (b"cross-origin-resource-policy", b"same-origin"),
+    (b"cache-control", b"no-store"),
+    (b"pragma", b"no-cache"),
+    (b"expires", b"0"),
+]
+_CACHE_HEADERS = {b"cache-control", b"pragma", b"expires"}
+
+
+class SecurityMiddleware:
+    """HTTPS redirect plus security headers as a single pure-ASGI layer.
+
+    Header names and values are encoded once at construction; per request
+    only the CSP nonce is formatted. Headers set here replace any the
+    response already carries, as before, except that successful responses
+    under ``cacheable_prefixes`` keep their own caching headers; errors there
+    still get ``no-store``.
+    """
+
+    def __init__(
+        self,
+        app,
+        https_redirect: bool = False,
+        hsts: bool = False,
+        hsts_max_age: int = 31_536_000,
+        cacheable_prefixes: Tuple[str, ...] = (),
+    ) -> None:
+        self.app = app
+        self.https_redirect = https_redirect
+        self.headers = list(_STATIC_HEADERS)
+        self.hsts_header = (
+            b"strict-transport-security",
+            b"max-age=%d; includeSubDomains" % hsts_max_age,
         )
+        self.hsts = hsts
+        self.overridden = {name for name, _ in self.headers} | {
+            b"content-security-policy",
+            self.hsts_header[0],
+        }
+        self.cacheable_prefixes = cacheable_prefixes
+        self.cacheable_headers = [
+            header for header in self.headers if header[0] not in _CACHE_HEADERS
+        ]
+        self.cacheable_overridden = self.overridden - _CACHE_HEADERS
 
-    async def dispatch(self, request: Request, call_next: Callable):
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        https = _is_https(scope)
         nonce = secrets.token_urlsafe(16)
-        request.state.csp_nonce = nonce
-        response = await call_next(request)
-
-        response.headers["Content-Security-Policy"] = self._build_csp(nonce)
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["Permissions-Policy"] = (
-            "camera=(), microphone=(), geolocation=()"
+        scope.setdefault("state", {})["csp_nonce"] = nonce
+        cacheable = bool(self.cacheable_prefixes) and scope["path"].startswith(
+            self.cacheable_prefixes
         )
-        response.headers["Cross-Origin-Opener-Policy"] = "same-origin"
-        response.headers["Cross-Origin-Resource-Policy"] = "same-origin"
-        response.headers["Cache-Control"] = "no-store"
-        response.headers["Pragma"] = "no-cache"
-        response.headers["Expires"] = "0"
-        if settings.hsts_enabled and _is_https_request(request):
-            response.headers["Strict-Transport-Security"] = (
-                f"max-age={settings.hsts_max_age}; includeSubDomains"
-            )
-        return response
+        extra = [
+            (b"content-security-policy", _CSP_PREFIX + nonce.encode() + _CSP_SUFFIX),
+        ]
+        if self.hsts and https:
+            extra.append(self.hsts_header)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                if cacheable and message["status"] < 400:
+                    own, overridden = self.cacheable_headers, self.cacheable_overridden
+                else:
+                    own, overridden = self.headers, self.overridden
+                headers = [
+                    header
+                    for header in message.get("headers", [])
+                    if header[0].lower() not in overridden
+                ]
+                headers.extend(own)
+                headers.extend(extra)
+                message["headers"] = headers
+            await send(message)
+
+        if self.https_redirect and not https:
+            url = URL(scope=scope).replace(scheme="https")
+            await RedirectResponse(str(url))(scope, receive, send_wrapper)
+            return
+        await self.app(scope, receive, send_wrapper)
 
 
 class BodySizeLimitMiddleware:
@@ -95,8 +139,7 @@ class BodySizeLimitMiddleware:
         if scope["type"] != "http":
             await self.app(scope, receive, send)
             return
-        headers = _header_map(scope)
-        content_length = headers.get("content-length")
+        content_length = _header(scope, b"content-length")
         if content_length:
             try:
                 if int(content_length) > self.max_body_bytes:
@@ -1,3 +1,5 @@
+from starlette.requests import Request
+
 from app.config import settings
 
 ALLOWED_EXTENSIONS = {".txt", ".pdf"}
@@ -14,3 +16,9 @@ RATE_LIMIT_WINDOW_SECONDS = settings.rate_limit_window_seconds
 RATE_LIMIT_ANALYZE = settings.rate_limit_analyze
 RATE_LIMIT_API = settings.rate_limit_api
 RATE_LIMIT_FEEDBACK = settings.rate_limit_feedback
+
+
+def get_client_ip(request: Request) -> str:
+    # uvicorn already replaced the peer with X-Forwarded-For when it came
+    # from a trusted proxy (FORWARDED_ALLOW_IPS); the raw header is not.
+    return request.client.host if request.client else "unknown"
@@ -0,0 +1,18 @@
+import secrets
+
+from fastapi import HTTPException, Request
+
+
+def require_bearer(request: Request, expected: str) -> None:
+    """Check ``Authorization: Bearer <expected>``.
+
+    An empty ``expected`` means the route is not configured: it answers 404
+    as if it did not exist.
+    """
+    if not expected:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(
+        token.strip().encode(), expected.encode()
+    ):
+        raise HTTPException(status_code=401, detail="Nao autorizado.")
@@ -1,10 +1,15 @@
+import codecs
+import hashlib
+import io
+import mmap
 import re
 from pathlib import Path
-from typing import Tuple
+from typing import Optional, Tuple
 
 import anyio
 from fastapi import UploadFile
 
+from app.config import settings
 from app.security.exceptions import PayloadTooLargeError, UploadValidationError
 from app.security.limits import (
     ALLOWED_EXTENSIONS,
@@ -14,7 +19,10 @@ from app.security.limits import (
     MAX_TEXT_CHARS,
     PDF_TIMEOUT_SECONDS,
 )
-from app.utils.pdf_reader import read_pdf
+from app.utils.extraction_cache import ExtractionCache
+from app.utils.metrics import metrics
+from app.utils.pdf_pool import get_pdf_pool
+from app.utils.pdf_reader import PdfTextLimitError
 
 SUSPICIOUS_SUFFIXES = {
     ".exe",
@@ -29,6 +37,33 @@ SUSPICIOUS_SUFFIXES = {
     ".scr",
 }
 TEXT_PRINTABLE_RATIO = 0.9
+READ_CHUNK_BYTES = 64 * 1024
+_ALLOWED_CONTROL = str.maketrans("", "", "\n\r\t")
+
+extraction_cache = ExtractionCache(
+    max_bytes=settings.extraction_cache_mb * 1024 * 1024,
+    directory=(
+        Path(settings.extraction_cache_dir) if settings.extraction_cache_dir else None
+    ),
+    max_disk_bytes=settings.extraction_cache_disk_mb * 1024 * 1024,
+)
+metrics.register_gauge("extraction_cache", extraction_cache.stats)
+
+
+class UploadBuffer:
+    """Read-only view over an uploaded file, backed by the spooled upload."""
+
+    def __init__(self, view: memoryview, mapped: Optional[mmap.mmap] = None) -> None:
+        self.view = view
+        self._mapped = mapped
+
+    def __len__(self) -> int:
+        return len(self.view)
+
+    def close(self) -> None:
+        self.view.release()
+        if self._mapped is not None:
+            self._mapped.close()
 
 
 def _normalize_filename(filename: str) -> str:
@@ -47,27 +82,59 @@ def _normalize_filename(filename: str) -> str:
     return name
 
 
-def _is_pdf_magic(file_bytes: bytes) -> bool:
-    head = file_bytes[:1024].lstrip()
+def _is_pdf_magic(file_bytes) -> bool:
+    head = bytes(file_bytes[:1024]).lstrip()
     return head.startswith(b"%PDF-")
 
 
-def _decode_text(file_bytes: bytes) -> str:
-    if b"\x00" in file_bytes:
+def _count_non_printable(text: str) -> int:
+    if text.translate(_ALLOWED_CONTROL).isprintable():
+        return 0
+    return sum(not (ch.isprintable() or ch in "\n\r\t") for ch in text)
+
+
+def _decode_with(file_bytes, encoding: str) -> str:
+    decoder = codecs.getincrementaldecoder(encoding)()
+    # chars <= bytes, so this many non-printable chars already fails the ratio.
+    max_non_printable = (1 - TEXT_PRINTABLE_RATIO) * len(file_bytes)
+    non_printable = 0
+    decoded = 0
+    visible = 0
+    counted = 0
+    parts = []
+    for offset in range(0, len(file_bytes), READ_CHUNK_BYTES):
+        part = decoder.decode(file_bytes[offset : offset + READ_CHUNK_BYTES])
+        if "\x00" in part:
+            raise UploadValidationError("Arquivo de texto invalido.")
+        non_printable += _count_non_printable(part)
+        if non_printable > max_non_printable:
+            raise UploadValidationError("Arquivo de texto invalido.")
+        parts.append(part)
+        decoded += len(part)
+        if decoded > MAX_EXTRACTED_CHARS:
+            # Collapsing whitespace never drops visible chars, so their count
+            # is a lower bound for the final length.
+            visible += sum(
+                len(word) for chunk in parts[counted:] for word in chunk.split()
+            )
+            counted = len(parts)
+            if visible > MAX_EXTRACTED_CHARS:
+                raise UploadValidationError("Texto maior que o limite permitido.")
+    parts.append(decoder.decode(b"", final=True))
+    text = "".join(parts)
+    if non_printable / max(1, len(text)) > 1 - TEXT_PRINTABLE_RATIO:
         raise UploadValidationError("Arquivo de texto invalido.")
-    last_error = None
-    for encoding in ("utf-8", "latin-1"):
-        try:
-            text = file_bytes.decode(encoding)
-            break
-        except UnicodeDecodeError as exc:
-            last_error = exc
-            text = ""
+    return text
+
+
+def _decode_text(file_bytes) -> str:
+    try:
+        text = _decode_with(file_bytes, "utf-8")
+    except UnicodeDecodeError as exc:
+        text = _decode_with(file_bytes, "latin-1")
+        if not text:
+            raise UploadValidationError("Arquivo de texto invalido.") from exc
     if not text:
-        raise UploadValidationError("Arquivo de texto invalido.") from last_error
-    printable = sum(ch.isprintable() or ch in "\n\r\t" for ch in text)
-    ratio = printable / max(1, len(text))
-    if ratio < TEXT_PRINTABLE_RATIO:
         raise UploadValidationError("Arquivo de texto invalido.")
     return text
 
@@ -81,44 +148,98 @@ def validate_text_input(text_input: str) -> str:
     return cleaned
 
 
-async def _read_upload_bytes(file: UploadFile) -> bytes:
-    buffer = bytearray()
+def _spooled_buffer(raw) -> Optional[UploadBuffer]:
+    # SpooledTemporaryFile keeps small uploads in a BytesIO and rolls larger
+    # ones over to a real temp file; calling fileno() on it would force that.
+    inner = getattr(raw, "_file", raw)
+    if isinstance(inner, io.BytesIO):
+        return UploadBuffer(inner.getbuffer())
+    try:
+        fileno = inner.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+    inner.flush()
+    if inner.seek(0, io.SEEK_END) == 0:
+        return UploadBuffer(memoryview(b""))
+    mapped = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    return UploadBuffer(memoryview(mapped), mapped)
+
+
+async def _read_upload_bytes(file: UploadFile) -> UploadBuffer:
+    if file.size is not None and file.size > MAX_FILE_BYTES:
+        raise PayloadTooLargeError("Arquivo maior que o limite permitido.")
+    buffer = _spooled_buffer(file.file)
+    if buffer is not None:
+        if len(buffer) > MAX_FILE_BYTES:
+            buffer.close()
+            raise PayloadTooLargeError("Arquivo maior que o limite permitido.")
+        return buffer
+
+    streamed = bytearray()
     while True:
-        chunk = await file.read(64 * 1024)
+        chunk = await file.read(READ_CHUNK_BYTES)
         if not chunk:
             break
-        buffer.extend(chunk)
-        if len(buffer) > MAX_FILE_BYTES:
+        streamed.extend(chunk)
+        if len(streamed) > MAX_FILE_BYTES:
             raise PayloadTooLargeError("Arquivo maior que o limite permitido.")
-    return bytes(buffer)
+    return UploadBuffer(memoryview(streamed))
 
 
-async def _read_pdf_with_timeout(file_bytes: bytes) -> str:
-    async with anyio.fail_after(PDF_TIMEOUT_SECONDS):
-        return await anyio.to_thread.run_sync(read_pdf, file_bytes, MAX_PDF_PAGES)
+async def _read_pdf_with_timeout(file_bytes) -> str:
+    extraction = await anyio.to_thread.run_sync(
+        get_pdf_pool().extract,
+        file_bytes,
+        MAX_PDF_PAGES,
+        MAX_EXTRACTED_CHARS,
+        PDF_TIMEOUT_SECONDS,
+    )
+    return extraction.text
 
 
 async def extract_text_from_upload(file: UploadFile) -> Tuple[str, str]:
     filename = _normalize_filename(file.filename or "")
-    file_bytes = await _read_upload_bytes(file)
-
-    if filename.lower().endswith(".pdf"):
-        if not _is_pdf_magic(file_bytes):
-            raise UploadValidationError("PDF invalido.")
-        try:
-            text = await _read_pdf_with_timeout(file_bytes)
-        except TimeoutError as exc:
-            raise UploadValidationError("Tempo excedido ao ler PDF.") from exc
-        except Exception as exc:  # noqa: BLE001
-            raise UploadValidationError("PDF invalido.") from exc
-    else:
-        if _is_pdf_magic(file_bytes):
-            raise UploadValidationError("Arquivo parece PDF, mas extensao nao confere.")
-        text = _decode_text(file_bytes)
+    buffer = await _read_upload_bytes(file)
+    try:
+        if filename.lower().endswith(".pdf"):
+            text = await _extract_pdf_text(buffer.view)
+        else:
+            text = _normalize_text(_extract_plain_text(buffer.view))
+    finally:
+        buffer.close()
+    return text, filename
 
+
+def _normalize_text(text: str) -> str:
     text = re.sub(r"\s+", " ", text).strip()
     if not text:
         raise UploadValidationError("Conteudo vazio.")
     if len(text) > MAX_EXTRACTED_CHARS:
         raise UploadValidationError("Texto maior que o limite permitido.")
-    return text, filename
+    return text
+
+
+async def _extract_pdf_text(file_bytes: memoryview) -> str:
+    if not _is_pdf_magic(file_bytes):
+        raise UploadValidationError("PDF invalido.")
+    digest = hashlib.sha256(file_bytes).hexdigest()
+    cached = extraction_cache.get(digest, len(file_bytes))
+    if cached is not None:
+        return cached
+    try:
+        text = await _read_pdf_with_timeout(file_bytes)
+    except TimeoutError as exc:
+        raise UploadValidationError("Tempo excedido ao ler PDF.") from exc
+    except PdfTextLimitError as exc:
+        raise UploadValidationError("Texto maior que o limite permitido.") from exc
+    except Exception as exc:  # noqa: BLE001
+        raise UploadValidationError("PDF invalido.") from exc
+    text = _normalize_text(text)
+    extraction_cache.put(digest, text)
+    return text
+
+
+def _extract_plain_text(file_bytes: memoryview) -> str:
+    if _is_pdf_magic(file_bytes):
+        raise UploadValidationError("Arquivo parece PDF, mas extensao nao confere.")
+    return _decode_text(file_bytes)
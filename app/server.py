@@ -0,0 +1,260 @@
+"""Pre-fork production entrypoint: ``python -m app.server``.
+
+The master imports the app (baseline model, NLTK corpora, templates), then
+freezes the GC so those objects are never touched by a collection in the
+workers and their pages stay shared copy-on-write after ``fork``. Workers
+serve the socket the master bound; dead workers are replaced.
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List
+
+import uvicorn
+
+from app.config import settings
+
+logger = logging.getLogger("app.server")
+
+SMAPS_FIELDS = (
+    "Rss",
+    "Pss",
+    "Shared_Clean",
+    "Shared_Dirty",
+    "Private_Clean",
+    "Private_Dirty",
+)
+
+# A worker that dies this soon after its fork counts as a quick exit; that
+# many in a row means it can't start (bad config, port, import) and the
+# master gives up instead of fork-looping.
+QUICK_EXIT_SECONDS = 10.0
+MAX_QUICK_EXITS = 5
+MAX_RESPAWN_DELAY = 30.0
+
+
+def default_workers() -> int:
+    if settings.server_workers > 0:
+        return settings.server_workers
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:  # not Linux
+        return max(1, os.cpu_count() or 1)
+
+
+def parse_smaps_rollup(text: str) -> Dict[str, int]:
+    usage: Dict[str, int] = {}
+    for line in text.splitlines():
+        key, _, rest = line.partition(":")
+        if key in SMAPS_FIELDS:
+            usage[key] = int(rest.split()[0]) * 1024
+    return usage
+
+
+def respawn_delay(quick_exits: int) -> float:
+    """Seconds to wait before replacing a worker: 0, then 0.5s doubling."""
+    if quick_exits <= 0:
+        return 0.0
+    return min(MAX_RESPAWN_DELAY, 0.5 * 2 ** (quick_exits - 1))
+
+
+def memory_usage(pid: int) -> Dict[str, int]:
+    """RSS, PSS, shared and private bytes from /proc (empty off Linux)."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", encoding="ascii") as handle:
+            usage = parse_smaps_rollup(handle.read())
+    except OSError:
+        return {}
+    return {
+        "rss": usage.get("Rss", 0),
+        "pss": usage.get("Pss", 0),
+        "shared": usage.get("Shared_Clean", 0) + usage.get("Shared_Dirty", 0),
+        "private": usage.get("Private_Clean", 0) + usage.get("Private_Dirty", 0),
+    }
+
+
+def _preload():
+    from main import app  # importing main loads the baseline and templates
+
+    try:
+        from app.utils.preprocessing import preprocess_text
+
+        preprocess_text("Aquecimento dos corpora do NLTK.")
+    except (LookupError, OSError) as exc:
+        logger.warning("NLTK preload failed", extra={"error": str(exc)})
+    return app
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _serve_worker(app, sock: socket.socket) -> None:
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    gc.enable()
+
+    from app.utils.metrics import metrics
+
+    metrics.register_gauge("process_memory", lambda: memory_usage(os.getpid()))
+    config = uvicorn.Config(
+        app,
+        lifespan="on",
+        log_level=settings.log_level.lower(),
+        proxy_headers=True,
+        forwarded_allow_ips=settings.forwarded_allow_ips,
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class Master:
+    def __init__(self, app, sock: socket.socket, workers: int) -> None:
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.children: List[int] = []
+        self.spawned_at: Dict[int, float] = {}
+        self.respawn_at: List[float] = []
+        self.quick_exits = 0
+        self.stopping = False
+        self.failed = False
+
+    def spawn(self) -> int:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _serve_worker(self.app, self.sock)
+            except BaseException:  # noqa: BLE001
+                logger.exception("Worker crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        self.children.append(pid)
+        self.spawned_at[pid] = time.monotonic()
+        return pid
+
+    def reaped(self, pid: int, status: int, now: float) -> None:
+        """Forget a dead worker and schedule its replacement."""
+        self.children.remove(pid)
+        started = self.spawned_at.pop(pid, now)
+        if self.stopping:
+            return
+        if now - started < QUICK_EXIT_SECONDS:
+            self.quick_exits += 1
+        else:
+            self.quick_exits = 0
+        if self.quick_exits >= MAX_QUICK_EXITS:
+            logger.error(
+                "Workers exited %d times in a row right after starting; giving up",
+                self.quick_exits,
+            )
+            self.failed = True
+            self.stop()
+            return
+        delay = respawn_delay(self.quick_exits)
+        logger.warning(
+            "Worker %d exited (status %d), restarting in %.1fs", pid, status, delay
+        )
+        self.respawn_at.append(now + delay)
+
+    def report_memory(self) -> None:
+        master = memory_usage(os.getpid())
+        if not master:
+            logger.info("Per-worker memory report unavailable on this platform")
+            return
+        logger.info("Master memory %s", _format_usage(master))
+        for pid in self.children:
+            logger.info("Worker %d memory %s", pid, _format_usage(memory_usage(pid)))
+
+    def stop(self, *_args) -> None:
+        self.stopping = True
+        for pid in self.children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self, report_after: float) -> None:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for _ in range(self.workers):
+            self.spawn()
+        logger.info("Started %d workers: %s", self.workers, self.children)
+
+        report_at = time.monotonic() + report_after
+        while self.children or (self.respawn_at and not self.stopping):
+            pid = status = 0
+            if self.children:
+                try:
+                    pid, status = os.waitpid(-1, os.WNOHANG)
+                except ChildProcessError:
+                    break
+            now = time.monotonic()
+            if pid:
+                self.reaped(pid, status, now)
+                continue
+            for due in [at for at in self.respawn_at if at <= now]:
+                self.respawn_at.remove(due)
+                self.spawn()
+            if report_at and time.monotonic() >= report_at:
+                self.report_memory()
+                report_at = 0.0
+            time.sleep(0.2)
+        self.sock.close()
+
+
+def _format_usage(usage: Dict[str, int]) -> str:
+    return " ".join(
+        f"{key}={value / (1024 * 1024):.1f}MB" for key, value in usage.items()
+    )
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Servidor pre-fork do EmailTriageAI")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument(
+        "--report-after",
+        type=float,
+        default=5.0,
+        help="segundos apos o start para registrar a memoria por worker",
+    )
+    args = parser.parse_args(argv)
+
+    if not hasattr(os, "fork"):
+        uvicorn.run("main:app", host=args.host, port=args.port)
+        return
+
+    # No collection may run between import and fork, or it would dirty the
+    # pages the workers are meant to share.
+    gc.disable()
+    app = _preload()
+    gc.collect()
+    gc.freeze()
+    sock = _bind(args.host, args.port)
+    logger.info(
+        "Preloaded app in master %d; %d objects frozen",
+        os.getpid(),
+        gc.get_freeze_count(),
+    )
+    master = Master(app, sock, max(1, args.workers))
+    master.run(args.report_after)
+    sys.exit(1 if master.failed else 0)
+
+
+if __name__ == "__main__":
+    main()
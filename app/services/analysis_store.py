@@ -0,0 +1,238 @@
+import sqlite3
+from contextlib import closing
+from dataclasses import astuple, dataclass, fields
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.config import settings
+from app.schemas.triage import EmailTriageResult
+from app.services.feedback_store import BufferedWriter
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS message_analyses (
+    message_hash TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    source TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    email_hash TEXT NOT NULL,
+    category TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    source TEXT NOT NULL,
+    needs_human_review INTEGER NOT NULL,
+    baseline_prob REAL,
+    result TEXT NOT NULL,
+    llm_calls INTEGER NOT NULL DEFAULT 0,
+    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+    response_tokens INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_email_hash ON analyses (email_hash);
+CREATE INDEX IF NOT EXISTS idx_analyses_timestamp ON analyses (timestamp);
+CREATE INDEX IF NOT EXISTS idx_analyses_category ON analyses (category);
+CREATE INDEX IF NOT EXISTS idx_analyses_source ON analyses (source);
+"""
+
+EXPORT_PAGE_SIZE = 1000
+
+
+@dataclass
+class AnalysisRecord:
+    timestamp: str
+    email_hash: str
+    category: str
+    confidence: float
+    source: str
+    needs_human_review: bool
+    baseline_prob: Optional[float]
+    # EmailTriageResult as JSON, stored and exported without re-parsing.
+    result: str
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    response_tokens: int = 0
+
+    @classmethod
+    def from_output(cls, output) -> "AnalysisRecord":
+        return cls(
+            timestamp=datetime.utcnow().isoformat(),
+            email_hash=output.email_hash,
+            category=output.result.category,
+            confidence=output.result.confidence,
+            source=output.source,
+            needs_human_review=output.result.needs_human_review,
+            baseline_prob=output.baseline_prob,
+            result=output.result.to_model().model_dump_json(),
+            llm_calls=output.usage.calls,
+            prompt_tokens=output.usage.prompt_tokens,
+            response_tokens=output.usage.response_tokens,
+        )
+
+
+RECORD_COLUMNS = [field.name for field in fields(AnalysisRecord)]
+_SELECT_RECORD = "SELECT id, " + ", ".join(RECORD_COLUMNS) + " FROM analyses"
+
+
+def _record(row: tuple) -> Tuple[int, AnalysisRecord]:
+    record = AnalysisRecord(*row[1:])
+    record.needs_human_review = bool(record.needs_human_review)
+    return row[0], record
+
+
+# Columns added after the analyses table first shipped.
+_ADDED_COLUMNS = {
+    "llm_calls": "INTEGER NOT NULL DEFAULT 0",
+    "prompt_tokens": "INTEGER NOT NULL DEFAULT 0",
+    "response_tokens": "INTEGER NOT NULL DEFAULT 0",
+}
+
+
+def _add_missing_columns(conn: sqlite3.Connection) -> None:
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(analyses)")}
+    for name, definition in _ADDED_COLUMNS.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE analyses ADD COLUMN {name} {definition}")
+
+
+class AnalysisStore:
+    """SQLite (WAL) analysis history plus per-message results for threads."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            _add_missing_columns(conn)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout=10000")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def get_messages(
+        self, message_hashes: List[str]
+    ) -> Dict[str, Tuple[EmailTriageResult, str]]:
+        if not message_hashes:
+            return {}
+        placeholders = ",".join("?" * len(message_hashes))
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT message_hash, result, source FROM message_analyses "
+                f"WHERE message_hash IN ({placeholders})",
+                message_hashes,
+            ).fetchall()
+        return {
+            message_hash: (EmailTriageResult.model_validate_json(result), source)
+            for message_hash, result, source in rows
+        }
+
+    def put_message(
+        self, message_hash: str, result: EmailTriageResult, source: str
+    ) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO message_analyses "
+                "(message_hash, result, source, created_at) VALUES (?, ?, ?, ?)",
+                (
+                    message_hash,
+                    result.model_dump_json(),
+                    source,
+                    datetime.utcnow().isoformat(),
+                ),
+            )
+
+    def write_many(self, records: List[AnalysisRecord]) -> int:
+        if not records:
+            return 0
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    f"INSERT INTO analyses ({', '.join(RECORD_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(RECORD_COLUMNS))})",
+                    [astuple(record) for record in records],
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return len(records)
+
+    def latest(self, email_hash: str) -> Optional[Tuple[int, AnalysisRecord]]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                _SELECT_RECORD + " WHERE email_hash = ? ORDER BY id DESC LIMIT 1",
+                (email_hash,),
+            ).fetchone()
+        return _record(row) if row else None
+
+    def iter_records(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        category: Optional[str] = None,
+        source: Optional[str] = None,
+        page_size: int = EXPORT_PAGE_SIZE,
+    ) -> Iterator[Tuple[int, AnalysisRecord]]:
+        """Yield ``(id, record)`` in insert order, one page at a time.
+
+        Keyset pagination on ``id`` with a short-lived connection per page
+        keeps memory constant and never holds a read transaction open for
+        the whole export.
+        """
+        clauses, params = [], []
+        for clause, value in (
+            ("timestamp >= ?", since),
+            ("timestamp < ?", until),
+            ("category = ?", category),
+            ("source = ?", source),
+        ):
+            if value:
+                clauses.append(clause)
+                params.append(value)
+        last_id = 0
+        while True:
+            where = " AND ".join(["id > ?", *clauses])
+            with closing(self._connect()) as conn:
+                rows = conn.execute(
+                    f"{_SELECT_RECORD} WHERE {where} ORDER BY id LIMIT ?",
+                    (last_id, *params, page_size),
+                ).fetchall()
+            for row in rows:
+                yield _record(row)
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1][0]
+
+
+def _store_path() -> Path:
+    if settings.analysis_db_path:
+        return Path(settings.analysis_db_path)
+    return Path(__file__).resolve().parents[2] / "data" / "analysis.db"
+
+
+_store: Optional[AnalysisStore] = None
+_writer: Optional[BufferedWriter] = None
+
+
+def get_analysis_store() -> AnalysisStore:
+    global _store
+    if _store is None:
+        _store = AnalysisStore(_store_path())
+    return _store
+
+
+def get_history_writer() -> BufferedWriter:
+    global _writer
+    if _writer is None:
+        _writer = BufferedWriter(
+            get_analysis_store(),
+            batch_size=settings.history_batch_size,
+            flush_interval=settings.history_flush_seconds,
+            name="analysis_history",
+        )
+    return _writer
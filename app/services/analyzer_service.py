@@ -1,51 +1,139 @@
 import logging
-from dataclasses import dataclass
-from typing import Dict, Optional
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import anyio
 
 from app.config import settings
-from app.schemas.triage import EmailTriageResult
+from app.schemas.triage import EmailTriageResult, TriageResponse, TriageResult
+from app.services.analysis_store import (
+    AnalysisRecord,
+    get_analysis_store,
+    get_history_writer,
+)
 from app.services.baseline_service import BaselineService
+from app.services.cascade import build_cascade, template_result
+from app.services.incremental_learner import get_incremental_learner
 from app.services.llm_service import LLMService
+from app.services.load_shedding import get_overload_controller
+from app.services.long_email import LLM_INPUT_CHARS
+from app.services.rules import RULE_SOURCE, build_rule_engine
+from app.utils import llm_usage
 from app.utils.hashing import hash_text
+from app.utils.llm_usage import LLMUsage, get_usage_ledger
+from app.utils.metrics import metrics
 from app.utils.preprocessing import preprocess_text
+from app.utils.single_flight import SingleFlight
+from app.utils.threads import message_hash, split_thread
 
 logger = logging.getLogger(__name__)
 
+# Shared by every AnalyzerService so the page and API routes coalesce too.
+_in_flight: "SingleFlight[AnalysisOutput]" = SingleFlight("analysis_coalesced")
+
+DEGRADED_SOURCE = "degraded"
+
 
-@dataclass
+@dataclass(slots=True)
 class AnalysisOutput:
-    result: EmailTriageResult
+    """One finished analysis, sized for holding thousands of them.
+
+    An ``EmailTriageResult`` passed in is kept as a ``TriageResult``; the
+    pydantic response is only built by ``to_response`` at the HTTP boundary.
+    """
+
+    result: TriageResult
     source: str
     email_hash: str
     stats: Dict[str, int]
     baseline_prob: Optional[float]
+    usage: LLMUsage = field(default_factory=LLMUsage)
+
+    def __post_init__(self) -> None:
+        if isinstance(self.result, EmailTriageResult):
+            self.result = TriageResult.from_model(self.result)
+
+    def to_response(self) -> TriageResponse:
+        return TriageResponse.model_construct(
+            result=self.result.to_model(),
+            source=self.source,
+            email_hash=self.email_hash,
+            stats=dict(self.stats),
+            baseline_prob=self.baseline_prob,
+        )
 
 
 class AnalyzerService:
     def __init__(self) -> None:
         self.baseline_service = BaselineService()
         self.llm_service = LLMService()
+        self.learner = get_incremental_learner()
+        if self.learner is not None:
+            self.learner.attach(self.baseline_service)
+        self.cascade = build_cascade(
+            settings.cascade_tiers, self.baseline_service, self.llm_service
+        )
+        self.rules = build_rule_engine()
+
+    async def analyze_async(
+        self, email_text: str, route: str = "api", client: str = "unknown"
+    ) -> AnalysisOutput:
+        """Analyze off the event loop, sharing one run per identical email.
+
+        Concurrent requests with the same ``hash_text`` digest wait on a
+        single ``analyze`` call and share its immutable result.
+        LLM usage is attributed to the ``route`` and ``client`` that ran it.
+        """
+
+        async def run() -> AnalysisOutput:
+            with llm_usage.tally() as usage:
+                output = await anyio.to_thread.run_sync(self.analyze, email_text)
+            output.usage = usage
+            get_usage_ledger().attribute(route, output.source, client, usage)
+            if settings.history_enabled:
+                await get_history_writer().add(AnalysisRecord.from_output(output))
+            return output
+
+        return await _in_flight.do(hash_text(email_text), run)
 
     def analyze(self, email_text: str) -> AnalysisOutput:
-        processed = preprocess_text(email_text)
         email_hash = hash_text(email_text)
-        stats = processed["stats"]
+        rule = self.rules.match(email_text) if self.rules is not None else None
+        if rule is not None and rule.mode == "enforce":
+            return AnalysisOutput(
+                result=self.rules.result(rule),
+                source=RULE_SOURCE,
+                email_hash=email_hash,
+                stats={
+                    "num_chars": len(email_text),
+                    "num_words": len(email_text.split()),
+                },
+                baseline_prob=None,
+            )
+        output = self._analyze(email_hash, email_text)
+        if rule is not None:
+            self.rules.observe(rule, output.result.category)
+        return output
 
-        baseline_pred = self.baseline_service.predict(processed["clean_text"])
-        llm_original = email_text[:12000]
-        llm_clean = processed["clean_text"][:12000]
-        llm_result = self.llm_service.classify_and_reply(llm_original, llm_clean)
+    def _analyze(self, email_hash: str, email_text: str) -> AnalysisOutput:
+        if settings.thread_mode_enabled:
+            messages = split_thread(email_text)
+            if len(messages) > 1:
+                return self._analyze_thread(email_hash, messages)
 
-        source = "llm"
-        baseline_prob = None
-        if baseline_pred and baseline_pred[1] >= settings.baseline_threshold:
-            label, prob = baseline_pred
-            llm_result.category = label
-            llm_result.confidence = prob
-            source = "baseline"
-            baseline_prob = prob
-        elif baseline_pred:
-            baseline_prob = baseline_pred[1]
+        processed = preprocess_text(email_text)
+        stats = processed.stats
+        if self.learner is not None:
+            self.learner.remember(email_hash, processed.clean_text)
+
+        llm_result, source, baseline_prob = self._classify(
+            email_text, processed.clean_text
+        )
+        if settings.thread_mode_enabled and source != DEGRADED_SOURCE:
+            # Lets the next reply in this thread reuse this analysis.
+            get_analysis_store().put_message(
+                message_hash(email_text), llm_result, source
+            )
 
         logger.info(
             "Email analyzed",
@@ -63,3 +151,134 @@ class AnalyzerService:
             stats=stats,
             baseline_prob=baseline_prob,
         )
+
+    def _analyze_thread(self, email_hash: str, messages: List[str]) -> AnalysisOutput:
+        """Analyze only the newest message of a reply chain.
+
+        Messages are hashed individually; a newest message seen before reuses
+        its stored analysis, and older ones are passed to the LLM as a short
+        context built from their stored summaries when available.
+        """
+        store = get_analysis_store()
+        hashes = [message_hash(message) for message in messages]
+        stored = store.get_messages(hashes)
+        newest = messages[0]
+        processed = preprocess_text(newest)
+        stats = {**processed.stats, "thread_messages": len(messages)}
+        if self.learner is not None:
+            self.learner.remember(email_hash, processed.clean_text)
+        metrics.incr("thread_messages_reused", sum(key in stored for key in hashes))
+
+        baseline_prob = None
+        if hashes[0] in stored:
+            llm_result, source = stored[hashes[0]]
+        else:
+            llm_text = newest + _thread_context(messages[1:], hashes[1:], stored)
+            full_chars = min(sum(len(message) for message in messages), LLM_INPUT_CHARS)
+            metrics.incr("thread_llm_chars_saved", max(0, full_chars - len(llm_text)))
+            llm_result, source, baseline_prob = self._classify(
+                llm_text, processed.clean_text
+            )
+            if source != DEGRADED_SOURCE:
+                store.put_message(hashes[0], llm_result, source)
+
+        logger.info(
+            "Thread analyzed",
+            extra={
+                "hash": email_hash,
+                "messages": len(messages),
+                "reused": len(stored),
+                "source": source,
+            },
+        )
+        return AnalysisOutput(
+            result=llm_result,
+            source=source,
+            email_hash=email_hash,
+            stats=stats,
+            baseline_prob=baseline_prob,
+        )
+
+    def _classify(
+        self, email_text: str, clean_text: str
+    ) -> Tuple[EmailTriageResult, str, Optional[float]]:
+        # Admission is only asked for right before an LLM call, so answers
+        # that never need the LLM are not degraded by shedding or budget.
+        if self.cascade is not None:
+            ran = self.cascade.run(email_text, clean_text, admit=self._llm_admitted)
+            if ran is None:
+                return self._degraded(email_text, clean_text)
+            outcome, tier = ran
+            return outcome.result, tier.name, outcome.baseline_prob
+        return self._baseline_with_llm(email_text, clean_text)
+
+    def _llm_admitted(self) -> bool:
+        if get_usage_ledger().budget_exhausted():
+            metrics.incr("analysis_budget_exhausted")
+            return False
+        return not settings.load_shedding_enabled or get_overload_controller().admit()
+
+    def _degraded(
+        self, email_text: str, clean_text: str
+    ) -> Tuple[EmailTriageResult, str, Optional[float]]:
+        # Served while the LLM is shed or over budget: baseline category,
+        # template reply.
+        metrics.incr("analysis_shed")
+        prediction = self.baseline_service.predict(clean_text)
+        if prediction is None:
+            # Without a model, "Produtivo" keeps the email in someone's queue.
+            result = template_result(
+                email_text, "Produtivo", 0.5, DEGRADED_SOURCE, needs_human_review=True
+            )
+            return result, DEGRADED_SOURCE, None
+        label, prob = prediction
+        result = template_result(
+            email_text,
+            label,
+            self.baseline_service.calibrated(label, prob),
+            DEGRADED_SOURCE,
+            needs_human_review=True,
+        )
+        return result, DEGRADED_SOURCE, prob
+
+    def _baseline_with_llm(
+        self, email_text: str, clean_text: str
+    ) -> Tuple[EmailTriageResult, str, Optional[float]]:
+        # Default without CASCADE_TIERS: a baseline that clears its
+        # calibrated threshold answers with a template reply; everything
+        # else goes to the LLM.
+        baseline_pred = self.baseline_service.predict(clean_text)
+        if baseline_pred and self.baseline_service.is_confident(*baseline_pred):
+            label, prob = baseline_pred
+            confidence = self.baseline_service.calibrated(label, prob)
+            result = template_result(email_text, label, confidence, "baseline")
+            return result, "baseline", prob
+        if not self._llm_admitted():
+            return self._degraded(email_text, clean_text)
+        llm_result = self.llm_service.classify_text(email_text, clean_text)
+        return llm_result, "llm", baseline_pred[1] if baseline_pred else None
+
+
+def _thread_context(
+    messages: List[str],
+    hashes: List[str],
+    stored: Dict[str, Tuple[EmailTriageResult, str]],
+) -> str:
+    lines: List[str] = []
+    used = 0
+    for message, key in zip(messages, hashes):
+        if key in stored:
+            result, _source = stored[key]
+            line = f"- [{result.category}] {result.summary}"
+        else:
+            line = "- " + " ".join(message.split())[:200]
+        if used + len(line) > settings.thread_context_chars:
+            break
+        lines.append(line)
+        used += len(line)
+    if not lines:
+        return ""
+    return (
+        "\n\nContexto anterior da conversa (resumo, mais recente primeiro):\n"
+        + "\n".join(lines)
+    )
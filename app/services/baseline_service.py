@@ -1,16 +1,51 @@
+import json
 import logging
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
 import joblib
 from sklearn.pipeline import Pipeline
 
+from app.config import settings
+from app.services.calibration import calibrate
+
 logger = logging.getLogger(__name__)
 
 
+def thresholds_path() -> Path:
+    if settings.baseline_thresholds_path:
+        return Path(settings.baseline_thresholds_path)
+    return Path(__file__).resolve().parents[2] / "models" / "baseline_thresholds.json"
+
+
 class BaselineService:
     def __init__(self) -> None:
         self.model = self._load_model()
+        self.thresholds: Dict[str, Optional[float]] = {}
+        self.calibration: Dict[str, Dict[str, list]] = {}
+        self._load_thresholds()
+
+    def _load_thresholds(self) -> None:
+        path = thresholds_path()
+        if not path.exists():
+            return
+        try:
+            config = json.loads(path.read_text(encoding="utf-8"))
+            self.thresholds = dict(config.get("thresholds", {}))
+            self.calibration = dict(config.get("calibration", {}))
+        except (OSError, ValueError) as exc:
+            logger.warning(
+                "Failed to load baseline thresholds", extra={"error": str(exc)}
+            )
+
+    def is_confident(self, label: str, prob: float) -> bool:
+        if label not in self.thresholds:
+            return prob >= settings.baseline_threshold
+        threshold = self.thresholds[label]
+        return threshold is not None and prob >= threshold
+
+    def calibrated(self, label: str, prob: float) -> float:
+        return calibrate(self.calibration.get(label), prob)
 
     def _load_model(self) -> Optional[Pipeline]:
         model_path = Path(__file__).resolve().parents[2] / "models" / "baseline.joblib"
@@ -23,13 +58,24 @@ class BaselineService:
             logger.warning("Failed to load baseline model", extra={"error": str(exc)})
             return None
 
+    def swap_model(self, model: Pipeline) -> None:
+        # The calibrated thresholds were fitted on the trained artifact's
+        # probabilities; another model falls back to BASELINE_THRESHOLD and
+        # raw probabilities until it is calibrated itself.
+        self.thresholds = {}
+        self.calibration = {}
+        # A single reference assignment: in-flight predictions keep the
+        # model they already read.
+        self.model = model
+
     def predict(self, text_clean: str) -> Optional[Tuple[str, float]]:
-        if not self.model or not text_clean.strip():
+        model = self.model
+        if not model or not text_clean.strip():
             return None
         try:
-            probabilities = self.model.predict_proba([text_clean])[0]
+            probabilities = model.predict_proba([text_clean])[0]
             best_index = int(probabilities.argmax())
-            label = str(self.model.classes_[best_index])
+            label = str(model.classes_[best_index])
             confidence = float(probabilities[best_index])
             return label, confidence
         except Exception as exc:  # noqa: BLE001
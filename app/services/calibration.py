@@ -0,0 +1,81 @@
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sklearn.isotonic import IsotonicRegression
+
+Sample = Tuple[str, float, bool]
+
+# scripts/train_baseline.py never trains on these rows, so thresholds are
+# fitted on emails the baseline has not seen.
+CALIBRATION_FOLDS = 5
+
+
+def is_calibration_row(text: str) -> bool:
+    return zlib.crc32(text.encode("utf-8")) % CALIBRATION_FOLDS == 0
+
+
+def _best_threshold(
+    probs: np.ndarray, correct: np.ndarray, precision_target: float, min_samples: int
+) -> Tuple[Optional[float], int, float]:
+    order = np.argsort(-probs, kind="stable")
+    probs, correct = probs[order], correct[order]
+    hits = np.cumsum(correct)
+    best: Tuple[Optional[float], int, float] = (None, 0, 0.0)
+    for index in range(len(probs)):
+        # Only cut between distinct probabilities: ties are accepted together.
+        if index + 1 < len(probs) and probs[index + 1] == probs[index]:
+            continue
+        accepted = index + 1
+        precision = hits[index] / accepted
+        if accepted >= min_samples and precision >= precision_target:
+            best = (float(probs[index]), accepted, float(precision))
+    return best
+
+
+def fit_thresholds(
+    samples: Sequence[Sample], precision_target: float, min_samples: int = 5
+) -> Dict[str, object]:
+    """Per-category thresholds that maximize baseline coverage at a precision.
+
+    ``samples`` are ``(predicted_label, raw_probability, was_correct)`` tuples
+    from replaying a labelled set through the baseline.
+    """
+    thresholds: Dict[str, Optional[float]] = {}
+    calibration: Dict[str, Dict[str, List[float]]] = {}
+    report: Dict[str, Dict[str, float]] = {}
+    accepted_total = 0
+    for label in sorted({label for label, _, _ in samples}):
+        probs = np.array([prob for pred, prob, _ in samples if pred == label])
+        correct = np.array([ok for pred, _, ok in samples if pred == label], float)
+        threshold, accepted, precision = _best_threshold(
+            probs, correct, precision_target, min_samples
+        )
+        thresholds[label] = threshold
+        accepted_total += accepted
+        report[label] = {
+            "samples": int(len(probs)),
+            "accepted": accepted,
+            "precision": precision,
+            "raw_accuracy": float(correct.mean()),
+        }
+        if len(probs) >= 2 and len(set(correct)) > 1:
+            isotonic = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds="clip")
+            isotonic.fit(probs, correct)
+            calibration[label] = {
+                "x": [float(value) for value in isotonic.X_thresholds_],
+                "y": [float(value) for value in isotonic.y_thresholds_],
+            }
+    return {
+        "precision_target": precision_target,
+        "thresholds": thresholds,
+        "calibration": calibration,
+        "offload_rate": accepted_total / len(samples) if samples else 0.0,
+        "report": report,
+    }
+
+
+def calibrate(points: Optional[Dict[str, List[float]]], prob: float) -> float:
+    if not points:
+        return prob
+    return float(np.interp(prob, points["x"], points["y"]))
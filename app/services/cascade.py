@@ -0,0 +1,216 @@
+import logging
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.clients.gemini_client import LLMServiceError
+from app.schemas.triage import EmailTriageResult
+from app.services.baseline_service import BaselineService
+from app.services.llm_service import LLMService
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_REPLIES = {
+    "Produtivo": (
+        "Ola! Recebemos sua mensagem e vamos analisar a solicitacao. "
+        "Retornaremos assim que possivel."
+    ),
+    "Improdutivo": "Ola! Obrigado pela mensagem. Ficamos a disposicao.",
+}
+
+
+def template_result(
+    email_text: str,
+    category: str,
+    confidence: float,
+    source: str,
+    needs_human_review: bool = False,
+) -> EmailTriageResult:
+    """Canned result for tiers that only decide the category."""
+    summary = " ".join(email_text.split())
+    if len(summary) > 200:
+        summary = summary[:197] + "..."
+    return EmailTriageResult(
+        category=category,
+        confidence=confidence,
+        summary=summary or "Sem conteudo.",
+        suggested_reply=TEMPLATE_REPLIES[category],
+        tags=[category.lower(), source, "automatico"],
+        needs_human_review=needs_human_review,
+        reasons=[
+            f"Classificado por {source} sem consulta ao LLM.",
+            f"Confianca {confidence:.2f}.",
+        ],
+    )
+
+
+@dataclass
+class TierOutcome:
+    result: EmailTriageResult
+    baseline_prob: Optional[float] = None
+
+
+class Tier(ABC):
+    """One step of the cascade: answers, or returns None to pass it on."""
+
+    # Tiers that call the LLM wait for load shedding / budget admission.
+    uses_llm = False
+
+    def __init__(self, name: str, threshold: Optional[float], cost: float) -> None:
+        self.name = name
+        self.threshold = threshold
+        self.cost = cost
+
+    @abstractmethod
+    def run(self, email_text: str, clean_text: str) -> Optional[TierOutcome]: ...
+
+    def accepts(self, outcome: TierOutcome) -> bool:
+        if outcome.result.needs_human_review:
+            return False
+        return self.threshold is None or outcome.result.confidence >= self.threshold
+
+
+class BaselineTier(Tier):
+    def __init__(self, name, threshold, cost, baseline: BaselineService) -> None:
+        super().__init__(name, threshold, cost)
+        self.baseline = baseline
+
+    def run(self, email_text: str, clean_text: str) -> Optional[TierOutcome]:
+        prediction = self.baseline.predict(clean_text)
+        if prediction is None:
+            return None
+        label, prob = prediction
+        # Without an explicit threshold the calibrated per-category
+        # thresholds decide, as in the non-cascade path.
+        confident = (
+            self.baseline.is_confident(label, prob)
+            if self.threshold is None
+            else prob >= self.threshold
+        )
+        result = template_result(
+            email_text,
+            label,
+            self.baseline.calibrated(label, prob),
+            source=self.name,
+            needs_human_review=not confident,
+        )
+        return TierOutcome(result=result, baseline_prob=prob)
+
+
+class LLMTier(Tier):
+    uses_llm = True
+
+    def __init__(self, name, threshold, cost, llm: LLMService, model: str) -> None:
+        super().__init__(name, threshold, cost)
+        self.llm = llm
+        self.model = model
+
+    def run(self, email_text: str, clean_text: str) -> Optional[TierOutcome]:
+        result = self.llm.classify_text(
+            email_text, clean_text, model=self.model or None
+        )
+        return TierOutcome(result=result)
+
+
+def parse_tier(spec: str, baseline: BaselineService, llm: LLMService) -> Tier:
+    """Build a tier from ``kind[/model][:threshold[:cost]]``.
+
+    Examples: ``baseline``, ``baseline:0.9``, ``llm/gemini-1.5-flash-8b:0.8:1``.
+    """
+    head, *numbers = spec.strip().split(":")
+    kind, _, model = head.partition("/")
+    threshold = float(numbers[0]) if numbers and numbers[0] else None
+    cost = float(numbers[1]) if len(numbers) > 1 and numbers[1] else 0.0
+    if kind == "baseline":
+        return BaselineTier("baseline", threshold, cost, baseline)
+    if kind == "llm":
+        name = f"llm:{model}" if model else "llm"
+        return LLMTier(name, threshold, cost, llm, model)
+    if kind == "rules":
+        # Rules run on the raw text before preprocessing and need the final
+        # category to score dry runs, so they stay a pre-check in
+        # AnalyzerService.analyze (RULES_ENABLED) rather than a tier.
+        raise ValueError("Keyword rules are not a cascade tier; use RULES_ENABLED")
+    raise ValueError(f"Unknown cascade tier: {spec!r}")
+
+
+class Cascade:
+    """Runs tiers in order until one is confident enough to answer.
+
+    A tier escalates when it has no answer, raises, is below its threshold,
+    or flags ``needs_human_review``. The last tier that answered is used
+    when nobody is confident, so the caller still gets a result.
+
+    ``admit`` is asked once, before the first LLM tier; when it refuses,
+    ``run`` returns None and the caller serves its degraded answer.
+    """
+
+    def __init__(self, tiers: List[Tier]) -> None:
+        if not tiers:
+            raise ValueError("Cascade needs at least one tier")
+        self.tiers = tiers
+        metrics.register_gauge("cascade", self.report)
+
+    def run(
+        self,
+        email_text: str,
+        clean_text: str,
+        admit: Optional[Callable[[], bool]] = None,
+    ) -> Optional[Tuple[TierOutcome, Tier]]:
+        fallback: Optional[Tuple[TierOutcome, Tier]] = None
+        last_error: Optional[LLMServiceError] = None
+        for tier in self.tiers:
+            if tier.uses_llm and admit is not None:
+                if not admit():
+                    return None
+                admit = None
+            metrics.incr(f"cascade_{tier.name}_attempts")
+            metrics.incr("cascade_cost", tier.cost)
+            started = time.perf_counter()
+            try:
+                outcome = tier.run(email_text, clean_text)
+            except LLMServiceError as exc:
+                metrics.incr(f"cascade_{tier.name}_errors")
+                logger.warning(
+                    "Cascade tier failed", extra={"tier": tier.name, "error": str(exc)}
+                )
+                last_error = exc
+                continue
+            finally:
+                metrics.observe(f"cascade_{tier.name}", time.perf_counter() - started)
+            if outcome is None:
+                continue
+            if tier.accepts(outcome):
+                metrics.incr(f"cascade_{tier.name}_resolved")
+                return outcome, tier
+            fallback = (outcome, tier)
+        if fallback is not None:
+            outcome, tier = fallback
+            outcome.result.needs_human_review = True
+            metrics.incr("cascade_unresolved")
+            return fallback
+        raise last_error or LLMServiceError("Nenhum nivel da cascata respondeu.")
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        report = {}
+        for tier in self.tiers:
+            attempts = metrics.counter(f"cascade_{tier.name}_attempts")
+            resolved = metrics.counter(f"cascade_{tier.name}_resolved")
+            report[tier.name] = {
+                "attempts": attempts,
+                "resolved": resolved,
+                "errors": metrics.counter(f"cascade_{tier.name}_errors"),
+                "resolution_rate": resolved / attempts if attempts else 0.0,
+                "cost_per_call": tier.cost,
+            }
+        return report
+
+
+def build_cascade(
+    specs: List[str], baseline: BaselineService, llm: LLMService
+) -> Optional[Cascade]:
+    if not specs:
+        return None
+    return Cascade([parse_tier(spec, baseline, llm) for spec in specs])
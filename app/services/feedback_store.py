@@ -0,0 +1,305 @@
+import asyncio
+import csv
+import logging
+import sqlite3
+from contextlib import closing
+from dataclasses import astuple, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Iterator, List, Optional, Protocol, Tuple
+
+import anyio
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CSV_COLUMNS = ["timestamp", "email_hash", "correct_label", "previous_label", "source"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS feedback (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    email_hash TEXT NOT NULL,
+    correct_label TEXT NOT NULL,
+    previous_label TEXT NOT NULL DEFAULT '',
+    source TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_feedback_email_hash ON feedback (email_hash);
+CREATE INDEX IF NOT EXISTS idx_feedback_timestamp ON feedback (timestamp);
+CREATE TABLE IF NOT EXISTS email_features (
+    email_hash TEXT PRIMARY KEY,
+    indices BLOB NOT NULL,
+    data BLOB NOT NULL,
+    created_at TEXT NOT NULL,
+    served_label TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_email_features_created_at
+    ON email_features (created_at);
+"""
+
+
+@dataclass
+class FeedbackRow:
+    timestamp: str
+    email_hash: str
+    correct_label: str
+    previous_label: str = ""
+    source: str = ""
+
+    @classmethod
+    def now(
+        cls,
+        email_hash: str,
+        correct_label: str,
+        previous_label: Optional[str] = None,
+        source: Optional[str] = None,
+    ) -> "FeedbackRow":
+        return cls(
+            timestamp=datetime.utcnow().isoformat(),
+            email_hash=email_hash,
+            correct_label=correct_label,
+            previous_label=previous_label or "",
+            source=source or "",
+        )
+
+
+class FeedbackStore:
+    """SQLite (WAL) feedback table, safe for writers in several processes."""
+
+    def __init__(self, path: Path, legacy_csv: Optional[Path] = None) -> None:
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            columns = {
+                row[1] for row in conn.execute("PRAGMA table_info(email_features)")
+            }
+            if "served_label" not in columns:
+                conn.execute("ALTER TABLE email_features ADD COLUMN served_label TEXT")
+        if legacy_csv is not None and legacy_csv.exists():
+            self.import_csv(legacy_csv, only_if_empty=True)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout=10000")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def write_many(self, rows: List[FeedbackRow], only_if_empty: bool = False) -> int:
+        if not rows:
+            return 0
+        with closing(self._connect()) as conn:
+            # IMMEDIATE takes the write lock up front so concurrent workers
+            # queue on busy_timeout instead of failing mid-transaction.
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if (
+                    only_if_empty
+                    and conn.execute("SELECT 1 FROM feedback LIMIT 1").fetchone()
+                ):
+                    conn.execute("ROLLBACK")
+                    return 0
+                conn.executemany(
+                    "INSERT INTO feedback "
+                    "(timestamp, email_hash, correct_label, previous_label, source) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [astuple(row) for row in rows],
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def by_email_hash(self, email_hash: str) -> List[FeedbackRow]:
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "SELECT timestamp, email_hash, correct_label, previous_label, source "
+                "FROM feedback WHERE email_hash = ? ORDER BY timestamp",
+                (email_hash,),
+            )
+            return [FeedbackRow(*row) for row in cursor]
+
+    def iter_since(self, last_id: int = 0) -> Iterator[Tuple[int, FeedbackRow]]:
+        """Yield ``(id, FeedbackRow)`` pairs with ``id > last_id`` in insert order."""
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "SELECT id, timestamp, email_hash, correct_label, previous_label, "
+                "source FROM feedback WHERE id > ? ORDER BY id",
+                (last_id,),
+            )
+            for row in cursor:
+                yield row[0], FeedbackRow(*row[1:])
+
+    def put_features(self, rows: List[Tuple[str, bytes, bytes, Optional[str]]]) -> None:
+        """Store hashed feature vectors (never the text) for analyzed emails.
+
+        ``served_label`` is what the model serving at the time predicted, kept
+        for holdout emails so a candidate can be compared against it.
+        """
+        if not rows:
+            return
+        created_at = datetime.utcnow().isoformat()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO email_features "
+                    "(email_hash, indices, data, served_label, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(*row, created_at) for row in rows],
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def labelled_features_since(
+        self, last_id: int
+    ) -> List[Tuple[int, str, str, Optional[bytes], Optional[bytes], Optional[str]]]:
+        """Feedback rows after ``last_id`` joined with their stored features."""
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT f.id, f.email_hash, f.correct_label, e.indices, e.data, "
+                "e.served_label "
+                "FROM feedback f LEFT JOIN email_features e "
+                "ON e.email_hash = f.email_hash WHERE f.id > ? ORDER BY f.id",
+                (last_id,),
+            ).fetchall()
+
+    def prune_features(self, older_than: str) -> int:
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "DELETE FROM email_features WHERE created_at < ?", (older_than,)
+            )
+            return cursor.rowcount
+
+    def export_csv(self, handle: IO[str], email_hash: Optional[str] = None) -> int:
+        query = (
+            "SELECT timestamp, email_hash, correct_label, previous_label, source "
+            "FROM feedback"
+        )
+        params: tuple = ()
+        if email_hash:
+            query += " WHERE email_hash = ?"
+            params = (email_hash,)
+        writer = csv.writer(handle)
+        writer.writerow(CSV_COLUMNS)
+        count = 0
+        with closing(self._connect()) as conn:
+            for row in conn.execute(query + " ORDER BY id", params):
+                writer.writerow(row)
+                count += 1
+        return count
+
+    def import_csv(self, path: Path, only_if_empty: bool = False) -> int:
+        with path.open("r", newline="", encoding="utf-8") as handle:
+            rows = [
+                FeedbackRow(**{column: row.get(column) or "" for column in CSV_COLUMNS})
+                for row in csv.DictReader(handle)
+                if row.get("email_hash") and row.get("correct_label")
+            ]
+        return self.write_many(rows, only_if_empty=only_if_empty)
+
+
+class BatchStore(Protocol):
+    def write_many(self, rows: list) -> int: ...
+
+
+class BufferedWriter:
+    """Batches rows for a store's ``write_many`` and flushes on size or interval."""
+
+    def __init__(
+        self,
+        store: BatchStore,
+        batch_size: int,
+        flush_interval: float,
+        max_pending: Optional[int] = None,
+        name: str = "feedback",
+    ) -> None:
+        self.store = store
+        self.name = name
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending or self.batch_size * 20
+        self._pending: list = []
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def add(self, row) -> None:
+        self._pending.append(row)
+        if self._task is None or len(self._pending) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, []
+            try:
+                await anyio.to_thread.run_sync(self.store.write_many, batch)
+            except Exception as exc:  # noqa: BLE001
+                # Keep the rows for the next flush, bounded so a dead disk
+                # cannot grow the buffer forever.
+                logger.warning(
+                    "Buffered flush failed",
+                    extra={"writer": self.name, "error": str(exc)},
+                )
+                self._pending = (batch + self._pending)[-self.max_pending :]
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+def _data_dir() -> Path:
+    return Path(__file__).resolve().parents[2] / "data"
+
+
+def _store_path() -> Path:
+    if settings.feedback_db_path:
+        return Path(settings.feedback_db_path)
+    return _data_dir() / "feedback.db"
+
+
+_store: Optional[FeedbackStore] = None
+_writer: Optional[BufferedWriter] = None
+
+
+def get_feedback_store() -> FeedbackStore:
+    global _store
+    if _store is None:
+        _store = FeedbackStore(_store_path(), legacy_csv=_data_dir() / "feedback.csv")
+    return _store
+
+
+def get_feedback_writer() -> BufferedWriter:
+    global _writer
+    if _writer is None:
+        _writer = BufferedWriter(
+            get_feedback_store(),
+            batch_size=settings.feedback_batch_size,
+            flush_interval=settings.feedback_flush_seconds,
+        )
+    return _writer
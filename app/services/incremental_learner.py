@@ -0,0 +1,421 @@
+import asyncio
+import copy
+import csv
+import hashlib
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+
+import anyio
+import joblib
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import Pipeline
+
+from app.config import settings
+from app.services.baseline_service import BaselineService
+from app.services.feedback_store import FeedbackStore, get_feedback_store
+from app.utils.metrics import metrics
+from app.utils.preprocessing import preprocess_text
+
+try:
+    import fcntl
+except ImportError:  # not on Windows: every process trains on its own
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+CLASSES = np.array(["Improdutivo", "Produtivo"])
+HOLDOUT_BUCKETS = 5
+MAX_HOLDOUT = 2000
+MAX_PENDING_FEATURES = 5000
+
+
+def make_vectorizer() -> HashingVectorizer:
+    return HashingVectorizer(
+        n_features=2**18, ngram_range=(1, 2), alternate_sign=False, norm="l2"
+    )
+
+
+def make_classifier() -> SGDClassifier:
+    return SGDClassifier(loss="log_loss", alpha=1e-5, random_state=42)
+
+
+def _is_holdout(key: str) -> bool:
+    digest = hashlib.sha256(key.encode("utf-8")).digest()
+    return digest[0] % HOLDOUT_BUCKETS == 0
+
+
+def to_blobs(row: sparse.csr_matrix) -> Tuple[bytes, bytes]:
+    return (
+        row.indices.astype(np.int32).tobytes(),
+        row.data.astype(np.float32).tobytes(),
+    )
+
+
+def from_blobs(rows: List[Tuple[bytes, bytes]], n_features: int) -> sparse.csr_matrix:
+    indices = [np.frombuffer(blob, dtype=np.int32) for blob, _ in rows]
+    data = [np.frombuffer(blob, dtype=np.float32) for _, blob in rows]
+    indptr = np.concatenate([[0], np.cumsum([len(item) for item in indices])])
+    return sparse.csr_matrix(
+        (
+            np.concatenate(data) if data else np.array([], dtype=np.float32),
+            np.concatenate(indices) if indices else np.array([], dtype=np.int32),
+            indptr,
+        ),
+        shape=(len(rows), n_features),
+    )
+
+
+class IncrementalLearner:
+    """Updates a hashing + SGD baseline from new feedback rows only.
+
+    Promoted models go to ``model_path``; the trained artifact at
+    ``base_path`` is only read. Until the first promotion the candidate is
+    compared with the labels the loaded baseline predicted for the same
+    holdout emails, so it has to beat the shipped model to replace it.
+
+    Only the process holding the lock next to ``state_path`` trains and
+    promotes; the others flush their features to the shared store and load
+    ``model_path`` when it changes.
+    """
+
+    def __init__(
+        self,
+        store: FeedbackStore,
+        state_path: Path,
+        model_path: Path,
+        seed_path: Optional[Path] = None,
+        base_path: Optional[Path] = None,
+    ) -> None:
+        self.store = store
+        self.state_path = state_path
+        self.model_path = model_path
+        self.seed_path = seed_path
+        self.base_path = base_path
+        self.vectorizer = make_vectorizer()
+        self.baselines: List[BaselineService] = []
+        self._pending: Dict[str, Tuple[bytes, bytes, Optional[str]]] = {}
+        self._pending_lock = threading.Lock()
+        self._step_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.classifier: Optional[SGDClassifier] = None
+        self.served: Optional[SGDClassifier] = None
+        self.last_feedback_id = 0
+        # (indices, data, label, label predicted by the model then served)
+        self.holdout: Deque[Tuple[bytes, bytes, str, Optional[str]]] = deque(
+            maxlen=MAX_HOLDOUT
+        )
+        self._lock_file = None
+        self._model_mtime: Optional[int] = None
+        self._load_state()
+
+    def attach(self, baseline: BaselineService) -> None:
+        if baseline not in self.baselines:
+            self.baselines.append(baseline)
+            if self.served is not None:
+                baseline.swap_model(self._pipeline(self.served))
+
+    def remember(self, email_hash: str, clean_text: str) -> None:
+        if not clean_text.strip():
+            return
+        row = self.vectorizer.transform([clean_text])
+        served_label = (
+            self._served_label(clean_text) if _is_holdout(email_hash) else None
+        )
+        with self._pending_lock:
+            if len(self._pending) >= MAX_PENDING_FEATURES:
+                self._pending.pop(next(iter(self._pending)))
+            self._pending[email_hash] = (*to_blobs(row), served_label)
+
+    def _served_label(self, clean_text: str) -> Optional[str]:
+        # Only needed until the learner serves its own model, which is then
+        # scored on the holdout features directly.
+        if self.served is not None:
+            return None
+        for baseline in self.baselines:
+            prediction = baseline.predict(clean_text)
+            if prediction is not None:
+                return prediction[0]
+        return None
+
+    def _reference_loaded(self) -> bool:
+        return any(baseline.model is not None for baseline in self.baselines)
+
+    def _pipeline(self, classifier: SGDClassifier) -> Pipeline:
+        return Pipeline([("hash", self.vectorizer), ("clf", classifier)])
+
+    def _load_state(self) -> None:
+        if not self.state_path.exists():
+            return
+        try:
+            state = joblib.load(self.state_path)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Failed to load learner state", extra={"error": str(exc)})
+            return
+        self.classifier = state["classifier"]
+        self.served = state.get("served")
+        self.last_feedback_id = state["last_feedback_id"]
+        self.holdout.clear()
+        # States written before served labels were kept have 3-tuples.
+        self.holdout.extend((*row, None)[:4] for row in state["holdout"])
+
+    def _save_state(self) -> None:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix(f".{os.getpid()}.tmp")
+        joblib.dump(
+            {
+                "classifier": self.classifier,
+                "served": self.served,
+                "last_feedback_id": self.last_feedback_id,
+                "holdout": list(self.holdout),
+            },
+            tmp_path,
+        )
+        os.replace(tmp_path, self.state_path)
+
+    def _existing_classifier(self) -> Optional[SGDClassifier]:
+        # A baseline produced by `train_baseline.py --streaming` uses the same
+        # featurizer, so learning can continue from it instead of the seed.
+        if self.base_path is None or not self.base_path.exists():
+            return None
+        try:
+            pipeline = joblib.load(self.base_path)
+        except Exception:  # noqa: BLE001
+            return None
+        if not isinstance(pipeline, Pipeline):
+            return None
+        vectorizer = pipeline.steps[0][1]
+        classifier = pipeline.steps[-1][1]
+        if (
+            isinstance(vectorizer, HashingVectorizer)
+            and vectorizer.n_features == self.vectorizer.n_features
+            and hasattr(classifier, "partial_fit")
+        ):
+            return copy.deepcopy(classifier)
+        return None
+
+    def _bootstrap(self) -> SGDClassifier:
+        existing = self._existing_classifier()
+        if existing is not None:
+            return existing
+        classifier = make_classifier()
+        texts: List[str] = []
+        labels: List[str] = []
+        if self.seed_path is not None and self.seed_path.exists():
+            with self.seed_path.open("r", encoding="utf-8", newline="") as handle:
+                for row in csv.DictReader(handle):
+                    text = (row.get("text") or "").strip()
+                    label = (row.get("label") or "").strip()
+                    if not text or label not in CLASSES:
+                        continue
+                    clean = preprocess_text(text).clean_text
+                    blobs = to_blobs(self.vectorizer.transform([clean]))
+                    if _is_holdout(text):
+                        self.holdout.append((*blobs, label, self._served_label(clean)))
+                    else:
+                        texts.append(clean)
+                        labels.append(label)
+        if texts:
+            classifier.partial_fit(
+                self.vectorizer.transform(texts), labels, classes=CLASSES
+            )
+        return classifier
+
+    def _flush_features(self) -> None:
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        self.store.put_features(
+            [(email_hash, *blobs) for email_hash, blobs in pending.items()]
+        )
+
+    def _accuracy(
+        self, classifier: Optional[SGDClassifier], rows: List[tuple]
+    ) -> Optional[float]:
+        if classifier is None or not hasattr(classifier, "classes_"):
+            return None
+        if not rows:
+            return None
+        features = from_blobs(
+            [(row[0], row[1]) for row in rows], self.vectorizer.n_features
+        )
+        labels = np.array([row[2] for row in rows])
+        return float((classifier.predict(features) == labels).mean())
+
+    def _scores(self) -> Tuple[Optional[float], Optional[float]]:
+        """(candidate, served) accuracy, measured on the same holdout rows."""
+        rows = list(self.holdout)
+        if self.served is not None or not self._reference_loaded():
+            return self._accuracy(self.classifier, rows), self._accuracy(
+                self.served, rows
+            )
+        # The loaded baseline is the trained artifact: compare on the rows
+        # where its prediction was recorded, and don't promote without them.
+        rows = [row for row in rows if row[3] is not None]
+        if len(rows) < settings.learner_min_holdout:
+            return None, None
+        served = sum(row[3] == row[2] for row in rows) / len(rows)
+        return self._accuracy(self.classifier, rows), served
+
+    def step(self) -> Dict[str, object]:
+        """Consume feedback rows added since the last step."""
+        with self._step_lock:
+            self._flush_features()
+            if self.classifier is None:
+                self.classifier = self._bootstrap()
+
+            rows = self.store.labelled_features_since(self.last_feedback_id)
+            train: List[Tuple[bytes, bytes]] = []
+            train_labels: List[str] = []
+            for feedback_id, email_hash, label, indices, data, served_label in rows:
+                self.last_feedback_id = max(self.last_feedback_id, feedback_id)
+                if indices is None or label not in CLASSES:
+                    continue
+                if _is_holdout(email_hash):
+                    self.holdout.append((indices, data, label, served_label))
+                else:
+                    train.append((indices, data))
+                    train_labels.append(label)
+
+            if train:
+                self.classifier.partial_fit(
+                    from_blobs(train, self.vectorizer.n_features),
+                    train_labels,
+                    classes=CLASSES,
+                )
+            metrics.incr("learner_rows", len(train))
+
+            candidate_accuracy, served_accuracy = self._scores()
+            promoted = self._should_promote(candidate_accuracy, served_accuracy)
+            if promoted:
+                self._promote()
+            self.store.prune_features(
+                (
+                    datetime.utcnow()
+                    - timedelta(days=settings.learner_feature_ttl_days)
+                ).isoformat()
+            )
+            self._save_state()
+            return {
+                "rows": len(rows),
+                "trained": len(train),
+                "holdout": len(self.holdout),
+                "candidate_accuracy": candidate_accuracy,
+                "served_accuracy": served_accuracy,
+                "promoted": promoted,
+            }
+
+    def _should_promote(
+        self, candidate_accuracy: Optional[float], served_accuracy: Optional[float]
+    ) -> bool:
+        if (
+            candidate_accuracy is None
+            or len(self.holdout) < settings.learner_min_holdout
+        ):
+            return False
+        if candidate_accuracy < settings.learner_min_accuracy:
+            return False
+        return served_accuracy is None or candidate_accuracy >= served_accuracy
+
+    def _promote(self) -> None:
+        self.served = copy.deepcopy(self.classifier)
+        pipeline = self._pipeline(self.served)
+        self.model_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.model_path.with_suffix(f".{os.getpid()}.tmp")
+        joblib.dump(pipeline, tmp_path)
+        os.replace(tmp_path, self.model_path)
+        self._model_mtime = self.model_path.stat().st_mtime_ns
+        for baseline in self.baselines:
+            baseline.swap_model(pipeline)
+        metrics.incr("learner_promotions")
+        logger.info("Incremental baseline promoted")
+
+    def _lead(self) -> bool:
+        """Take the training lock if free; it is held until ``stop``."""
+        if self._lock_file is not None or fcntl is None:
+            return True
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        handle = open(self.state_path.with_suffix(".lock"), "a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self._lock_file = handle
+        # Another process may have trained since this one started.
+        self._load_state()
+        return True
+
+    def follow(self) -> bool:
+        """Share this process's features and load the leader's promotions."""
+        self._flush_features()
+        try:
+            mtime = self.model_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime == self._model_mtime:
+            return False
+        pipeline = joblib.load(self.model_path)
+        self._model_mtime = mtime
+        self.served = pipeline.steps[-1][1]
+        for baseline in self.baselines:
+            baseline.swap_model(pipeline)
+        return True
+
+    def tick(self) -> Optional[Dict[str, object]]:
+        if self._lead():
+            return self.step()
+        self.follow()
+        return None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.learner_interval_seconds)
+            try:
+                result = await anyio.to_thread.run_sync(self.tick)
+                if result is not None:
+                    logger.info("Incremental learner step", extra=result)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Incremental learner failed", extra={"error": str(exc)})
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await anyio.to_thread.run_sync(self._flush_features)
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+
+_learner: Optional[IncrementalLearner] = None
+
+
+def get_incremental_learner() -> Optional[IncrementalLearner]:
+    global _learner
+    if not settings.online_learning_enabled:
+        return None
+    if _learner is None:
+        base_dir = Path(__file__).resolve().parents[2]
+        _learner = IncrementalLearner(
+            get_feedback_store(),
+            state_path=base_dir / "models" / "incremental_state.joblib",
+            model_path=base_dir / "models" / "incremental.joblib",
+            seed_path=base_dir / "data" / "emails_seed.csv",
+            base_path=base_dir / "models" / "baseline.joblib",
+        )
+    return _learner
@@ -1,21 +1,50 @@
 import concurrent.futures
+import contextvars
+import threading
+from typing import Optional
 
 from app.clients.gemini_client import LLMServiceError, classify_and_reply
 from app.config import settings
 from app.schemas.triage import EmailTriageResult
+from app.services.load_shedding import get_overload_controller
+from app.services.long_email import LLM_INPUT_CHARS, classify_long
+
+# Process-wide cap on concurrent LLM calls, shared by every request and by
+# the chunks of a long email.
+_llm_slots = threading.BoundedSemaphore(max(1, settings.llm_max_concurrency))
 
 
 class LLMService:
+    def classify_text(
+        self, email_original: str, email_clean: str, model: Optional[str] = None
+    ) -> EmailTriageResult:
+        """Classify, splitting emails too long for one call when enabled."""
+        if settings.long_email_mode_enabled and len(email_original) > LLM_INPUT_CHARS:
+            return classify_long(self, email_original, model=model)
+        llm_original = email_original[:LLM_INPUT_CHARS]
+        llm_clean = email_clean[:LLM_INPUT_CHARS]
+        if model:
+            return self.classify_and_reply(llm_original, llm_clean, model=model)
+        return self.classify_and_reply(llm_original, llm_clean)
+
     def classify_and_reply(
-        self, email_original: str, email_clean: str
+        self, email_original: str, email_clean: str, model: Optional[str] = None
     ) -> EmailTriageResult:
-        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(
-                classify_and_reply,
-                email_original=email_original,
-                email_clean=email_clean,
-            )
+        with get_overload_controller().track():
+            if not _llm_slots.acquire(timeout=settings.llm_timeout_seconds):
+                raise LLMServiceError("Timeout aguardando vaga para consultar o LLM.")
             try:
-                return future.result(timeout=settings.llm_timeout_seconds)
-            except concurrent.futures.TimeoutError as exc:
-                raise LLMServiceError("Timeout ao consultar o LLM.") from exc
+                with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+                    future = executor.submit(
+                        contextvars.copy_context().run,
+                        classify_and_reply,
+                        email_original=email_original,
+                        email_clean=email_clean,
+                        model=model,
+                    )
+                    try:
+                        return future.result(timeout=settings.llm_timeout_seconds)
+                    except concurrent.futures.TimeoutError as exc:
+                        raise LLMServiceError("Timeout ao consultar o LLM.") from exc
+            finally:
+                _llm_slots.release()
@@ -0,0 +1,153 @@
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Deque, Dict, Iterator, Optional, Tuple
+
+from app.config import settings
+from app.utils.metrics import metrics
+
+LEVELS = ("normal", "degraded", "baseline_only")
+MIN_ADMIT_RATIO = 0.125
+SHED_COOLDOWN_SECONDS = 1.0
+
+
+class OverloadController:
+    """Decides how many analyses may call the LLM, from recent LLM health.
+
+    Every LLM call reports its latency (timeouts included); a mean over the
+    last ``window_seconds`` above ``latency_threshold``, or
+    ``max_in_flight`` concurrent calls, halves the share of analyses admitted
+    to the LLM (at most once per second, down to zero). The share recovers
+    by ``recovery_step`` every quiet ``window_seconds``, so traffic returns
+    to the LLM gradually instead of all at once.
+    """
+
+    def __init__(
+        self,
+        latency_threshold: float,
+        max_in_flight: int,
+        window_seconds: float,
+        recovery_step: float = 0.25,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.latency_threshold = latency_threshold
+        self.max_in_flight = max_in_flight
+        self.window_seconds = window_seconds
+        self.recovery_step = recovery_step
+        self.clock = clock
+        self.admit_ratio = 1.0
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self._samples: Deque[Tuple[float, float]] = deque()
+        self._last_change = clock()
+        self._last_shed = float("-inf")
+
+    @property
+    def level(self) -> int:
+        if self.admit_ratio >= 1.0:
+            return 0
+        return 1 if self.admit_ratio > 0.0 else 2
+
+    def admit(self) -> bool:
+        with self._lock:
+            now = self.clock()
+            self._recover(now)
+            if self.in_flight >= self.max_in_flight:
+                self._shed(now)
+            ratio = self.admit_ratio
+        if ratio >= 1.0:
+            return True
+        return ratio > 0.0 and random.random() < ratio
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        """Wrap one LLM call, including the wait for an LLM slot."""
+        with self._lock:
+            self.in_flight += 1
+        started = self.clock()
+        try:
+            yield
+        finally:
+            latency = self.clock() - started
+            with self._lock:
+                self.in_flight -= 1
+                self._record(latency)
+
+    def _record(self, latency: float) -> None:
+        now = self.clock()
+        self._samples.append((now, latency))
+        while self._samples and self._samples[0][0] < now - self.window_seconds:
+            self._samples.popleft()
+        mean = sum(value for _, value in self._samples) / len(self._samples)
+        if mean > self.latency_threshold:
+            self._shed(now)
+
+    def _shed(self, now: float) -> None:
+        if now - self._last_shed < SHED_COOLDOWN_SECONDS or self.admit_ratio == 0.0:
+            return
+        halved = self.admit_ratio / 2
+        self.admit_ratio = halved if halved >= MIN_ADMIT_RATIO else 0.0
+        self._last_shed = self._last_change = now
+        metrics.incr("load_shed_steps")
+
+    def _recover(self, now: float) -> None:
+        if self.admit_ratio >= 1.0 or now - self._last_change < self.window_seconds:
+            return
+        # Samples from before the overload would shed again on the first
+        # new call; only calls made at the new ratio should count.
+        self._samples.clear()
+        self.admit_ratio = min(1.0, self.admit_ratio + self.recovery_step)
+        self._last_change = now
+
+    def report(self) -> Dict[str, object]:
+        with self._lock:
+            samples = [value for _, value in self._samples]
+            return {
+                "level": self.level,
+                "state": LEVELS[self.level],
+                "admit_ratio": self.admit_ratio,
+                "in_flight": self.in_flight,
+                "recent_latency": sum(samples) / len(samples) if samples else 0.0,
+            }
+
+
+class DegradationHeaderMiddleware:
+    """Adds ``X-Degradation-Level`` to every HTTP response."""
+
+    def __init__(self, app, controller: OverloadController) -> None:
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                level = str(self.controller.level).encode()
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (b"x-degradation-level", level),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+_controller: Optional[OverloadController] = None
+
+
+def get_overload_controller() -> OverloadController:
+    global _controller
+    if _controller is None:
+        _controller = OverloadController(
+            latency_threshold=settings.shed_latency_seconds,
+            max_in_flight=settings.shed_max_in_flight
+            or 2 * max(1, settings.llm_max_concurrency),
+            window_seconds=settings.shed_window_seconds,
+        )
+        metrics.register_gauge("load_shedding", _controller.report)
+    return _controller
@@ -0,0 +1,163 @@
+import concurrent.futures
+import contextvars
+import logging
+import re
+import time
+from collections import Counter
+from typing import List, Optional
+
+from app.clients.gemini_client import LLMServiceError
+from app.config import settings
+from app.schemas.triage import EmailTriageResult
+from app.utils.metrics import metrics
+from app.utils.preprocessing import preprocess_text
+
+logger = logging.getLogger(__name__)
+
+LLM_INPUT_CHARS = 12000
+DIGEST_HEAD_CHARS = 1500
+
+
+def chunk_paragraphs(text: str, max_chars: int) -> List[str]:
+    """Split on blank lines, packing paragraphs into chunks of ``max_chars``.
+
+    A paragraph longer than a chunk is split on lines, then hard-cut.
+    """
+    pieces: List[str] = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if len(paragraph) <= max_chars:
+            if paragraph:
+                pieces.append(paragraph)
+            continue
+        for line in paragraph.split("\n"):
+            for start in range(0, len(line), max_chars):
+                pieces.append(line[start : start + max_chars])
+
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for piece in pieces:
+        if current and size + len(piece) + 2 > max_chars:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(piece)
+        size += len(piece) + 2
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def merge_results(results: List[EmailTriageResult]) -> EmailTriageResult:
+    """Deterministic reduce, used when the merge call to the LLM fails."""
+    votes: Counter = Counter()
+    for result in results:
+        votes[result.category] += result.confidence
+    category = votes.most_common(1)[0][0]
+    agreeing = [result for result in results if result.category == category]
+    best = max(agreeing, key=lambda result: result.confidence)
+    tags = Counter(tag for result in results for tag in result.tags)
+    reasons: List[str] = []
+    for result in results:
+        for reason in result.reasons:
+            if reason not in reasons:
+                reasons.append(reason)
+    summary = " ".join(result.summary for result in results)
+    return EmailTriageResult(
+        category=category,
+        confidence=sum(result.confidence for result in agreeing) / len(agreeing),
+        summary=summary[:197] + "..." if len(summary) > 200 else summary,
+        suggested_reply=best.suggested_reply,
+        tags=[tag for tag, _ in tags.most_common(8)],
+        needs_human_review=len(agreeing) < len(results)
+        or any(result.needs_human_review for result in results),
+        reasons=reasons[:5],
+    )
+
+
+def _digest(email_text: str, results: List[EmailTriageResult]) -> str:
+    lines = [
+        f"Email longo dividido em {len(results)} partes. Resumo de cada parte:",
+    ]
+    for index, result in enumerate(results, start=1):
+        lines.append(
+            f"Parte {index} [{result.category}, {result.confidence:.2f}]: "
+            f"{result.summary} Motivos: {'; '.join(result.reasons)}"
+        )
+    lines.append("")
+    lines.append("Inicio do email:")
+    lines.append(email_text[:DIGEST_HEAD_CHARS])
+    return "\n".join(lines)
+
+
+def classify_long(llm, email_text: str, model: Optional[str] = None):
+    """Map-reduce triage for emails longer than one LLM call.
+
+    Chunk results are produced concurrently (the LLM service still caps
+    calls process-wide) and merged by one more LLM call over their
+    summaries, falling back to ``merge_results`` if that call fails.
+    """
+    chunks = chunk_paragraphs(email_text, settings.long_email_chunk_chars)
+    dropped = chunks[settings.long_email_max_chunks :]
+    chunks = chunks[: settings.long_email_max_chunks]
+    metrics.incr("long_email_analyses")
+    metrics.incr("long_email_chunks", len(chunks))
+    if dropped:
+        metrics.incr("long_email_chunks_dropped", len(dropped))
+        metrics.incr("long_email_chars_dropped", sum(len(chunk) for chunk in dropped))
+
+    def classify_chunk(index: int, chunk: str) -> EmailTriageResult:
+        header = f"[Parte {index + 1} de {len(chunks)} de um email longo]\n"
+        return llm.classify_and_reply(
+            header + chunk, preprocess_text(chunk).clean_text, model=model
+        )
+
+    started = time.perf_counter()
+    results: List[EmailTriageResult] = []
+    errors: List[LLMServiceError] = []
+    workers = max(1, min(len(chunks), settings.llm_max_concurrency))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                contextvars.copy_context().run, classify_chunk, index, chunk
+            )
+            for index, chunk in enumerate(chunks)
+        ]
+        for future in futures:
+            try:
+                results.append(future.result())
+            except LLMServiceError as exc:
+                errors.append(exc)
+    metrics.observe("long_email_map", time.perf_counter() - started)
+    if errors:
+        metrics.incr("long_email_chunk_errors", len(errors))
+    if not results:
+        raise errors[0]
+
+    started = time.perf_counter()
+    try:
+        merged = llm.classify_and_reply(_digest(email_text, results), "", model=model)
+    except LLMServiceError as exc:
+        logger.warning("Long email merge failed", extra={"error": str(exc)})
+        merged = merge_results(results)
+    metrics.observe("long_email_merge", time.perf_counter() - started)
+    # The merge call only sees the digest, so carry over what the chunks
+    # flagged and don't let it be surer than the chunks that agree with it.
+    # Parts past LONG_EMAIL_MAX_CHUNKS were never read, so a person should.
+    agreeing = [result for result in results if result.category == merged.category]
+    merged.confidence = min(
+        merged.confidence,
+        (
+            sum(result.confidence for result in agreeing) / len(agreeing)
+            if agreeing
+            else 0.5
+        ),
+    )
+    if (
+        errors
+        or dropped
+        or len(agreeing) < len(results)
+        or any(result.needs_human_review for result in results)
+    ):
+        merged.needs_human_review = True
+    return merged
@@ -0,0 +1,170 @@
+import json
+import logging
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.config import settings
+from app.schemas.triage import EmailTriageResult
+from app.services.cascade import TEMPLATE_REPLIES
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+MODES = ("enforce", "dry_run", "off")
+RULE_SOURCE = "rules"
+
+
+@dataclass(frozen=True)
+class Rule:
+    id: str
+    category: str
+    patterns: Tuple[str, ...]
+    summary: str
+    mode: str = "dry_run"
+    max_chars: int = 400
+    confidence: float = 0.95
+
+
+def _keyword(keyword: str) -> str:
+    # Word boundaries only where the keyword itself starts/ends with a word
+    # character, so entries such as "?" still match.
+    escaped = re.escape(keyword.strip())
+    if re.match(r"\w", keyword.strip()):
+        escaped = r"\b" + escaped
+    if re.search(r"\w$", keyword.strip()):
+        escaped += r"\b"
+    return escaped
+
+
+def _alternation(keywords: Sequence[str]) -> str:
+    # Longest first, so "muito obrigado" wins over "obrigado".
+    ordered = sorted({keyword.strip() for keyword in keywords if keyword.strip()})
+    ordered.sort(key=len, reverse=True)
+    return "|".join(_keyword(keyword) for keyword in ordered)
+
+
+class RuleEngine:
+    """Keyword rules for obvious non-actionable emails, run on the raw text.
+
+    All rules are compiled into a single regex alternation with one named
+    group per rule, so a miss costs one scan of the text. Texts longer than
+    every rule's ``max_chars`` are not scanned at all, and an ``exclude``
+    hit (a question, a request) vetoes any rule. Rules in ``dry_run`` only
+    count what they would have done; ``agreed`` counts dry-run hits whose
+    category matched the real analysis, i.e. the rule's precision.
+    """
+
+    def __init__(self, rules: List[Rule], exclude: Sequence[str] = ()) -> None:
+        self.rules = [rule for rule in rules if rule.mode != "off"]
+        for rule in self.rules:
+            if rule.mode not in MODES or rule.category not in TEMPLATE_REPLIES:
+                raise ValueError(f"Invalid rule: {rule.id!r}")
+        self.max_chars = max((rule.max_chars for rule in self.rules), default=0)
+        self._pattern = (
+            re.compile(
+                "|".join(
+                    f"(?P<r{index}>{_alternation(rule.patterns)})"
+                    for index, rule in enumerate(self.rules)
+                ),
+                re.IGNORECASE,
+            )
+            if self.rules
+            else None
+        )
+        self._exclude = (
+            re.compile(_alternation(exclude), re.IGNORECASE)
+            if any(keyword.strip() for keyword in exclude)
+            else None
+        )
+        metrics.register_gauge("rules", self.report)
+
+    @classmethod
+    def load(cls, path: Path) -> "RuleEngine":
+        config = json.loads(path.read_text(encoding="utf-8"))
+        rules = [
+            Rule(
+                id=item["id"],
+                category=item["category"],
+                patterns=tuple(item["patterns"]),
+                summary=item["summary"],
+                mode=item.get("mode", "dry_run"),
+                max_chars=int(item.get("max_chars", 400)),
+                confidence=float(item.get("confidence", 0.95)),
+            )
+            for item in config.get("rules", [])
+        ]
+        return cls(rules, exclude=config.get("exclude", []))
+
+    def match(self, text: str) -> Optional[Rule]:
+        if self._pattern is None or len(text) > self.max_chars:
+            return None
+        # The leftmost hit may belong to a rule too short for this text (a
+        # greeting opening an out-of-office reply); keep scanning.
+        for found in self._pattern.finditer(text):
+            rule = self.rules[int(found.lastgroup[1:])]
+            if len(text) <= rule.max_chars:
+                break
+        else:
+            return None
+        if self._exclude is not None and self._exclude.search(text):
+            metrics.incr(f"rules_{rule.id}_vetoed")
+            return None
+        if rule.mode == "enforce":
+            metrics.incr(f"rules_{rule.id}_hits")
+        else:
+            metrics.incr(f"rules_{rule.id}_dry_run_hits")
+        return rule
+
+    def observe(self, rule: Rule, category: str) -> None:
+        """Record whether a dry-run rule agreed with the real analysis."""
+        if category == rule.category:
+            metrics.incr(f"rules_{rule.id}_agreed")
+
+    def result(self, rule: Rule) -> EmailTriageResult:
+        return EmailTriageResult(
+            category=rule.category,
+            confidence=rule.confidence,
+            summary=rule.summary,
+            suggested_reply=TEMPLATE_REPLIES[rule.category],
+            tags=[rule.category.lower(), RULE_SOURCE, rule.id],
+            needs_human_review=False,
+            reasons=[
+                f"Regra {rule.id} reconheceu o email.",
+                "Classificado sem pre-processamento nem LLM.",
+            ],
+        )
+
+    def report(self) -> Dict[str, Dict[str, object]]:
+        report = {}
+        for rule in self.rules:
+            dry_run = metrics.counter(f"rules_{rule.id}_dry_run_hits")
+            agreed = metrics.counter(f"rules_{rule.id}_agreed")
+            report[rule.id] = {
+                "mode": rule.mode,
+                "hits": metrics.counter(f"rules_{rule.id}_hits"),
+                "dry_run_hits": dry_run,
+                "vetoed": metrics.counter(f"rules_{rule.id}_vetoed"),
+                "precision": agreed / dry_run if dry_run else None,
+            }
+        return report
+
+
+def rules_path() -> Path:
+    if settings.rules_path:
+        return Path(settings.rules_path)
+    return Path(__file__).resolve().parents[2] / "data" / "triage_rules.json"
+
+
+def build_rule_engine() -> Optional[RuleEngine]:
+    if not settings.rules_enabled:
+        return None
+    path = rules_path()
+    if not path.exists():
+        return None
+    try:
+        return RuleEngine.load(path)
+    except (OSError, KeyError, ValueError) as exc:
+        logger.warning("Failed to load triage rules", extra={"error": str(exc)})
+        return None
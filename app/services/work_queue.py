@@ -0,0 +1,272 @@
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Protocol, Tuple
+from urllib.parse import parse_qsl
+
+from app.config import settings
+
+QUEUED, LEASED, DONE, FAILED = "queued", "leased", "done", "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ref TEXT NOT NULL DEFAULT '',
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    visible_at REAL NOT NULL,
+    lease TEXT,
+    result TEXT,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_claimable
+    ON tasks (visible_at) WHERE status IN ('queued', 'leased');
+CREATE INDEX IF NOT EXISTS idx_tasks_ref ON tasks (ref);
+"""
+
+
+@dataclass
+class Task:
+    id: int
+    ref: str
+    payload: str
+    attempts: int
+    # Token of the claim; completing or failing with a stale token is a no-op.
+    lease: str
+
+
+class WorkQueue(Protocol):
+    """What ``app.worker`` needs from a broker.
+
+    A claimed task stays invisible to other workers until its lease expires;
+    a worker that dies without completing it simply lets the lease run out
+    and the task is claimed again. ``attempts`` counts claims, so a task
+    that keeps crashing its worker ends up ``failed`` after ``max_attempts``.
+    """
+
+    def enqueue(self, items: Iterable[Tuple[str, str]]) -> int:
+        """Add ``(ref, payload)`` pairs; return how many were queued."""
+
+    def claim(self, limit: int, lease_seconds: float) -> List[Task]: ...
+
+    def extend(self, tasks: List[Task], lease_seconds: float) -> int: ...
+
+    def complete(self, task: Task, result: str) -> bool: ...
+
+    def fail(self, task: Task, error: str, retry_seconds: float) -> bool: ...
+
+    def release(self, task: Task, delay_seconds: float) -> bool: ...
+
+    def stats(self) -> Dict[str, int]: ...
+
+    def results(
+        self, after_id: int = 0, limit: int = 1000
+    ) -> List[Tuple[int, str, str]]: ...
+
+
+class SQLiteWorkQueue:
+    """Work queue in a SQLite (WAL) file, for one machine or a shared disk.
+
+    Claims take a short ``BEGIN IMMEDIATE`` transaction that leases up to
+    ``limit`` tasks at once, so the write lock is held for one statement
+    per batch rather than per task and workers spend their time analyzing,
+    not waiting on each other. ``visible_at`` is the single clock: the
+    enqueue time for queued tasks, the lease expiry for leased ones and the
+    retry time for failed attempts.
+
+    WAL needs shared memory between the processes, so a queue on a network
+    filesystem must use ``journal_mode="DELETE"``.
+    """
+
+    def __init__(
+        self, path: Path, max_attempts: int = 3, journal_mode: str = "WAL"
+    ) -> None:
+        if journal_mode.upper() not in ("WAL", "DELETE"):
+            raise ValueError(f"Unsupported journal mode: {journal_mode!r}")
+        self.path = path
+        self.max_attempts = max(1, max_attempts)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute(f"PRAGMA journal_mode={journal_mode.upper()}")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout=30000")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def enqueue(self, items: Iterable[Tuple[str, str]]) -> int:
+        now, created = time.time(), datetime.utcnow().isoformat()
+        rows = [(ref, payload, now, created) for ref, payload in items]
+        if not rows:
+            return 0
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT INTO tasks (ref, payload, visible_at, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def claim(self, limit: int, lease_seconds: float) -> List[Task]:
+        now = time.time()
+        lease = uuid.uuid4().hex
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Leases that ran out this many times mean the task kills
+                # its worker; stop handing it out.
+                conn.execute(
+                    "UPDATE tasks SET status = ?, error = ?, finished_at = ? "
+                    "WHERE status = ? AND visible_at <= ? AND attempts >= ?",
+                    (
+                        FAILED,
+                        "lease expired too many times",
+                        datetime.utcnow().isoformat(),
+                        LEASED,
+                        now,
+                        self.max_attempts,
+                    ),
+                )
+                rows = conn.execute(
+                    "UPDATE tasks SET status = ?, lease = ?, visible_at = ?, "
+                    "attempts = attempts + 1 WHERE id IN ("
+                    "SELECT id FROM tasks WHERE status IN (?, ?) "
+                    "AND visible_at <= ? ORDER BY visible_at, id LIMIT ?) "
+                    "RETURNING id, ref, payload, attempts",
+                    (LEASED, lease, now + lease_seconds, QUEUED, LEASED, now, limit),
+                ).fetchall()
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        rows.sort()
+        return [
+            Task(id, ref, payload, attempts, lease)
+            for id, ref, payload, attempts in rows
+        ]
+
+    def extend(self, tasks: List[Task], lease_seconds: float) -> int:
+        if not tasks:
+            return 0
+        visible_at = time.time() + lease_seconds
+        with closing(self._connect()) as conn:
+            cursor = conn.executemany(
+                "UPDATE tasks SET visible_at = ? "
+                "WHERE id = ? AND lease = ? AND status = ?",
+                [(visible_at, task.id, task.lease, LEASED) for task in tasks],
+            )
+            return cursor.rowcount
+
+    def complete(self, task: Task, result: str) -> bool:
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = ?, result = ?, error = NULL, "
+                "lease = NULL, finished_at = ? "
+                "WHERE id = ? AND lease = ? AND status = ?",
+                (
+                    DONE,
+                    result,
+                    datetime.utcnow().isoformat(),
+                    task.id,
+                    task.lease,
+                    LEASED,
+                ),
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, task: Task, error: str, retry_seconds: float) -> bool:
+        """Queue the task again after ``retry_seconds``, or mark it failed."""
+        if task.attempts >= self.max_attempts:
+            status, finished, visible_at = FAILED, datetime.utcnow().isoformat(), 0.0
+        else:
+            status, finished = QUEUED, None
+            visible_at = time.time() + retry_seconds * task.attempts
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = ?, error = ?, lease = NULL, "
+                "visible_at = ?, finished_at = ? "
+                "WHERE id = ? AND lease = ? AND status = ?",
+                (status, error, visible_at, finished, task.id, task.lease, LEASED),
+            )
+            return cursor.rowcount == 1
+
+    def release(self, task: Task, delay_seconds: float) -> bool:
+        """Queue the task again after ``delay_seconds`` without using an attempt."""
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = ?, lease = NULL, visible_at = ?, "
+                "attempts = MAX(attempts - 1, 0) "
+                "WHERE id = ? AND lease = ? AND status = ?",
+                (QUEUED, time.time() + delay_seconds, task.id, task.lease, LEASED),
+            )
+            return cursor.rowcount == 1
+
+    def stats(self) -> Dict[str, int]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) FROM tasks GROUP BY status"
+            ).fetchall()
+        counts = {status: 0 for status in (QUEUED, LEASED, DONE, FAILED)}
+        counts.update(dict(rows))
+        return counts
+
+    def results(
+        self, after_id: int = 0, limit: int = 1000
+    ) -> List[Tuple[int, str, str]]:
+        """``(id, ref, result)`` of finished tasks, in id order."""
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "SELECT id, ref, result FROM tasks WHERE id > ? AND status = ? "
+                "ORDER BY id LIMIT ?",
+                (after_id, DONE, limit),
+            ).fetchall()
+
+
+def _sqlite_queue(location: str) -> SQLiteWorkQueue:
+    path, _, query = location.partition("?")
+    options = dict(parse_qsl(query))
+    return SQLiteWorkQueue(
+        Path(path),
+        max_attempts=settings.worker_max_attempts,
+        journal_mode=options.get("journal", "WAL"),
+    )
+
+
+# Scheme of WORK_QUEUE_URL -> factory taking the rest of the URL. Other
+# brokers register here.
+BACKENDS: Dict[str, Callable[[str], WorkQueue]] = {"sqlite": _sqlite_queue}
+
+
+def register_backend(scheme: str, factory: Callable[[str], WorkQueue]) -> None:
+    BACKENDS[scheme] = factory
+
+
+def work_queue_url() -> str:
+    if settings.work_queue_url:
+        return settings.work_queue_url
+    path = Path(__file__).resolve().parents[2] / "data" / "work_queue.db"
+    return f"sqlite:///{path}"
+
+
+def open_work_queue(url: Optional[str] = None) -> WorkQueue:
+    """Open a queue URL, e.g. ``sqlite:////mnt/shared/queue.db?journal=delete``."""
+    url = url or work_queue_url()
+    scheme, separator, location = url.partition("://")
+    if not separator or scheme not in BACKENDS:
+        raise ValueError(f"Unsupported work queue URL: {url!r}")
+    return BACKENDS[scheme](location[1:] if location.startswith("/") else location)
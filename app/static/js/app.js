@@ -306,14 +306,25 @@ function wireForm() {
 }
 
 function initFromServer() {
-  const raw = byId("server-result");
-  if (!raw) return;
-  try {
-    const data = JSON.parse(raw.textContent || "{}");
-    if (data.result) renderResult(data);
-  } catch (err) {
-    return;
-  }
+  // POST /analyze (form without JS) renders the card on the server; rebuild
+  // the state that feedback and history need from it instead of a payload.
+  const card = byId("result-card");
+  const feedback = document.querySelector(".feedback");
+  const emailHash = feedback ? feedback.dataset.emailHash : "";
+  if (!card || !emailHash) return;
+  const confidence = Number(card.dataset.confidence || 0);
+  lastResult = {
+    email_hash: emailHash,
+    source: byId("result-source").textContent.trim(),
+    result: {
+      category: byId("result-category").textContent.trim(),
+      summary: byId("result-summary").textContent,
+      confidence,
+    },
+  };
+  const confidenceFill = byId("result-confidence-fill");
+  if (confidenceFill) confidenceFill.style.width = `${Math.round(confidence * 100)}%`;
+  pushHistory(lastResult);
 }
 
 document.addEventListener("DOMContentLoaded", () => {
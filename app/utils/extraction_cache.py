@@ -0,0 +1,124 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionCache:
+    """LRU of normalized upload text keyed by the SHA-256 of the raw bytes."""
+
+    def __init__(
+        self,
+        max_bytes: int,
+        directory: Optional[Path] = None,
+        max_disk_bytes: int = 0,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        if directory is not None:
+            directory.mkdir(parents=True, exist_ok=True)
+
+    def get(self, digest: str, raw_size: int) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                self._entries.move_to_end(digest)
+        text = entry[0] if entry is not None else None
+        if text is None:
+            text = self._read_disk(digest)
+            if text is not None:
+                self._remember(digest, text)
+        with self._lock:
+            if text is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.bytes_saved += raw_size
+        return text
+
+    def put(self, digest: str, text: str) -> None:
+        self._remember(digest, text)
+        self._write_disk(digest, text)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "bytes_saved": self.bytes_saved,
+                "entries": len(self._entries),
+                "size_bytes": self._size,
+            }
+
+    def _remember(self, digest: str, text: str) -> None:
+        size = len(text.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(digest, None)
+            if previous is not None:
+                self._size -= previous[1]
+            self._entries[digest] = (text, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+    def _path(self, digest: str) -> Path:
+        return self.directory / f"{digest}.txt"
+
+    def _read_disk(self, digest: str) -> Optional[str]:
+        if self.directory is None:
+            return None
+        path = self._path(digest)
+        try:
+            text = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        except OSError as exc:
+            logger.warning("Extraction cache read failed", extra={"error": str(exc)})
+            return None
+        os.utime(path)
+        return text
+
+    def _write_disk(self, digest: str, text: str) -> None:
+        if self.directory is None:
+            return
+        path = self._path(digest)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            tmp_path.write_text(text, encoding="utf-8")
+            os.replace(tmp_path, path)
+            self._trim_disk()
+        except OSError as exc:
+            logger.warning("Extraction cache write failed", extra={"error": str(exc)})
+
+    def _trim_disk(self) -> None:
+        files = []
+        total = 0
+        for path in self.directory.glob("*.txt"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        files.sort()
+        for _, size, path in files:
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
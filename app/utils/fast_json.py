@@ -0,0 +1,41 @@
+from typing import Any, Union
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional: plain payloads fall back to json.dumps
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response that skips FastAPI's validate/encode round trip.
+
+    Pydantic models are serialized straight to bytes by their compiled
+    serializer; other payloads go through orjson when it is installed.
+    Routes returning this keep ``response_model`` for the OpenAPI schema.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        if orjson is not None:
+            return orjson.dumps(content)
+        return super().render(content)
+
+
+def extract_json_object(text: Union[str, bytes]) -> Union[str, bytes]:
+    """Slice the outermost ``{...}`` out of an LLM reply.
+
+    Covers Markdown fences and chatter around the object without splitting
+    lines; the slice is left to the model's JSON validator.
+    """
+    opening, closing = ("{", "}") if isinstance(text, str) else (b"{", b"}")
+    start = text.find(opening)
+    end = text.rfind(closing)
+    if start == -1 or end < start:
+        return text
+    if start == 0 and end == len(text) - 1:
+        return text
+    return text[start : end + 1]
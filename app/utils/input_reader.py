@@ -18,3 +18,10 @@ async def extract_text_from_input(
         return validate_text_input(text_input), None
 
     raise UploadValidationError("Envie um arquivo ou cole o texto.")
+
+
+def input_type(source_file: Optional[str]) -> str:
+    """``text``, ``pdf`` or ``txt`` for the ``input_type`` of a response."""
+    if not source_file:
+        return "text"
+    return "pdf" if source_file.lower().endswith(".pdf") else "txt"
@@ -0,0 +1,101 @@
+import json
+from typing import Any, Dict, List, Tuple, Union
+
+from app.utils.fast_json import extract_json_object
+
+TAG_FILLERS = ("triagem", "email", "revisar")
+REASON_FILLER = "Resposta do LLM ajustada automaticamente."
+CATEGORIES = {"produtivo": "Produtivo", "improdutivo": "Improdutivo"}
+
+
+def _text(value: Any) -> str:
+    return value.strip() if isinstance(value, str) else str(value or "").strip()
+
+
+def _items(value: Any) -> List[str]:
+    if isinstance(value, str):
+        value = value.replace(";", ",").split(",")
+    if not isinstance(value, list):
+        return []
+    return [_text(item) for item in value if _text(item)]
+
+
+def _clip(value: str, limit: int) -> str:
+    return value if len(value) <= limit else value[: limit - 3].rstrip() + "..."
+
+
+def repair_triage_payload(
+    text: Union[str, bytes],
+) -> Tuple[Dict[str, Any], List[str]]:
+    """Coerce a near-miss LLM reply into the ``EmailTriageResult`` shape.
+
+    Returns the repaired payload and the names of the fields that were
+    touched. Only mechanical fixes are applied: the category must still be
+    recognizable, and anything padded marks the result for human review.
+    Raises ``ValueError`` when the reply holds no usable JSON object.
+    """
+    data = json.loads(extract_json_object(text))
+    if not isinstance(data, dict):
+        raise ValueError("LLM reply is not a JSON object")
+    repaired: List[str] = []
+
+    category = CATEGORIES.get(_text(data.get("category")).lower())
+    if category is None:
+        raise ValueError(f"Unknown category: {data.get('category')!r}")
+    if category != data.get("category"):
+        repaired.append("category")
+
+    try:
+        confidence = float(data.get("confidence"))
+    except (TypeError, ValueError):
+        confidence = 0.5
+    clamped = min(max(confidence, 0.0), 1.0)
+    if clamped != data.get("confidence"):
+        repaired.append("confidence")
+
+    summary = _clip(_text(data.get("summary")), 200)
+    if summary != data.get("summary"):
+        repaired.append("summary")
+    reply = _clip(_text(data.get("suggested_reply")), 700)
+    if reply != data.get("suggested_reply"):
+        repaired.append("suggested_reply")
+
+    needs_review = data.get("needs_human_review")
+    if not isinstance(needs_review, bool):
+        needs_review = _text(needs_review).lower() in ("true", "1", "sim", "yes")
+        repaired.append("needs_human_review")
+
+    tags: List[str] = []
+    for tag in _items(data.get("tags")):
+        if tag.lower() not in tags:
+            tags.append(tag.lower())
+    padded = len(tags) < 3
+    for filler in (category.lower(), *TAG_FILLERS):
+        if len(tags) >= 3:
+            break
+        if filler not in tags:
+            tags.append(filler)
+    if tags[:8] != data.get("tags"):
+        repaired.append("tags")
+
+    reasons = _items(data.get("reasons"))[:5]
+    if len(reasons) < 2:
+        padded = True
+        if not reasons:
+            reasons.append(f"Classificado como {category}.")
+        reasons.append(REASON_FILLER)
+    if reasons != data.get("reasons"):
+        repaired.append("reasons")
+
+    return (
+        {
+            "category": category,
+            "confidence": clamped,
+            "summary": summary,
+            "suggested_reply": reply,
+            "tags": tags[:8],
+            "needs_human_review": needs_review or padded,
+            "reasons": reasons,
+        },
+        repaired,
+    )
@@ -0,0 +1,168 @@
+import hashlib
+import secrets
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Callable, Dict, Iterator, Optional
+
+from app.config import settings
+from app.utils.metrics import metrics
+
+MAX_CLIENTS = 1000
+TOP_CLIENTS = 20
+
+
+@dataclass(slots=True)
+class LLMUsage:
+    calls: int = 0
+    prompt_tokens: int = 0
+    response_tokens: int = 0
+    latency: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.response_tokens
+
+    def add(self, other: "LLMUsage") -> None:
+        self.calls += other.calls
+        self.prompt_tokens += other.prompt_tokens
+        self.response_tokens += other.response_tokens
+        self.latency += other.latency
+
+
+# Usage of the analysis running in this context. The analyzer opens a tally
+# per analysis; LLM calls made in worker threads inherit it through
+# ``contextvars.copy_context``.
+_current: ContextVar[Optional[LLMUsage]] = ContextVar("llm_usage", default=None)
+_current_lock = threading.Lock()  # chunks of a long email record concurrently
+
+
+@contextmanager
+def tally() -> Iterator[LLMUsage]:
+    usage = LLMUsage()
+    token = _current.set(usage)
+    try:
+        yield usage
+    finally:
+        _current.reset(token)
+
+
+def _cost(usage: LLMUsage) -> float:
+    return (
+        usage.prompt_tokens * settings.llm_price_per_1k_prompt_tokens
+        + usage.response_tokens * settings.llm_price_per_1k_response_tokens
+    ) / 1000
+
+
+def _bucket(usage: LLMUsage) -> Dict[str, float]:
+    return {**asdict(usage), "cost": _cost(usage)}
+
+
+class UsageLedger:
+    """Aggregates LLM usage per model, route, source and client.
+
+    Calls are counted once, when they return; an analysis is attributed
+    to the route and client of the request that ran it (coalesced waiters
+    add nothing). Clients are kept by IP hashed with a per-process salt, so
+    the keys published on ``/metrics`` can't be reversed by enumerating
+    addresses; the least recent are dropped past ``max_clients``. The daily
+    budget is per process and resets at UTC midnight.
+    """
+
+    def __init__(
+        self,
+        daily_token_budget: int = 0,
+        max_clients: int = MAX_CLIENTS,
+        today: Callable[[], str] = lambda: datetime.utcnow().date().isoformat(),
+    ) -> None:
+        self.daily_token_budget = daily_token_budget
+        self.max_clients = max_clients
+        self.today = today
+        self._lock = threading.Lock()
+        self._day = today()
+        self._day_usage = LLMUsage()
+        self._models: Dict[str, LLMUsage] = {}
+        self._routes: Dict[str, LLMUsage] = {}
+        self._sources: Dict[str, LLMUsage] = {}
+        self._clients: "OrderedDict[str, LLMUsage]" = OrderedDict()
+        self._salt = secrets.token_bytes(16)
+
+    def _roll_day(self) -> None:
+        day = self.today()
+        if day != self._day:
+            self._day, self._day_usage = day, LLMUsage()
+
+    def record_call(self, model: str, usage: LLMUsage) -> None:
+        with self._lock:
+            self._roll_day()
+            self._day_usage.add(usage)
+            self._models.setdefault(model, LLMUsage()).add(usage)
+
+    def attribute(self, route: str, source: str, client: str, usage: LLMUsage) -> None:
+        if not usage.calls:
+            return
+        key = hashlib.sha256(self._salt + client.encode("utf-8")).hexdigest()[:12]
+        with self._lock:
+            self._routes.setdefault(route, LLMUsage()).add(usage)
+            self._sources.setdefault(source, LLMUsage()).add(usage)
+            self._clients.setdefault(key, LLMUsage()).add(usage)
+            self._clients.move_to_end(key)
+            while len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+
+    def budget_exhausted(self) -> bool:
+        if not self.daily_token_budget:
+            return False
+        with self._lock:
+            self._roll_day()
+            return self._day_usage.total_tokens >= self.daily_token_budget
+
+    def report(self) -> Dict[str, object]:
+        with self._lock:
+            self._roll_day()
+            clients = sorted(
+                self._clients.items(),
+                key=lambda item: item[1].total_tokens,
+                reverse=True,
+            )[:TOP_CLIENTS]
+            return {
+                "today": {
+                    "date": self._day,
+                    **_bucket(self._day_usage),
+                    "budget": self.daily_token_budget,
+                },
+                "by_model": {k: _bucket(v) for k, v in self._models.items()},
+                "by_route": {k: _bucket(v) for k, v in self._routes.items()},
+                "by_source": {k: _bucket(v) for k, v in self._sources.items()},
+                "by_client": {k: _bucket(v) for k, v in clients},
+            }
+
+
+_ledger: Optional[UsageLedger] = None
+
+
+def get_usage_ledger() -> UsageLedger:
+    global _ledger
+    if _ledger is None:
+        _ledger = UsageLedger(daily_token_budget=settings.llm_daily_token_budget)
+        metrics.register_gauge("llm_usage", _ledger.report)
+    return _ledger
+
+
+def record_call(
+    model: str, prompt_tokens: int, response_tokens: int, latency: float
+) -> None:
+    """Account one LLM call globally and on the current analysis, if any."""
+    usage = LLMUsage(1, prompt_tokens, response_tokens, latency)
+    metrics.incr("llm_calls")
+    metrics.incr("llm_prompt_tokens", prompt_tokens)
+    metrics.incr("llm_response_tokens", response_tokens)
+    metrics.observe("llm_call", latency)
+    get_usage_ledger().record_call(model, usage)
+    current = _current.get()
+    if current is not None:
+        with _current_lock:
+            current.add(usage)
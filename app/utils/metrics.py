@@ -0,0 +1,84 @@
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict
+
+
+class _Timing:
+    __slots__ = ("count", "total", "max", "recent")
+
+    def __init__(self, window: int) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: Deque[float] = deque(maxlen=window)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.recent.append(value)
+
+    def snapshot(self) -> Dict[str, float]:
+        ordered = sorted(self.recent)
+        return {
+            "count": self.count,
+            "avg": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": _percentile(ordered, 0.50),
+            "p95": _percentile(ordered, 0.95),
+        }
+
+
+def _percentile(ordered, fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Metrics:
+    def __init__(self, window: int = 512) -> None:
+        self.window = window
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {}
+        self._timings: Dict[str, _Timing] = {}
+        self._gauges: Dict[str, Callable[[], object]] = {}
+
+    def register_gauge(self, name: str, read: Callable[[], object]) -> None:
+        with self._lock:
+            self._gauges[name] = read
+
+    def incr(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                timing = self._timings[name] = _Timing(self.window)
+            timing.add(seconds)
+
+    def counter(self, name: str) -> int:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            snapshot = {
+                "counters": dict(self._counters),
+                "timings": {
+                    name: timing.snapshot() for name, timing in self._timings.items()
+                },
+            }
+            gauges = dict(self._gauges)
+        snapshot["gauges"] = {name: read() for name, read in gauges.items()}
+        return snapshot
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+
+metrics = Metrics()
@@ -0,0 +1,105 @@
+import gzip
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from markupsafe import Markup, escape
+
+from app.schemas.triage import TriageResponse
+
+# Per-request values are rendered as these markers once, then substituted.
+_CSRF = "__shell_csrf_token__"
+_NONCE = "__shell_csp_nonce__"
+_ERROR = "__shell_error__"
+_CARD = "__shell_result_card__"
+
+GZIP_LEVEL = 6
+
+
+def create_environment(
+    directory: Path, cache_dir: Optional[Path] = None
+) -> Environment:
+    """Jinja environment with on-disk bytecode cache and no mtime checks."""
+    if cache_dir is not None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+    return Environment(
+        loader=FileSystemLoader(str(directory)),
+        autoescape=True,
+        auto_reload=False,
+        bytecode_cache=FileSystemBytecodeCache(
+            str(cache_dir) if cache_dir is not None else None
+        ),
+    )
+
+
+class PageShell:
+    """``index.html`` rendered once per variant, filled in per request.
+
+    Only the CSRF token, the CSP nonce, an error and the result card change
+    between requests, so the page is rendered once with markers in their
+    place and each request does a few string replacements. The empty card
+    is cached too; a card with a result is the only per-request render.
+    """
+
+    def __init__(
+        self,
+        env: Environment,
+        context: Dict[str, object],
+        template: str = "index.html",
+        card_template: str = "components/result_card.html",
+    ) -> None:
+        self.env = env
+        self.context = context
+        self.template = env.get_template(template)
+        self.card_template = env.get_template(card_template)
+        self.empty_card = self.card_template.render(result=None, result_meta=None)
+        self._shells: Dict[Tuple[bool, bool], str] = {}
+
+    def _shell(self, has_error: bool, has_result: bool) -> str:
+        key = (has_error, has_result)
+        shell = self._shells.get(key)
+        if shell is None:
+            shell = self._shells[key] = self.template.render(
+                **self.context,
+                csrf_token=_CSRF,
+                csp_nonce=_NONCE,
+                error=_ERROR if has_error else None,
+                has_result=has_result,
+                result_card=Markup(_CARD),
+            )
+        return shell
+
+    def render(
+        self,
+        csrf_token: str,
+        csp_nonce: str,
+        error: Optional[str] = None,
+        result: Optional[TriageResponse] = None,
+    ) -> str:
+        card = (
+            self.card_template.render(result=result.result, result_meta=result)
+            if result is not None
+            else self.empty_card
+        )
+        page = (
+            self._shell(bool(error), result is not None)
+            .replace(_CSRF, csrf_token)
+            .replace(_NONCE, csp_nonce)
+        )
+        # Text that can carry user input goes in last, so nothing inside it
+        # is ever taken for a marker.
+        if error:
+            page = page.replace(_ERROR, str(escape(error)))
+        return page.replace(_CARD, card)
+
+
+def gzip_body(
+    body: bytes, accept_encoding: str, min_bytes: int
+) -> Tuple[bytes, Dict[str, str]]:
+    """Gzip ``body`` when the client accepts it and it is large enough."""
+    if len(body) < min_bytes or "gzip" not in accept_encoding.lower():
+        return body, {}
+    return gzip.compress(body, compresslevel=GZIP_LEVEL), {
+        "Content-Encoding": "gzip",
+        "Vary": "Accept-Encoding",
+    }
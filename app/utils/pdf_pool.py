@@ -0,0 +1,284 @@
+import logging
+import multiprocessing
+import signal
+import threading
+import time
+from dataclasses import dataclass
+from multiprocessing.connection import Connection, wait
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.config import settings
+from app.utils.metrics import metrics
+from app.utils.pdf_reader import (
+    PdfTextLimitError,
+    iter_pages,
+    normalized_length,
+    open_pdf,
+)
+
+logger = logging.getLogger(__name__)
+
+_PAYLOAD_COMMANDS = ("open", "reopen_pages")
+
+
+@dataclass
+class PdfExtraction:
+    text: str
+    page_count: int
+    page_seconds: Dict[int, float]
+
+
+def _worker_main(conn: Connection) -> None:
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    reader = None
+    while True:
+        try:
+            message = conn.recv()
+            # PDF payloads follow their command as a raw buffer, not a pickle.
+            file_bytes = None
+            if message[0] in _PAYLOAD_COMMANDS:
+                file_bytes = conn.recv_bytes()
+        except (EOFError, OSError):
+            return
+        kind = message[0]
+        if kind == "stop":
+            return
+        try:
+            if kind == "open":
+                _, max_pages = message
+                reader = open_pdf(file_bytes, max_pages)
+                conn.send(("meta", len(reader.pages)))
+            elif kind in ("pages", "reopen_pages"):
+                _, max_pages, start, stop, max_chars = message
+                if file_bytes is not None:
+                    reader = open_pdf(file_bytes, max_pages)
+                total = 0
+                for index, text, elapsed in iter_pages(reader, start, stop):
+                    conn.send(("page", index, text, elapsed))
+                    total += normalized_length(text)
+                    if total > max_chars:
+                        break
+                reader = None
+                conn.send(("done",))
+        except Exception as exc:  # noqa: BLE001
+            reader = None
+            conn.send(("error", str(exc)))
+
+
+def _split_pages(page_count: int, parts: int) -> List[Tuple[int, int]]:
+    size, extra = divmod(page_count, parts)
+    ranges = []
+    start = 0
+    for index in range(parts):
+        stop = start + size + (1 if index < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+class _Worker:
+    def __init__(self, context) -> None:
+        parent_conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn,), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(("stop",))
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=1)
+        self.conn.close()
+
+
+class PdfWorkerPool:
+    """Pre-forked PDF extraction workers that can be killed on timeout."""
+
+    def __init__(self, size: int, start_method: Optional[str] = None) -> None:
+        self.size = max(1, size)
+        if start_method is None:
+            methods = multiprocessing.get_all_start_methods()
+            start_method = "fork" if "fork" in methods else "spawn"
+        self._context = multiprocessing.get_context(start_method)
+        self._cond = threading.Condition()
+        self._idle: List[_Worker] = []
+        self._started = False
+        self._closed = False
+
+    def start(self) -> None:
+        with self._cond:
+            if self._started:
+                return
+            self._idle = [_Worker(self._context) for _ in range(self.size)]
+            self._started = True
+            self._closed = False
+
+    def shutdown(self) -> None:
+        with self._cond:
+            workers, self._idle = self._idle, []
+            self._started = False
+            self._closed = True
+            self._cond.notify_all()
+        for worker in workers:
+            worker.stop()
+
+    def _acquire(self, deadline: float) -> _Worker:
+        with self._cond:
+            while not self._idle:
+                remaining = deadline - time.monotonic()
+                if self._closed or remaining <= 0:
+                    raise TimeoutError("Nenhum worker de PDF disponivel.")
+                self._cond.wait(remaining)
+            return self._idle.pop()
+
+    def _try_acquire(self) -> Optional[_Worker]:
+        with self._cond:
+            return self._idle.pop() if self._idle else None
+
+    def _release(self, worker: _Worker) -> None:
+        with self._cond:
+            if self._closed:
+                worker.stop()
+                return
+            self._idle.append(worker)
+            self._cond.notify()
+
+    def _replace(self, worker: _Worker) -> None:
+        worker.kill()
+        if self._closed:
+            return
+        self._release(_Worker(self._context))
+
+    def extract(
+        self, file_bytes, max_pages: int, max_chars: int, timeout: float
+    ) -> PdfExtraction:
+        self.start()
+        deadline = time.monotonic() + timeout
+        primary = self._acquire(deadline)
+        pending: Set[_Worker] = {primary}
+        try:
+            primary.conn.send(("open", max_pages))
+            primary.conn.send_bytes(file_bytes)
+            message = self._recv(primary, deadline)
+            if message[0] == "error":
+                pending.discard(primary)
+                self._release(primary)
+                raise ValueError(message[1])
+            page_count = message[1]
+
+            helpers: List[_Worker] = []
+            while len(helpers) + 1 < min(self.size, page_count):
+                helper = self._try_acquire()
+                if helper is None:
+                    break
+                helpers.append(helper)
+                pending.add(helper)
+
+            ranges = _split_pages(page_count, len(helpers) + 1)
+            start, stop = ranges[0]
+            primary.conn.send(("pages", max_pages, start, stop, max_chars))
+            for helper, (start, stop) in zip(helpers, ranges[1:]):
+                helper.conn.send(("reopen_pages", max_pages, start, stop, max_chars))
+                helper.conn.send_bytes(file_bytes)
+
+            return self._collect(pending, page_count, max_chars, deadline)
+        except TimeoutError:
+            metrics.incr("pdf_worker_timeouts", len(pending))
+            raise
+        except PdfTextLimitError:
+            metrics.incr("pdf_early_stops")
+            raise
+        finally:
+            for worker in pending:
+                self._replace(worker)
+
+    def _recv(self, worker: _Worker, deadline: float):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not worker.conn.poll(remaining):
+            raise TimeoutError("Tempo excedido ao ler PDF.")
+        try:
+            return worker.conn.recv()
+        except (EOFError, OSError) as exc:
+            raise ValueError("Worker de PDF encerrado.") from exc
+
+    def _collect(
+        self,
+        pending: Set[_Worker],
+        page_count: int,
+        max_chars: int,
+        deadline: float,
+    ) -> PdfExtraction:
+        pages: Dict[int, str] = {}
+        page_seconds: Dict[int, float] = {}
+        total = -1
+        while pending:
+            remaining = deadline - time.monotonic()
+            by_conn = {worker.conn: worker for worker in pending}
+            ready = wait(list(by_conn), remaining) if remaining > 0 else []
+            if not ready:
+                raise TimeoutError("Tempo excedido ao ler PDF.")
+            for conn in ready:
+                worker = by_conn[conn]
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError) as exc:
+                    raise ValueError("Worker de PDF encerrado.") from exc
+                kind = message[0]
+                if kind == "page":
+                    _, index, text, elapsed = message
+                    pages[index] = text
+                    page_seconds[index] = elapsed
+                    metrics.observe("pdf_page_seconds", elapsed)
+                    length = normalized_length(text)
+                    if length:
+                        total += length + 1
+                    if total > max_chars:
+                        raise PdfTextLimitError("Texto maior que o limite permitido.")
+                elif kind == "done":
+                    pending.discard(worker)
+                    self._release(worker)
+                elif kind == "error":
+                    pending.discard(worker)
+                    self._release(worker)
+                    raise ValueError(message[1])
+
+        logger.debug(
+            "PDF extracted",
+            extra={"pages": page_count, "page_seconds": page_seconds},
+        )
+        text = "\n".join(pages[index] for index in sorted(pages)).strip()
+        return PdfExtraction(
+            text=text, page_count=page_count, page_seconds=page_seconds
+        )
+
+
+_pool: Optional[PdfWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pdf_pool() -> PdfWorkerPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PdfWorkerPool(settings.pdf_workers)
+        return _pool
+
+
+def shutdown_pdf_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
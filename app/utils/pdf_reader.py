@@ -1,18 +1,41 @@
+import re
+import time
 from io import BytesIO
+from typing import Iterator, Tuple
 
 from PyPDF2 import PdfReader
 
 
+class PdfTextLimitError(ValueError):
+    pass
+
+
+def open_pdf(file_bytes: bytes, max_pages: int) -> PdfReader:
+    reader = PdfReader(BytesIO(file_bytes))
+    if reader.is_encrypted:
+        raise ValueError("PDF protegido")
+    if len(reader.pages) > max_pages:
+        raise ValueError("PDF acima do limite de paginas")
+    return reader
+
+
+def iter_pages(
+    reader: PdfReader, start: int, stop: int
+) -> Iterator[Tuple[int, str, float]]:
+    for index in range(start, stop):
+        started = time.perf_counter()
+        text = reader.pages[index].extract_text() or ""
+        yield index, text, time.perf_counter() - started
+
+
+def normalized_length(text: str) -> int:
+    return len(re.sub(r"\s+", " ", text).strip())
+
+
 def read_pdf(file_bytes: bytes, max_pages: int) -> str:
     try:
-        reader = PdfReader(BytesIO(file_bytes))
-        if reader.is_encrypted:
-            raise ValueError("PDF protegido")
-        if len(reader.pages) > max_pages:
-            raise ValueError("PDF acima do limite de paginas")
-        pages = []
-        for page in reader.pages[:max_pages]:
-            pages.append(page.extract_text() or "")
+        reader = open_pdf(file_bytes, max_pages)
+        pages = [text for _, text, _ in iter_pages(reader, 0, len(reader.pages))]
         return "\n".join(pages).strip()
     except Exception as exc:  # noqa: BLE001
         raise ValueError("PDF invalido") from exc
@@ -1,5 +1,6 @@
 import re
-from typing import Dict, List
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Tuple
 
 import nltk
 from nltk.corpus import stopwords
@@ -54,19 +55,49 @@ def _strip_noise_lines(text: str) -> str:
     return "\n".join(cleaned)
 
 
-def preprocess_text(text: str) -> Dict[str, object]:
+@lru_cache(maxsize=1)
+def _resources() -> Tuple[FrozenSet[str], RSLPStemmer]:
+    # Loaded once per process: the stemmer reads its rule files on creation.
     _ensure_nltk()
+    return frozenset(stopwords.words("portuguese")), RSLPStemmer()
+
+
+class ProcessedText:
+    """Output of ``preprocess_text``.
+
+    Only the cleaned text and two counts are kept; ``tokens`` is split from
+    ``clean_text`` on demand. Item access (``processed["clean_text"]``)
+    still works for callers written against the old dict.
+    """
+
+    __slots__ = ("clean_text", "num_chars", "num_words")
+
+    def __init__(self, clean_text: str, num_chars: int, num_words: int) -> None:
+        self.clean_text = clean_text
+        self.num_chars = num_chars
+        self.num_words = num_words
+
+    @property
+    def tokens(self) -> List[str]:
+        return self.clean_text.split()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"num_chars": self.num_chars, "num_words": self.num_words}
+
+    def __getitem__(self, key: str) -> object:
+        if key not in ("clean_text", "tokens", "stats"):
+            raise KeyError(key)
+        return getattr(self, key)
+
+
+def preprocess_text(text: str) -> ProcessedText:
+    stop_words, stemmer = _resources()
     original = text.strip()
     cleaned_lines = _strip_noise_lines(original)
     normalized = re.sub(r"\s+", " ", cleaned_lines.lower()).strip()
     tokens = re.findall(r"[a-zA-Z0-9]+", normalized)
-    stop_words = set(stopwords.words("portuguese"))
-    stemmer = RSLPStemmer()
-    filtered = [token for token in tokens if token not in stop_words]
-    stemmed = [stemmer.stem(token) for token in filtered]
-    clean_text = " ".join(stemmed)
-    stats = {
-        "num_chars": len(original),
-        "num_words": len(tokens),
-    }
-    return {"clean_text": clean_text, "tokens": stemmed, "stats": stats}
+    clean_text = " ".join(
+        stemmer.stem(token) for token in tokens if token not in stop_words
+    )
+    return ProcessedText(clean_text, len(original), len(tokens))
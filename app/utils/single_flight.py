@@ -0,0 +1,56 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, TypeVar
+
+from app.utils.metrics import metrics
+
+T = TypeVar("T")
+
+
+class _Flight(Generic[T]):
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task[T]") -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight(Generic[T]):
+    """Coalesces concurrent calls that share a key into one execution.
+
+    Every waiter receives the same result or the same exception. A waiter
+    being cancelled only detaches that waiter; the shared call is cancelled
+    once no waiters are left. Completed calls are forgotten immediately, so
+    this never acts as a cache.
+    """
+
+    def __init__(self, counter: str) -> None:
+        self.counter = counter
+        self._flights: Dict[str, _Flight[T]] = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(func()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _task: self._forget(key, flight))
+        else:
+            metrics.incr(self.counter)
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _forget(self, key: str, flight: _Flight[T]) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.task.cancelled():
+            # Mark the exception as retrieved when every waiter has gone.
+            flight.task.exception()
@@ -0,0 +1,144 @@
+import gzip
+import hashlib
+import mimetypes
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+
+try:
+    import brotli
+except ImportError:  # optional: gzip variants are always built
+    brotli = None
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+COMPRESSIBLE = {".css", ".js", ".svg", ".json", ".txt", ".html"}
+MIN_COMPRESS_BYTES = 256
+
+
+@dataclass(frozen=True)
+class Asset:
+    digest: str
+    content_type: str
+    # encoding ("identity", "gzip", "br") -> body
+    variants: Dict[str, bytes]
+
+
+def _fingerprinted(relative: str, digest: str) -> str:
+    stem, dot, suffix = relative.rpartition(".")
+    if not dot:
+        return f"{relative}.{digest}"
+    return f"{stem}.{digest}.{suffix}"
+
+
+def _variants(path: Path, body: bytes) -> Dict[str, bytes]:
+    variants = {"identity": body}
+    if path.suffix not in COMPRESSIBLE or len(body) < MIN_COMPRESS_BYTES:
+        return variants
+    compressed = gzip.compress(body, compresslevel=9, mtime=0)
+    if len(compressed) < len(body):
+        variants["gzip"] = compressed
+    if brotli is not None:
+        compressed = brotli.compress(body, quality=11)
+        if len(compressed) < len(body):
+            variants["br"] = compressed
+    return variants
+
+
+def _accepted(header: str) -> set:
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class FingerprintedStaticFiles(StaticFiles):
+    """StaticFiles with content-hashed URLs and precompressed in-memory bodies.
+
+    Every file is read, hashed and compressed once at startup. Fingerprinted
+    URLs are cached forever (``immutable``); the plain names still work but
+    must revalidate through their ETag. Unknown paths fall back to
+    ``StaticFiles``.
+    """
+
+    def __init__(self, directory: str, **kwargs) -> None:
+        super().__init__(directory=directory, **kwargs)
+        self.urls: Dict[str, str] = {}
+        self.assets: Dict[str, tuple[Asset, bool]] = {}
+        root = Path(directory)
+        for path in sorted(root.rglob("*")):
+            if not path.is_file() or path.name.endswith((".gz", ".br")):
+                continue
+            relative = path.relative_to(root).as_posix()
+            body = path.read_bytes()
+            digest = hashlib.sha256(body).hexdigest()[:12]
+            asset = Asset(
+                digest=digest,
+                content_type=mimetypes.guess_type(path.name)[0]
+                or "application/octet-stream",
+                variants=_variants(path, body),
+            )
+            fingerprinted = _fingerprinted(relative, digest)
+            self.urls[relative] = fingerprinted
+            self.assets[fingerprinted] = (asset, True)
+            self.assets[relative] = (asset, False)
+
+    def url(self, relative: str) -> str:
+        return "/static/" + self.urls.get(relative, relative)
+
+    async def get_response(self, path: str, scope) -> Response:
+        entry = self.assets.get(Path(path).as_posix())
+        if entry is None or scope["method"] not in ("GET", "HEAD"):
+            return await super().get_response(path, scope)
+        asset, immutable = entry
+        headers = dict(
+            (key.decode("latin-1"), value.decode("latin-1"))
+            for key, value in scope["headers"]
+            if key in (b"accept-encoding", b"if-none-match")
+        )
+        accepted = _accepted(headers.get("accept-encoding", ""))
+        encoding = next(
+            (
+                name
+                for name in ("br", "gzip")
+                if name in asset.variants and name in accepted
+            ),
+            "identity",
+        )
+        etag = f'"{asset.digest}-{encoding}"'
+        response_headers = {
+            "cache-control": IMMUTABLE if immutable else REVALIDATE,
+            "etag": etag,
+            "vary": "Accept-Encoding",
+        }
+        if encoding != "identity":
+            response_headers["content-encoding"] = encoding
+        if_none_match = headers.get("if-none-match", "")
+        if etag in if_none_match or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=response_headers)
+        return Response(
+            asset.variants[encoding],
+            media_type=asset.content_type,
+            headers=response_headers,
+        )
+
+
+_static_files: Optional[FingerprintedStaticFiles] = None
+
+
+def get_static_files() -> FingerprintedStaticFiles:
+    global _static_files
+    if _static_files is None:
+        directory = Path(__file__).resolve().parents[1] / "static"
+        _static_files = FingerprintedStaticFiles(directory=str(directory))
+    return _static_files
+
+
+def static_url(relative: str) -> str:
+    return get_static_files().url(relative)
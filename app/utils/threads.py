@@ -0,0 +1,74 @@
+import re
+from typing import List
+
+from app.utils.hashing import hash_text
+
+SEPARATOR_PATTERNS = (
+    re.compile(r"^-{2,}\s*(original message|mensagem original)\s*-{2,}$"),
+    re.compile(r"^-{2,}\s*(forwarded message|mensagem encaminhada)\s*-{2,}$"),
+    re.compile(r"^(em|on)\s.+(escreveu|wrote)\s*:$"),
+)
+HEADER_START = ("de:", "from:")
+HEADER_KEYS = (
+    "de:",
+    "from:",
+    "enviado:",
+    "enviada em:",
+    "sent:",
+    "date:",
+    "data:",
+    "para:",
+    "to:",
+    "cc:",
+    "assunto:",
+    "subject:",
+)
+
+
+def _quote_depth(line: str) -> tuple[int, str]:
+    depth = 0
+    stripped = line.lstrip()
+    while stripped.startswith(">"):
+        depth += 1
+        stripped = stripped[1:].lstrip()
+    return depth, stripped
+
+
+def split_thread(text: str) -> List[str]:
+    """Split a pasted reply chain into messages, newest first.
+
+    A new message starts at a separator line ("Original Message",
+    "Em ..., X escreveu:"), at a "De:/From:" header block, or where the
+    quote depth increases. Header lines and quote markers are dropped.
+    """
+    messages: List[List[str]] = [[]]
+    depth = 0
+    in_header = False
+    for raw in text.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+        line_depth, line = _quote_depth(raw)
+        lower = line.lower()
+        boundary = line_depth > depth or any(
+            pattern.match(lower) for pattern in SEPARATOR_PATTERNS
+        )
+        if lower.startswith(HEADER_START) and not in_header:
+            boundary = True
+            in_header = True
+        if boundary and any(messages[-1]):
+            messages.append([])
+        depth = max(depth, line_depth)
+        if any(pattern.match(lower) for pattern in SEPARATOR_PATTERNS):
+            continue
+        if in_header:
+            if lower.startswith(HEADER_KEYS):
+                continue
+            if not line:
+                in_header = False
+                continue
+            in_header = False
+        messages[-1].append(line)
+    return [text for text in ("\n".join(lines).strip() for lines in messages) if text]
+
+
+def message_hash(message: str) -> str:
+    # Re-quoting rewraps lines, so whitespace is normalized before hashing.
+    return hash_text(" ".join(message.split()))
@@ -0,0 +1,176 @@
+import base64
+import hashlib
+import json
+import logging
+import queue
+import random
+import secrets
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CSRF_PLACEHOLDER = b"__CSRF_TOKEN__"
+CAPTURED_PATHS = ("/analyze", "/api/analyze", "/feedback")
+
+
+class CaptureWriter:
+    """Appends JSON lines from a background thread so requests never block."""
+
+    def __init__(self, path: Path, max_queue: int = 10_000) -> None:
+        self.path = path
+        self._queue: "queue.Queue[Optional[dict]]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self.dropped = 0
+
+    def start(self) -> None:
+        if self._thread is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._thread = threading.Thread(
+                target=self._run, name="traffic-capture", daemon=True
+            )
+            self._thread.start()
+
+    def write(self, record: dict) -> None:
+        self.start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        with self.path.open("a", encoding="utf-8") as handle:
+            while True:
+                record = self._queue.get()
+                if record is None:
+                    return
+                handle.write(json.dumps(record, separators=(",", ":")) + "\n")
+                if self._queue.empty():
+                    handle.flush()
+
+
+def annotate_capture(request, **fields) -> None:
+    """Attach analysis details (hash, input type, ...) to the captured record."""
+    details = request.scope.setdefault("state", {}).setdefault("capture", {})
+    details.update(fields)
+
+
+def _cookie(headers: Dict[bytes, bytes], name: str) -> Optional[str]:
+    for part in headers.get(b"cookie", b"").decode("latin-1").split(";"):
+        key, _, value = part.strip().partition("=")
+        if key == name:
+            return value
+    return None
+
+
+class TrafficCaptureMiddleware:
+    """Opt-in capture of anonymized request descriptors for later replay.
+
+    Records carry no IP, cookie or header values: the client is a salted hash
+    that changes every process start. Bodies are only kept when
+    ``capture_bodies`` is enabled, with the CSRF token replaced by a
+    placeholder the replay tool swaps for a fresh one.
+    """
+
+    def __init__(
+        self,
+        app,
+        writer: CaptureWriter,
+        capture_bodies: bool = False,
+        sample_rate: float = 1.0,
+        max_body_bytes: int = 0,
+        csrf_cookie_name: str = "csrf_token",
+    ) -> None:
+        self.app = app
+        self.writer = writer
+        self.capture_bodies = capture_bodies
+        self.sample_rate = sample_rate
+        self.max_body_bytes = max_body_bytes
+        self.csrf_cookie_name = csrf_cookie_name
+        self._salt = secrets.token_bytes(16)
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope.get("path") not in CAPTURED_PATHS
+            or (self.sample_rate < 1.0 and random.random() >= self.sample_rate)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        body_size = 0
+        chunks = []
+        status = 500
+
+        async def receive_wrapper():
+            nonlocal body_size
+            message = await receive()
+            if message["type"] == "http.request":
+                body = message.get("body", b"")
+                body_size += len(body)
+                if self.capture_bodies and body_size <= self.max_body_bytes:
+                    chunks.append(body)
+            return message
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            self._record(scope, started, status, body_size, chunks)
+
+    def _record(self, scope, started, status, body_size, chunks) -> None:
+        headers = dict(scope.get("headers", []))
+        client = scope.get("client")
+        client_ip = client[0].encode() if client else b""
+        record = {
+            "ts": time.time(),
+            "method": scope.get("method"),
+            "path": scope.get("path"),
+            "content_type": headers.get(b"content-type", b"").decode("latin-1"),
+            "body_bytes": body_size,
+            "client": hashlib.sha256(self._salt + client_ip).hexdigest()[:12],
+            "status": status,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+        record.update(scope.get("state", {}).get("capture", {}))
+        if self.capture_bodies and chunks and body_size <= self.max_body_bytes:
+            body = b"".join(chunks)
+            token = _cookie(headers, self.csrf_cookie_name)
+            if token:
+                body = body.replace(token.encode("latin-1"), CSRF_PLACEHOLDER)
+            record["body"] = base64.b64encode(body).decode("ascii")
+        self.writer.write(record)
+
+
+_writer: Optional[CaptureWriter] = None
+
+
+def get_capture_writer() -> CaptureWriter:
+    global _writer
+    if _writer is None:
+        path = settings.capture_path or str(
+            Path(__file__).resolve().parents[2] / "data" / "capture.jsonl"
+        )
+        _writer = CaptureWriter(Path(path))
+    return _writer
+
+
+def close_capture_writer() -> None:
+    if _writer is not None:
+        _writer.close()
@@ -0,0 +1,253 @@
+"""Queue worker for backfills: ``python -m app.worker``.
+
+    python -m app.worker enqueue emails.jsonl   # {"ref": ..., "text": ...} per line
+    python -m app.worker run --concurrency 4
+    python -m app.worker stats
+    python -m app.worker results > results.jsonl
+
+Any number of workers, on any number of machines, pull from the queue at
+``WORK_QUEUE_URL``. Each claims a few tasks under a lease, renews the lease
+while they run and completes them with the ``TriageResponse`` JSON; a task
+whose worker dies is claimed again once its lease expires.
+"""
+
+import argparse
+import concurrent.futures
+import json
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, Optional, TextIO, Tuple
+
+from app.config import settings
+from app.services.work_queue import Task, WorkQueue, open_work_queue
+
+logger = logging.getLogger("app.worker")
+
+Handler = Callable[[Task], str]
+
+
+class Deferred(Exception):
+    """Raised by a handler to put its task back without spending an attempt."""
+
+
+class Worker:
+    """Keeps up to ``concurrency`` tasks in flight from one queue.
+
+    Tasks run in a thread pool; the main thread claims as slots free up and
+    renews the leases of running tasks every third of the lease. A task
+    finished after its lease was lost (e.g. the worker stalled and another
+    took over) is not written back.
+    """
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        handler: Handler,
+        concurrency: int = 4,
+        lease_seconds: float = 60.0,
+        retry_seconds: float = 30.0,
+        poll_seconds: float = 1.0,
+    ) -> None:
+        self.queue = queue
+        self.handler = handler
+        self.concurrency = max(1, concurrency)
+        self.lease_seconds = lease_seconds
+        self.retry_seconds = retry_seconds
+        self.poll_seconds = poll_seconds
+        self.stopping = threading.Event()
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.deferred = 0
+
+    def stop(self, *_args) -> None:
+        self.stopping.set()
+
+    def _process(self, task: Task) -> None:
+        try:
+            result = self.handler(task)
+        except Deferred as exc:
+            with self._lock:
+                self.deferred += 1
+            logger.info("Task deferred", extra={"task": task.id, "reason": str(exc)})
+            self.queue.release(task, self.retry_seconds)
+            return
+        except Exception as exc:  # noqa: BLE001
+            with self._lock:
+                self.failed += 1
+            logger.warning(
+                "Task failed",
+                extra={"task": task.id, "attempt": task.attempts, "error": str(exc)},
+            )
+            self.queue.fail(task, str(exc), self.retry_seconds)
+            return
+        if self.queue.complete(task, result):
+            with self._lock:
+                self.completed += 1
+        else:
+            logger.warning("Lease lost before completion", extra={"task": task.id})
+
+    def run(self, max_tasks: int = 0, exit_when_idle: bool = False) -> int:
+        """Process tasks until stopped; return how many were claimed."""
+        claimed = 0
+        running: Dict[concurrent.futures.Future, Task] = {}
+        renew_every = self.lease_seconds / 3
+        renew_at = time.monotonic() + renew_every
+        with concurrent.futures.ThreadPoolExecutor(self.concurrency) as executor:
+            while True:
+                free = self.concurrency - len(running)
+                if max_tasks:
+                    free = min(free, max_tasks - claimed)
+                if free > 0 and not self.stopping.is_set():
+                    for task in self.queue.claim(free, self.lease_seconds):
+                        running[executor.submit(self._process, task)] = task
+                        claimed += 1
+                if not running:
+                    exhausted = bool(max_tasks) and claimed >= max_tasks
+                    if self.stopping.is_set() or exit_when_idle or exhausted:
+                        return claimed
+                    self.stopping.wait(self.poll_seconds)
+                    continue
+                done, _ = concurrent.futures.wait(
+                    running,
+                    timeout=min(self.poll_seconds, renew_every),
+                    return_when=concurrent.futures.FIRST_COMPLETED,
+                )
+                for future in done:
+                    del running[future]
+                if time.monotonic() >= renew_at and running:
+                    self.queue.extend(list(running.values()), self.lease_seconds)
+                    renew_at = time.monotonic() + renew_every
+
+
+def analysis_handler(worker_id: str) -> Handler:
+    """Run the same analysis as ``/api/analyze`` on the task's email text."""
+    from app.services.analysis_store import AnalysisRecord, get_analysis_store
+    from app.services.analyzer_service import DEGRADED_SOURCE, AnalyzerService
+    from app.utils import llm_usage
+    from app.utils.llm_usage import get_usage_ledger
+
+    analyzer = AnalyzerService()
+
+    def handle(task: Task) -> str:
+        with llm_usage.tally() as usage:
+            output = analyzer.analyze(task.payload)
+        output.usage = usage
+        get_usage_ledger().attribute("worker", output.source, worker_id, usage)
+        if output.source == DEGRADED_SOURCE:
+            # A backfill can wait for the LLM; put the task back instead of
+            # keeping a baseline-only result. Waiting out an overload or a
+            # spent budget is not the task's fault, so no attempt is used.
+            raise Deferred("LLM indisponivel (sobrecarga ou orcamento)")
+        if settings.history_enabled:
+            get_analysis_store().write_many([AnalysisRecord.from_output(output)])
+        return output.to_response().model_dump_json()
+
+    return handle
+
+
+def read_tasks(lines: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """``(ref, text)`` from JSONL lines; ``ref`` defaults to the line number."""
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        yield str(item.get("ref", number)), item["text"]
+
+
+def _enqueue(queue: WorkQueue, stream: TextIO, batch: int = 1000) -> int:
+    total, pending = 0, []
+    for item in read_tasks(stream):
+        pending.append(item)
+        if len(pending) >= batch:
+            total += queue.enqueue(pending)
+            pending = []
+    return total + queue.enqueue(pending)
+
+
+def _write_results(queue: WorkQueue, out: TextIO) -> int:
+    last_id, written = 0, 0
+    while True:
+        rows = queue.results(after_id=last_id)
+        for _task_id, ref, result in rows:
+            out.write(f'{{"ref": {json.dumps(ref)}, "response": {result}}}\n')
+        written += len(rows)
+        if not rows:
+            return written
+        last_id = rows[-1][0]
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(description="Worker da fila de analises")
+    parser.add_argument("--queue", default="", help="WORK_QUEUE_URL (padrao: config)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    enqueue = commands.add_parser(
+        "enqueue", help="enfileira um JSONL (ou - para stdin)"
+    )
+    enqueue.add_argument("path")
+    run = commands.add_parser("run", help="processa tarefas da fila")
+    run.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.worker_concurrency or settings.llm_max_concurrency,
+    )
+    run.add_argument("--lease", type=float, default=settings.worker_lease_seconds)
+    run.add_argument("--max-tasks", type=int, default=0)
+    run.add_argument(
+        "--exit-when-idle", action="store_true", help="sai quando a fila esvaziar"
+    )
+    commands.add_parser("stats", help="tarefas por status")
+    commands.add_parser("results", help="resultados concluidos em JSONL")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=settings.log_level,
+        format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    )
+    queue = open_work_queue(args.queue or None)
+    if args.command == "enqueue":
+        if args.path == "-":
+            count = _enqueue(queue, sys.stdin)
+        else:
+            with open(args.path, encoding="utf-8") as stream:
+                count = _enqueue(queue, stream)
+        print(f"{count} tarefas enfileiradas")
+    elif args.command == "stats":
+        print(json.dumps(queue.stats()))
+    elif args.command == "results":
+        _write_results(queue, sys.stdout)
+    else:
+        from app.clients.client_pool import close_client_pool
+
+        worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        worker = Worker(
+            queue,
+            analysis_handler(worker_id),
+            concurrency=args.concurrency,
+            lease_seconds=args.lease,
+            retry_seconds=settings.worker_retry_seconds,
+        )
+        signal.signal(signal.SIGTERM, worker.stop)
+        signal.signal(signal.SIGINT, worker.stop)
+        logger.info("Worker %s started (concurrency %d)", worker_id, worker.concurrency)
+        try:
+            claimed = worker.run(args.max_tasks, args.exit_when_idle)
+        finally:
+            close_client_pool()
+        logger.info(
+            "Worker %s stopped: %d claimed, %d completed, %d failed, %d deferred",
+            worker_id,
+            claimed,
+            worker.completed,
+            worker.failed,
+            worker.deferred,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import importlib
+import sys
+
+BENCHMARKS = [
+    "bench_upload",
+    "bench_middleware",
+    "bench_json",
+    "bench_rules",
+    "bench_pages",
+    "bench_results",
+    "bench_worker",
+]
+
+
+def main(selected: list[str]) -> None:
+    for name in BENCHMARKS:
+        if selected and name not in selected:
+            continue
+        print(f"== {name}")
+        importlib.import_module(f"benchmarks.{name}").run()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,72 @@
+"""Per-response cost of parsing LLM JSON and serializing TriageResponse."""
+
+import json
+
+from fastapi.responses import JSONResponse
+
+from app.clients.gemini_client import _parse_json_response
+from app.schemas.triage import EmailTriageResult, TriageResponse
+from app.utils.fast_json import FastJSONResponse
+from benchmarks.common import measure, report
+
+REPEAT = 20000
+
+LLM_REPLY = (
+    "```json\n"
+    + json.dumps(
+        {
+            "category": "Produtivo",
+            "confidence": 0.87,
+            "summary": "Cliente pede o status do contrato 4587 e a segunda via do boleto.",
+            "suggested_reply": "Ola! Recebemos sua solicitacao e vamos verificar o "
+            "status do contrato 4587. Retornaremos com a segunda via em breve.",
+            "tags": ["contrato", "status", "boleto", "financeiro"],
+            "needs_human_review": False,
+            "reasons": ["Pede status de contrato", "Solicita documento"],
+        },
+        ensure_ascii=False,
+    )
+    + "\n```"
+)
+
+
+def _legacy_parse(text: str) -> EmailTriageResult:
+    # Previous implementation: line-split fences, json.loads, model_validate.
+    cleaned = text.strip()
+    if cleaned.startswith("```"):
+        lines = cleaned.splitlines()[1:]
+        if lines and lines[-1].strip().startswith("```"):
+            lines = lines[:-1]
+        cleaned = "\n".join(lines).strip()
+    return EmailTriageResult.model_validate(json.loads(cleaned))
+
+
+def _legacy_render(response: TriageResponse) -> bytes:
+    # FastAPI with response_model: re-validate, dump to Python, json.dumps.
+    validated = TriageResponse.model_validate(response)
+    return JSONResponse(validated.model_dump(mode="json")).body
+
+
+def run() -> None:
+    result = _parse_json_response(LLM_REPLY)
+    assert _legacy_parse(LLM_REPLY) == result
+    response = TriageResponse(
+        result=result,
+        source="llm",
+        email_hash="a" * 64,
+        stats={"num_chars": 1200, "num_words": 210},
+        baseline_prob=0.81,
+    )
+    assert json.loads(_legacy_render(response)) == json.loads(
+        FastJSONResponse(response).body
+    )
+
+    for name, func in (
+        ("parse: legacy json.loads + validate", lambda: _legacy_parse(LLM_REPLY)),
+        ("parse: model_validate_json", lambda: _parse_json_response(LLM_REPLY)),
+        ("render: response_model + JSONResponse", lambda: _legacy_render(response)),
+        ("render: FastJSONResponse", lambda: FastJSONResponse(response)),
+    ):
+        func()
+        seconds, _ = measure(func, repeat=REPEAT)
+        report(name, seconds, us=f"{seconds * 1e6:.1f}")
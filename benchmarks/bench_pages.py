@@ -0,0 +1,70 @@
+"""Render time and size of the index page, with and without a result."""
+
+import json
+import secrets
+
+from markupsafe import Markup
+
+from app.routes.pages import page_shell, templates
+from app.schemas.triage import EmailTriageResult, TriageResponse
+from app.utils.page_shell import gzip_body
+from benchmarks.common import measure, report
+
+REPEAT = 2000
+
+RESULT = TriageResponse(
+    result=EmailTriageResult(
+        category="Produtivo",
+        confidence=0.87,
+        summary="Cliente pede o status do contrato 4587 e a segunda via do boleto.",
+        suggested_reply="Ola! Recebemos sua solicitacao e vamos verificar o status "
+        "do contrato 4587. Retornaremos com a segunda via em breve.",
+        tags=["contrato", "status", "boleto", "financeiro"],
+        needs_human_review=False,
+        reasons=["Pede status de contrato", "Solicita documento"],
+    ),
+    source="llm",
+    email_hash="a" * 64,
+    stats={"num_chars": 1200, "num_words": 210},
+    baseline_prob=0.81,
+)
+
+
+def _legacy(result=None) -> bytes:
+    # Previous path: full Jinja render per request plus the result payload
+    # embedded as JSON next to the server-rendered card.
+    card = page_shell.card_template.render(
+        result=result.result if result else None, result_meta=result
+    )
+    page = templates.get_template("index.html").render(
+        **page_shell.context,
+        csrf_token=secrets.token_urlsafe(32),
+        csp_nonce=secrets.token_urlsafe(16),
+        error=None,
+        has_result=result is not None,
+        result_card=Markup(card),
+    )
+    payload = json.dumps(result.model_dump() if result else {})
+    return (page + f'<script type="application/json">{payload}</script>').encode()
+
+
+def _current(result=None, compress: bool = True) -> bytes:
+    body = page_shell.render(
+        secrets.token_urlsafe(32), secrets.token_urlsafe(16), result=result
+    ).encode()
+    if result is None and compress:
+        body, _ = gzip_body(body, "gzip", 1024)
+    return body
+
+
+def run() -> None:
+    for name, func in (
+        ("GET /: full render", lambda: _legacy()),
+        ("GET /: shell", lambda: _current(compress=False)),
+        ("GET /: shell + gzip", lambda: _current()),
+        ("POST /analyze: full render + payload", lambda: _legacy(RESULT)),
+        ("POST /analyze: shell + card", lambda: _current(RESULT)),
+    ):
+        size = len(func())
+        seconds, _ = measure(func, repeat=REPEAT)
+        report(name, seconds, bytes=size)
@@ -0,0 +1,120 @@
+"""Memory held by 10k finished analyses, as a batch or job would keep them."""
+
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from app.schemas.triage import EmailTriageResult, TriageResponse
+from app.services.analyzer_service import AnalysisOutput
+from app.utils.preprocessing import ProcessedText
+from benchmarks.common import report
+
+COUNT = 10000
+WORDS = 180
+
+
+@dataclass
+class _LegacyUsage:
+    calls: int = 0
+    prompt_tokens: int = 0
+    response_tokens: int = 0
+    latency: float = 0.0
+
+
+@dataclass
+class _LegacyOutput:
+    # Previous AnalysisOutput: a plain dataclass around the pydantic model.
+    result: EmailTriageResult
+    source: str
+    email_hash: str
+    stats: Dict[str, int]
+    baseline_prob: Optional[float]
+    usage: _LegacyUsage = field(default_factory=_LegacyUsage)
+
+
+def _model(index: int) -> EmailTriageResult:
+    return EmailTriageResult(
+        category="Produtivo",
+        confidence=0.87,
+        summary=f"Cliente pede o status do contrato {index}.",
+        suggested_reply=f"Ola! Vamos verificar o contrato {index} e retornar.",
+        tags=["contrato", "status", f"c{index}"],
+        needs_human_review=False,
+        reasons=["Pede status de contrato", f"Cita o contrato {index}"],
+    )
+
+
+def _clean_text(index: int) -> str:
+    return " ".join(f"palavr{index}x{word}" for word in range(WORDS))
+
+
+def _legacy(index: int) -> _LegacyOutput:
+    clean = _clean_text(index)
+    processed = {
+        "clean_text": clean,
+        "tokens": clean.split(),
+        "stats": {"num_chars": len(clean), "num_words": WORDS},
+    }
+    output = _LegacyOutput(
+        result=_model(index),
+        source="llm",
+        email_hash=f"{index:064x}",
+        stats=processed["stats"],
+        baseline_prob=0.81,
+    )
+    # analyze_async handed each caller a deep copy of the result.
+    return _LegacyOutput(
+        result=output.result.model_copy(deep=True),
+        source=output.source,
+        email_hash=output.email_hash,
+        stats=output.stats,
+        baseline_prob=output.baseline_prob,
+        usage=output.usage,
+    )
+
+
+def _compact(index: int) -> AnalysisOutput:
+    clean = _clean_text(index)
+    processed = ProcessedText(clean, len(clean), WORDS)
+    return AnalysisOutput(
+        result=_model(index),
+        source="llm",
+        email_hash=f"{index:064x}",
+        stats=processed.stats,
+        baseline_prob=0.81,
+    )
+
+
+def _held(build: Callable[[int], object]) -> tuple:
+    tracemalloc.start()
+    started = time.perf_counter()
+    held: List[object] = [build(index) for index in range(COUNT)]
+    elapsed = (time.perf_counter() - started) / COUNT
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return elapsed, current, peak
+
+
+def run() -> None:
+    legacy = _legacy(1)
+    compact = _compact(1)
+    legacy_response = TriageResponse(
+        result=legacy.result,
+        source=legacy.source,
+        email_hash=legacy.email_hash,
+        stats=legacy.stats,
+        baseline_prob=legacy.baseline_prob,
+    )
+    assert compact.to_response().model_dump() == legacy_response.model_dump()
+
+    for name, build in (("legacy dataclass + model", _legacy), ("slots", _compact)):
+        seconds, current, peak = _held(build)
+        report(
+            f"{COUNT} analyses: {name}",
+            seconds,
+            peak,
+            held_kib=f"{current / 1024:.0f}",
+            per_analysis=f"{current / COUNT:.0f}B",
+        )
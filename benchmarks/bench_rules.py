@@ -0,0 +1,20 @@
+"""Cost of the keyword rule engine on hits, misses and long emails."""
+
+from app.services.rules import RuleEngine, rules_path
+from benchmarks.common import measure, report
+
+REPEAT = 20000
+
+SAMPLES = {
+    "hit: out of office": "Resposta automatica: estou fora do escritorio ate dia 10.",
+    "vetoed: thanks + question": "Obrigado! Pode confirmar o status do pedido?",
+    "miss: short request": "Pode enviar a segunda via do boleto de marco",
+    "skip: long email": "Segue o relatorio trimestral. " * 100,
+}
+
+
+def run() -> None:
+    engine = RuleEngine.load(rules_path())
+    for name, text in SAMPLES.items():
+        seconds, _ = measure(lambda: engine.match(text), repeat=REPEAT)
+        report(name, seconds, us=f"{seconds * 1e6:.2f}")
@@ -0,0 +1,91 @@
+"""Peak memory and latency per upload for the ingestion path."""
+
+import re
+import tempfile
+
+import anyio
+from starlette.datastructures import UploadFile
+
+from app.security.exceptions import UploadValidationError
+from app.security.upload_guard import extract_text_from_upload
+from app.utils.pdf_pool import shutdown_pdf_pool
+from benchmarks.common import measure, report
+from tests.pdf_helpers import make_pdf
+
+SPOOL_MAX_SIZE = 1024 * 1024
+
+
+async def _legacy_ingest(upload: UploadFile) -> str:
+    # Previous path: bytearray accumulation, a bytes copy, then full decodes.
+    buffer = bytearray()
+    while True:
+        chunk = await upload.read(64 * 1024)
+        if not chunk:
+            break
+        buffer.extend(chunk)
+    file_bytes = bytes(buffer)
+    if b"\x00" in file_bytes:
+        raise UploadValidationError()
+    text = file_bytes.decode("utf-8")
+    printable = sum(ch.isprintable() or ch in "\n\r\t" for ch in text)
+    if printable / max(1, len(text)) < 0.9:
+        raise UploadValidationError()
+    text = re.sub(r"\s+", " ", text).strip()
+    if len(text) > 40000:
+        raise UploadValidationError("Texto maior que o limite permitido.")
+    return text
+
+
+def _upload(filename: str, payload: bytes) -> UploadFile:
+    spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    spooled.write(payload)
+    spooled.seek(0)
+    return UploadFile(file=spooled, filename=filename, size=len(payload))
+
+
+def _run_all(handler, uploads: list) -> str:
+    async def _drive() -> str:
+        outcome = "accepted"
+        for upload in uploads:
+            try:
+                await handler(upload)
+            except UploadValidationError as exc:
+                outcome = exc.detail
+        return outcome
+
+    return anyio.run(_drive)
+
+
+def _measure(handler, filename: str, payload: bytes, repeat: int = 5):
+    outcome = _run_all(handler, [_upload(filename, payload)])
+    seconds = peak = 0
+    for _ in range(repeat):
+        upload = _upload(filename, payload)
+        try:
+            elapsed, upload_peak = measure(lambda: _run_all(handler, [upload]))
+        finally:
+            upload.file.close()
+        seconds += elapsed / repeat
+        peak = max(peak, upload_peak)
+    return seconds, peak, outcome
+
+
+def run() -> None:
+    line = "Pedido de status do contrato 4587, favor retornar hoje.\n"
+    cases = [
+        ("txt 38KiB (memory spool)", "email.txt", (line * 680).encode()),
+        ("txt 1.5MiB (disk spool)", "email.txt", (line * 28000).encode()),
+        ("pdf 8 pages", "contrato.pdf", make_pdf([f"Pagina {i}" for i in range(8)])),
+    ]
+    for label, filename, payload in cases:
+        seconds, peak, outcome = _measure(extract_text_from_upload, filename, payload)
+        report(f"upload {label}", seconds, peak, bytes=len(payload))
+        print(f"  outcome: {outcome}")
+        if filename.endswith(".txt"):
+            seconds, peak, outcome = _measure(_legacy_ingest, filename, payload)
+            report(f"legacy {label}", seconds, peak, bytes=len(payload))
+    shutdown_pdf_pool()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,58 @@
+"""Queue throughput as worker processes are added (simulated 20 ms LLM call)."""
+
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.work_queue import SQLiteWorkQueue
+from app.worker import Worker
+from benchmarks.common import report
+
+TASKS = 400
+CALL_SECONDS = 0.02
+CONCURRENCY = 2
+
+
+def _handler(task) -> str:
+    time.sleep(CALL_SECONDS)
+    return "{}"
+
+
+def _work(path: str) -> None:
+    queue = SQLiteWorkQueue(Path(path))
+    Worker(queue, _handler, concurrency=CONCURRENCY, poll_seconds=0.01).run(
+        exit_when_idle=True
+    )
+
+
+def _throughput(processes: int) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "queue.db"
+        queue = SQLiteWorkQueue(path)
+        queue.enqueue((str(index), "email") for index in range(TASKS))
+        context = multiprocessing.get_context("fork")
+        workers = [
+            context.Process(target=_work, args=(str(path),)) for _ in range(processes)
+        ]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+        assert queue.stats()["done"] == TASKS
+    return elapsed
+
+
+def run() -> None:
+    single = None
+    for processes in (1, 2, 4, 8):
+        elapsed = _throughput(processes)
+        single = single or elapsed
+        report(
+            f"{processes} workers x {CONCURRENCY} threads",
+            elapsed / TASKS,
+            tasks_per_s=f"{TASKS / elapsed:.0f}",
+            speedup=f"{single / elapsed:.2f}x",
+        )
@@ -0,0 +1,24 @@
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+
+def measure(func: Callable[[], object], repeat: int = 1) -> Tuple[float, int]:
+    """Return (seconds per call, peak traced bytes) for ``func``."""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = (time.perf_counter() - started) / repeat
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def report(name: str, seconds: float, peak_bytes: int = 0, **extra) -> None:
+    parts = [f"{name:<40}", f"{seconds * 1000:>10.3f} ms"]
+    if peak_bytes:
+        parts.append(f"{peak_bytes / 1024:>10.1f} KiB peak")
+    parts.extend(f"{key}={value}" for key, value in extra.items())
+    print("  ".join(parts))
@@ -1,25 +1,72 @@
 import logging
+from contextlib import asynccontextmanager
 
+import anyio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.middleware.trustedhost import TrustedHostMiddleware
 
+from app.clients.client_pool import close_client_pool, get_client_pool
 from app.config import settings
 from app.routes.api import router as api_router
 from app.routes.feedback import router as feedback_router
+from app.routes.metrics import router as metrics_router
 from app.routes.pages import router as pages_router
+from app.routes.results import router as results_router
 from app.security.exceptions import add_exception_handlers
-from app.security.headers import BodySizeLimitMiddleware, HTTPSRedirectMiddleware, SecurityHeadersMiddleware
+from app.security.headers import BodySizeLimitMiddleware, SecurityMiddleware
+from app.services.analysis_store import get_history_writer
+from app.services.feedback_store import get_feedback_writer
+from app.services.incremental_learner import get_incremental_learner
+from app.services.load_shedding import (
+    DegradationHeaderMiddleware,
+    get_overload_controller,
+)
+from app.utils.fast_json import FastJSONResponse
+from app.utils.pdf_pool import get_pdf_pool, shutdown_pdf_pool
+from app.utils.static_assets import get_static_files
+from app.utils.traffic_capture import (
+    TrafficCaptureMiddleware,
+    close_capture_writer,
+    get_capture_writer,
+)
 
 logging.basicConfig(
     level=settings.log_level,
     format="%(asctime)s %(levelname)s %(name)s %(message)s",
 )
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    get_pdf_pool().start()
+    if settings.gemini_api_key:
+        client_pool = get_client_pool()
+        client_pool.get()
+        if settings.gemini_warm_up:
+            await anyio.to_thread.run_sync(client_pool.warm_up, settings.gemini_model)
+    feedback_writer = get_feedback_writer()
+    feedback_writer.start()
+    history_writer = get_history_writer()
+    history_writer.start()
+    learner = get_incremental_learner()
+    if learner is not None:
+        learner.start()
+    yield
+    if learner is not None:
+        await learner.stop()
+    await feedback_writer.stop()
+    await history_writer.stop()
+    shutdown_pdf_pool()
+    close_client_pool()
+    close_capture_writer()
+
+
 app = FastAPI(
     title=settings.app_name,
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
     docs_url=None if settings.is_production else "/docs",
     redoc_url=None if settings.is_production else "/redoc",
     openapi_url=None if settings.is_production else "/openapi.json",
@@ -35,8 +82,17 @@ app.add_middleware(
     same_site=settings.csrf_cookie_samesite,
     https_only=settings.secure_cookies,
 )
-app.add_middleware(HTTPSRedirectMiddleware, enabled=settings.https_redirect_enabled)
-app.add_middleware(SecurityHeadersMiddleware)
+app.add_middleware(
+    SecurityMiddleware,
+    https_redirect=settings.https_redirect_enabled,
+    hsts=settings.hsts_enabled,
+    hsts_max_age=settings.hsts_max_age,
+    cacheable_prefixes=("/static/", "/api/results/"),
+)
+if settings.load_shedding_enabled:
+    app.add_middleware(
+        DegradationHeaderMiddleware, controller=get_overload_controller()
+    )
 if settings.cors_allow_origins:
     app.add_middleware(
         CORSMiddleware,
@@ -46,9 +102,22 @@ if settings.cors_allow_origins:
         allow_headers=["Content-Type", "X-CSRF-Token"],
     )
 
+if settings.capture_enabled:
+    # Outermost, so recorded latency includes every other middleware.
+    app.add_middleware(
+        TrafficCaptureMiddleware,
+        writer=get_capture_writer(),
+        capture_bodies=settings.capture_bodies,
+        sample_rate=settings.capture_sample_rate,
+        max_body_bytes=settings.max_body_bytes,
+        csrf_cookie_name=settings.csrf_cookie_name,
+    )
+
 add_exception_handlers(app)
 
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+app.mount("/static", get_static_files(), name="static")
 app.include_router(pages_router)
 app.include_router(api_router)
 app.include_router(feedback_router)
+app.include_router(results_router)
+app.include_router(metrics_router)
@@ -0,0 +1,118 @@
+import argparse
+import csv
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from sklearn.feature_extraction.text import HashingVectorizer  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.services.baseline_service import BaselineService, thresholds_path  # noqa: E402
+from app.services.calibration import (  # noqa: E402
+    fit_thresholds,
+    is_calibration_row,
+)
+from app.services.feedback_store import get_feedback_store  # noqa: E402
+from app.services.incremental_learner import from_blobs  # noqa: E402
+from app.utils.preprocessing import preprocess_text  # noqa: E402
+
+
+def replay_csv(baseline: BaselineService, path: Path, all_rows: bool) -> list:
+    # Only the rows train_baseline.py held out, unless the CSV was never
+    # used for training.
+    samples = []
+    with path.open("r", encoding="utf-8", newline="") as handle:
+        for row in csv.DictReader(handle):
+            text = (row.get("text") or "").strip()
+            label = (row.get("label") or "").strip()
+            if not text or not label:
+                continue
+            if not all_rows and not is_calibration_row(text):
+                continue
+            prediction = baseline.predict(preprocess_text(text).clean_text)
+            if prediction:
+                samples.append((prediction[0], prediction[1], prediction[0] == label))
+    return samples
+
+
+def replay_feedback(baseline: BaselineService) -> list:
+    # Feedback only carries email_hash; it can be replayed when the analysis
+    # stored hashed features and the baseline uses that same featurizer.
+    model = baseline.model
+    vectorizer = model.steps[0][1] if model is not None else None
+    if not isinstance(vectorizer, HashingVectorizer):
+        return []
+    rows = [
+        (indices, data, label)
+        for _, _, label, indices, data, _served in (
+            get_feedback_store().labelled_features_since(0)
+        )
+        if indices is not None
+    ]
+    if not rows:
+        return []
+    features = from_blobs([(i, d) for i, d, _ in rows], vectorizer.n_features)
+    probabilities = model.steps[-1][1].predict_proba(features)
+    classes = model.classes_
+    samples = []
+    for probs, (_, _, label) in zip(probabilities, rows):
+        best = int(probs.argmax())
+        predicted = str(classes[best])
+        samples.append((predicted, float(probs[best]), predicted == label))
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Calibra thresholds por categoria para o baseline"
+    )
+    parser.add_argument(
+        "--dataset",
+        type=Path,
+        action="append",
+        help="CSV rotulado (text,label); padrao: data/emails_seed.csv",
+    )
+    parser.add_argument(
+        "--precision", type=float, default=settings.calibration_precision_target
+    )
+    parser.add_argument("--min-samples", type=int, default=5)
+    parser.add_argument(
+        "--all-rows",
+        action="store_true",
+        help="usa todas as linhas dos CSVs (so para dados fora do treino)",
+    )
+    parser.add_argument("--no-feedback", action="store_true")
+    parser.add_argument("--output", type=Path, default=thresholds_path())
+    args = parser.parse_args()
+
+    baseline = BaselineService()
+    if baseline.model is None:
+        raise SystemExit("Baseline nao encontrado. Rode scripts/train_baseline.py")
+    samples = []
+    for path in args.dataset or [BASE_DIR / "data" / "emails_seed.csv"]:
+        samples.extend(replay_csv(baseline, path, args.all_rows))
+    if not args.no_feedback:
+        samples.extend(replay_feedback(baseline))
+    if not samples:
+        raise SystemExit("Nenhuma amostra rotulada para calibrar")
+
+    config = fit_thresholds(samples, args.precision, args.min_samples)
+    config["generated_at"] = datetime.utcnow().isoformat()
+    config["samples"] = len(samples)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(config, indent=2), encoding="utf-8")
+
+    for label, threshold in config["thresholds"].items():
+        shown = "desativado" if threshold is None else f"{threshold:.4f}"
+        print(f"{label}: threshold={shown} {config['report'][label]}")
+    print(f"Offload sem LLM: {config['offload_rate']:.1%} de {len(samples)} amostras")
+    print("Config salva em", args.output)
+
+
+if __name__ == "__main__":
+    main()
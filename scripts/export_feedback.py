@@ -0,0 +1,30 @@
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.services.feedback_store import get_feedback_store  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Exporta o feedback do SQLite no layout do feedback.csv"
+    )
+    parser.add_argument("--output", type=Path, help="arquivo CSV (padrao: stdout)")
+    parser.add_argument("--email-hash", help="filtra por email_hash")
+    args = parser.parse_args()
+
+    store = get_feedback_store()
+    if args.output:
+        with args.output.open("w", newline="", encoding="utf-8") as handle:
+            count = store.export_csv(handle, email_hash=args.email_hash)
+        print(f"{count} linhas exportadas para {args.output}", file=sys.stderr)
+    else:
+        store.export_csv(sys.stdout, email_hash=args.email_hash)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.utils.traffic_capture import CSRF_PLACEHOLDER  # noqa: E402
+
+WORDS = (
+    "pedido status contrato reuniao fatura prazo suporte acesso sistema "
+    "obrigado feliz natal parabens equipe cliente proposta anexo urgente"
+).split()
+PERCENTILES = (50, 90, 95, 99)
+
+
+def load_capture(path: Path) -> List[dict]:
+    with path.open("r", encoding="utf-8") as handle:
+        records = [json.loads(line) for line in handle if line.strip()]
+    return sorted(records, key=lambda record: record["ts"])
+
+
+def synthetic_text(seed: str, size: int) -> str:
+    # Same email_hash -> same text, so repeated emails stay repeated and
+    # caches/coalescing behave as they did in the captured traffic.
+    rng = random.Random(seed)
+    words: List[str] = []
+    length = 0
+    while length < max(size, 1):
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[: max(size, 1)]
+
+
+def build_request(record: dict, token: str) -> Dict[str, object]:
+    headers = {"X-CSRF-Token": token}
+    if "body" in record:
+        body = base64.b64decode(record["body"]).replace(
+            CSRF_PLACEHOLDER, token.encode("latin-1")
+        )
+        headers["Content-Type"] = record.get("content_type", "")
+        return {"content": body, "headers": headers}
+    seed = record.get("email_hash") or str(record["ts"])
+    if record["path"] == "/feedback":
+        return {
+            "json": {
+                "email_hash": seed,
+                "correct_label": record.get("label", "Produtivo"),
+            },
+            "headers": headers,
+        }
+    text = synthetic_text(seed, record.get("text_chars") or record["body_bytes"])
+    return {"data": {"text_input": text, "csrf_token": token}, "headers": headers}
+
+
+class ReplayClient:
+    """One cookie jar and source address per captured client bucket."""
+
+    def __init__(self, target: str, bucket: str, timeout: float) -> None:
+        octets = hashlib.sha256(bucket.encode()).digest()[:3]
+        self.client = httpx.AsyncClient(
+            base_url=target,
+            timeout=timeout,
+            headers={"X-Forwarded-For": "10.%d.%d.%d" % tuple(octets)},
+        )
+        self._token: Optional[str] = None
+        self._lock = asyncio.Lock()
+
+    async def token(self) -> str:
+        async with self._lock:
+            if self._token is None:
+                response = await self.client.get("/")
+                self._token = response.cookies.get("csrf_token", "")
+            return self._token
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+async def replay(
+    records: List[dict], target: str, speed: float, concurrency: int, timeout: float
+) -> List[dict]:
+    clients: Dict[str, ReplayClient] = {}
+    semaphore = asyncio.Semaphore(concurrency)
+    results: List[dict] = []
+    first_ts = records[0]["ts"] if records else 0.0
+    started = time.perf_counter()
+
+    async def fire(record: dict) -> None:
+        delay = (record["ts"] - first_ts) / speed - (time.perf_counter() - started)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        bucket = record.get("client", "")
+        if bucket not in clients:
+            clients[bucket] = ReplayClient(target, bucket, timeout)
+        replay_client = clients[bucket]
+        async with semaphore:
+            request = build_request(record, await replay_client.token())
+            sent = time.perf_counter()
+            try:
+                response = await replay_client.client.request(
+                    record.get("method", "POST"), record["path"], **request
+                )
+                status = response.status_code
+            except httpx.HTTPError as exc:
+                status = type(exc).__name__
+            results.append(
+                {
+                    "path": record["path"],
+                    "input_type": record.get("input_type", ""),
+                    "status": status,
+                    "latency_ms": (time.perf_counter() - sent) * 1000,
+                    "lag_ms": max(0.0, -delay) * 1000,
+                }
+            )
+
+    try:
+        await asyncio.gather(*(fire(record) for record in records))
+    finally:
+        for replay_client in clients.values():
+            await replay_client.close()
+    return results
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(results: List[dict]) -> Dict[str, dict]:
+    groups: Dict[str, List[dict]] = {"all": results}
+    for result in results:
+        groups.setdefault(result["path"], []).append(result)
+    summary: Dict[str, dict] = {}
+    for name, items in groups.items():
+        latencies = [item["latency_ms"] for item in items]
+        statuses: Dict[str, int] = {}
+        for item in items:
+            statuses[str(item["status"])] = statuses.get(str(item["status"]), 0) + 1
+        summary[name] = {
+            "count": len(items),
+            "mean_ms": sum(latencies) / len(latencies) if latencies else 0.0,
+            **{f"p{pct}_ms": percentile(latencies, pct) for pct in PERCENTILES},
+            "max_ms": max(latencies, default=0.0),
+            "statuses": statuses,
+        }
+    return summary
+
+
+def compare(base: Dict[str, dict], candidate: Dict[str, dict]) -> None:
+    columns = ["mean_ms", *[f"p{pct}_ms" for pct in PERCENTILES], "max_ms"]
+    for name in sorted(set(base) | set(candidate)):
+        left, right = base.get(name), candidate.get(name)
+        if not left or not right:
+            print(f"{name}: presente em apenas um dos arquivos")
+            continue
+        print(f"{name} (n={left['count']} vs {right['count']})")
+        for column in columns:
+            before, after = left[column], right[column]
+            delta = (after - before) / before * 100 if before else 0.0
+            print(f"  {column:<8} {before:10.2f} {after:10.2f} {delta:+8.1f}%")
+        if left["statuses"] != right["statuses"]:
+            print(f"  status   {left['statuses']} -> {right['statuses']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Reproduz trafego capturado e compara latencias entre builds"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="reproduz um arquivo de captura")
+    run.add_argument("capture", type=Path)
+    run.add_argument("--target", default="http://localhost:8000")
+    run.add_argument(
+        "--speed", type=float, default=1.0, help="2 = duas vezes mais rapido"
+    )
+    run.add_argument("--concurrency", type=int, default=64)
+    run.add_argument("--timeout", type=float, default=30.0)
+    run.add_argument("--output", type=Path, help="salva o resumo em JSON")
+    diff = sub.add_parser("compare", help="compara dois resumos de replay")
+    diff.add_argument("base", type=Path)
+    diff.add_argument("candidate", type=Path)
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        compare(
+            json.loads(args.base.read_text(encoding="utf-8")),
+            json.loads(args.candidate.read_text(encoding="utf-8")),
+        )
+        return
+
+    records = load_capture(args.capture)
+    results = asyncio.run(
+        replay(
+            records,
+            args.target,
+            speed=max(args.speed, 1e-6),
+            concurrency=max(1, args.concurrency),
+            timeout=args.timeout,
+        )
+    )
+    summary = summarize(results)
+    lag = percentile([result["lag_ms"] for result in results], 99)
+    print(json.dumps(summary, indent=2))
+    print(f"Atraso p99 do agendador: {lag:.1f}ms", file=sys.stderr)
+    if args.output:
+        args.output.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
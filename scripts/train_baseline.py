@@ -1,5 +1,11 @@
+import argparse
 import csv
+import random
+import sys
+import time
+import zlib
 from pathlib import Path
+from typing import Iterator, Optional
 
 import joblib
 from sklearn.feature_extraction.text import TfidfVectorizer
@@ -8,8 +14,26 @@ from sklearn.metrics import accuracy_score, classification_report
 from sklearn.model_selection import train_test_split
 from sklearn.pipeline import Pipeline
 
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from app.services.calibration import is_calibration_row  # noqa: E402
+from app.services.incremental_learner import (  # noqa: E402
+    CLASSES,
+    make_classifier,
+    make_vectorizer,
+)
+from app.utils.preprocessing import preprocess_text  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
 
 def load_dataset(path: Path) -> tuple[list[str], list[str]]:
+    """Labelled rows, minus the split reserved for calibrate_baseline.py."""
     texts: list[str] = []
     labels: list[str] = []
     with path.open("r", encoding="utf-8", newline="") as handle:
@@ -17,17 +41,13 @@ def load_dataset(path: Path) -> tuple[list[str], list[str]]:
         for row in reader:
             text = (row.get("text") or "").strip()
             label = (row.get("label") or "").strip()
-            if text and label:
+            if text and label and not is_calibration_row(text):
                 texts.append(text)
                 labels.append(label)
     return texts, labels
 
 
-def train() -> None:
-    base_dir = Path(__file__).resolve().parents[1]
-    dataset_path = base_dir / "data" / "emails_seed.csv"
-    model_path = base_dir / "models" / "baseline.joblib"
-
+def train(dataset_path: Path, model_path: Path) -> None:
     texts, labels = load_dataset(dataset_path)
     if len(texts) < 10:
         raise RuntimeError("Dataset pequeno demais")
@@ -53,5 +73,202 @@ def train() -> None:
     print("Model saved to", model_path)
 
 
+def iter_chunks(
+    path: Path, chunk_size: int, preprocess: bool = False
+) -> Iterator[tuple[list[str], list[str]]]:
+    """Stream ``(texts, labels)`` chunks without loading the whole CSV."""
+    texts: list[str] = []
+    labels: list[str] = []
+    with path.open("r", encoding="utf-8", newline="") as handle:
+        for row in csv.DictReader(handle):
+            text = (row.get("text") or "").strip()
+            label = (row.get("label") or "").strip()
+            if not text or label not in CLASSES or is_calibration_row(text):
+                continue
+            texts.append(preprocess_text(text).clean_text if preprocess else text)
+            labels.append(label)
+            if len(texts) >= chunk_size:
+                yield texts, labels
+                texts, labels = [], []
+    if texts:
+        yield texts, labels
+
+
+def fold_of(text: str, folds: int) -> int:
+    return zlib.crc32(text.encode("utf-8")) % folds
+
+
+def _fit_streaming(
+    path: Path,
+    alphas: list[float],
+    chunk_size: int,
+    epochs: int,
+    preprocess: bool,
+    skip_fold: Optional[int] = None,
+    folds: int = 1,
+):
+    # Every alpha shares each transformed chunk, so the text is featurized
+    # once per pass regardless of how many candidates are trained.
+    vectorizer = make_vectorizer()
+    classifiers = [make_classifier().set_params(alpha=alpha) for alpha in alphas]
+    shuffler = random.Random(42)
+    seen = 0
+    for _ in range(epochs):
+        for texts, labels in iter_chunks(path, chunk_size, preprocess):
+            if skip_fold is not None:
+                kept = [
+                    (text, label)
+                    for text, label in zip(texts, labels)
+                    if fold_of(text, folds) != skip_fold
+                ]
+            else:
+                kept = list(zip(texts, labels))
+            if not kept:
+                continue
+            shuffler.shuffle(kept)
+            features = vectorizer.transform([text for text, _ in kept])
+            targets = [label for _, label in kept]
+            for classifier in classifiers:
+                classifier.partial_fit(features, targets, classes=CLASSES)
+            seen += len(kept)
+    return vectorizer, classifiers, seen
+
+
+def evaluate_fold(
+    path: Path,
+    alphas: list[float],
+    fold: int,
+    folds: int,
+    chunk_size: int,
+    epochs: int,
+    preprocess: bool,
+) -> tuple[int, list[float], int, int]:
+    vectorizer, classifiers, seen = _fit_streaming(
+        path, alphas, chunk_size, epochs, preprocess, skip_fold=fold, folds=folds
+    )
+    correct = [0] * len(classifiers)
+    total = 0
+    for texts, labels in iter_chunks(path, chunk_size, preprocess):
+        held = [
+            (text, label)
+            for text, label in zip(texts, labels)
+            if fold_of(text, folds) == fold
+        ]
+        if not held or not seen:
+            continue
+        features = vectorizer.transform([text for text, _ in held])
+        for index, classifier in enumerate(classifiers):
+            preds = classifier.predict(features)
+            correct[index] += sum(
+                pred == label for pred, (_, label) in zip(preds, held)
+            )
+        total += len(held)
+    accuracies = [count / total if total else 0.0 for count in correct]
+    return fold, accuracies, total, peak_rss_kb()
+
+
+def peak_rss_kb() -> int:
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def train_streaming(
+    dataset_path: Path,
+    model_path: Path,
+    chunk_size: int,
+    folds: int,
+    alphas: list[float],
+    jobs: int,
+    epochs: int,
+    preprocess: bool,
+) -> None:
+    started = time.perf_counter()
+    results = joblib.Parallel(n_jobs=jobs)(
+        joblib.delayed(evaluate_fold)(
+            dataset_path, alphas, fold, folds, chunk_size, epochs, preprocess
+        )
+        for fold in range(folds)
+    )
+    cv_seconds = time.perf_counter() - started
+
+    scores: dict[float, list[float]] = {alpha: [] for alpha in alphas}
+    worker_peak_kb = 0
+    for fold, accuracies, total, peak_kb in results:
+        worker_peak_kb = max(worker_peak_kb, peak_kb)
+        for alpha, accuracy in zip(alphas, accuracies):
+            scores[alpha].append(accuracy)
+            print(f"alpha={alpha:g} fold={fold} accuracy={accuracy:.4f} n={total}")
+    best_alpha = max(alphas, key=lambda alpha: sum(scores[alpha]) / folds)
+    best_score = sum(scores[best_alpha]) / folds
+    print(f"Best alpha={best_alpha:g} mean accuracy={best_score:.4f}")
+
+    fit_started = time.perf_counter()
+    vectorizer, classifiers, seen = _fit_streaming(
+        dataset_path, [best_alpha], chunk_size, epochs, preprocess
+    )
+    if not seen:
+        raise RuntimeError("Dataset sem linhas rotuladas")
+    fit_seconds = time.perf_counter() - fit_started
+
+    pipeline = Pipeline([("hash", vectorizer), ("clf", classifiers[0])])
+    model_path.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(pipeline, model_path)
+    print("Model saved to", model_path)
+    print(
+        f"Wall time: cv={cv_seconds:.2f}s final_fit={fit_seconds:.2f}s "
+        f"total={time.perf_counter() - started:.2f}s rows={seen}"
+    )
+    if resource is None:
+        print("Peak memory: n/a")
+    else:
+        print(
+            f"Peak memory: main={peak_rss_kb() / 1024:.1f}MB "
+            f"cv_worker={worker_peak_kb / 1024:.1f}MB"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Treina o baseline")
+    parser.add_argument(
+        "--dataset", type=Path, default=BASE_DIR / "data" / "emails_seed.csv"
+    )
+    parser.add_argument(
+        "--output", type=Path, default=BASE_DIR / "models" / "baseline.joblib"
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="treino out-of-core com HashingVectorizer + SGD (datasets grandes)",
+    )
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--folds", type=int, default=3)
+    parser.add_argument("--alphas", default="1e-6,1e-5,1e-4")
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--jobs", type=int, default=-1, help="-1 usa todos os cores")
+    parser.add_argument(
+        "--raw",
+        action="store_true",
+        help="treina no texto bruto; por padrao o modo streaming aplica "
+        "preprocess_text, o mesmo texto que o servico e o learner usam",
+    )
+    args = parser.parse_args()
+
+    if not args.streaming:
+        train(args.dataset, args.output)
+        return
+    train_streaming(
+        args.dataset,
+        args.output,
+        chunk_size=args.chunk_size,
+        folds=max(2, args.folds),
+        alphas=[float(value) for value in args.alphas.split(",") if value.strip()],
+        jobs=args.jobs,
+        epochs=max(1, args.epochs),
+        preprocess=not args.raw,
+    )
+
+
 if __name__ == "__main__":
-    train()
+    main()
@@ -0,0 +1,89 @@
+import csv
+import io
+import json
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.services.analysis_store import AnalysisRecord, AnalysisStore
+from main import app
+
+
+def _record(index: int, category: str = "Produtivo", source: str = "llm"):
+    return AnalysisRecord(
+        timestamp=f"2026-03-{index % 28 + 1:02d}T10:00:00",
+        email_hash=f"hash-{index % 5}",
+        category=category,
+        confidence=0.8,
+        source=source,
+        needs_human_review=index % 2 == 0,
+        baseline_prob=None,
+        result=json.dumps({"category": category, "summary": f"Resumo {index}"}),
+    )
+
+
+def test_history_pages_through_filtered_rows(tmp_path) -> None:
+    store = AnalysisStore(tmp_path / "analysis.db")
+    store.write_many(
+        [
+            _record(index, "Improdutivo" if index % 3 == 0 else "Produtivo")
+            for index in range(25)
+        ]
+    )
+
+    ids = [record_id for record_id, _ in store.iter_records(page_size=4)]
+    assert ids == list(range(1, 26))
+    improdutivo = list(store.iter_records(category="Improdutivo", page_size=2))
+    assert len(improdutivo) == 9
+    assert all(record.category == "Improdutivo" for _, record in improdutivo)
+    assert list(store.iter_records(source="baseline")) == []
+
+    record_id, record = store.latest("hash-3")
+    assert record_id == 24
+    assert record.needs_human_review is False
+
+
+def test_results_endpoints(monkeypatch, tmp_path) -> None:
+    store = AnalysisStore(tmp_path / "analysis.db")
+    store.write_many([_record(index) for index in range(3)])
+    monkeypatch.setattr("app.routes.results.get_analysis_store", lambda: store)
+    client = TestClient(app)
+    monkeypatch.setattr(settings, "results_export_token", "")
+    assert client.get("/api/results/hash-1").status_code == 404
+    monkeypatch.setattr(settings, "results_export_token", "segredo")
+    refused = client.get("/api/results/hash-1")
+    assert refused.status_code == 401
+    assert refused.headers["cache-control"] == "no-store"
+    client.headers["Authorization"] = "Bearer segredo"
+
+    response = client.get("/api/results/hash-1")
+    assert response.status_code == 200
+    assert response.json()["result"]["summary"] == "Resumo 1"
+    assert response.headers["cache-control"] == "private, no-cache"
+    etag = response.headers["etag"]
+    assert (
+        client.get("/api/results/hash-1", headers={"If-None-Match": etag}).status_code
+        == 304
+    )
+    missing = client.get("/api/results/missing")
+    assert missing.status_code == 404
+    assert missing.headers["cache-control"] == "no-store"
+
+    monkeypatch.setattr(settings, "results_export_token", "")
+    assert client.get("/api/results/export").status_code == 404
+    monkeypatch.setattr(settings, "results_export_token", "segredo")
+    assert (
+        client.get("/api/results/export", headers={"Authorization": ""}).status_code
+        == 401
+    )
+
+    auth = {"Authorization": "Bearer segredo"}
+    lines = client.get("/api/results/export", headers=auth).text.splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [1, 2, 3]
+    rows = list(
+        csv.reader(
+            io.StringIO(client.get("/api/results/export?format=csv", headers=auth).text)
+        )
+    )
+    assert rows[0][:3] == ["id", "timestamp", "email_hash"]
+    assert len(rows) == 4
@@ -0,0 +1,119 @@
+from app.services.analyzer_service import AnalyzerService
+from app.services.baseline_service import BaselineService
+from app.services.calibration import calibrate, fit_thresholds
+
+
+def test_fit_thresholds_picks_lowest_cut_meeting_precision() -> None:
+    samples = [
+        ("Produtivo", 0.99, True),
+        ("Produtivo", 0.95, True),
+        ("Produtivo", 0.90, True),
+        ("Produtivo", 0.80, False),
+        ("Produtivo", 0.70, True),
+        ("Produtivo", 0.60, False),
+        ("Improdutivo", 0.99, False),
+        ("Improdutivo", 0.90, True),
+    ]
+    config = fit_thresholds(samples, precision_target=0.75, min_samples=2)
+    assert config["thresholds"]["Produtivo"] == 0.70
+    assert config["thresholds"]["Improdutivo"] is None
+    assert config["offload_rate"] == 5 / 8
+    points = config["calibration"]["Produtivo"]
+    assert calibrate(points, 0.99) >= calibrate(points, 0.6)
+
+
+def test_baseline_uses_per_category_thresholds(tmp_path, monkeypatch) -> None:
+    path = tmp_path / "thresholds.json"
+    path.write_text(
+        '{"thresholds": {"Produtivo": 0.6, "Improdutivo": null}}', encoding="utf-8"
+    )
+    monkeypatch.setattr("app.config.settings.baseline_thresholds_path", str(path))
+    baseline = BaselineService()
+    assert baseline.is_confident("Produtivo", 0.65)
+    assert not baseline.is_confident("Improdutivo", 0.99)
+    assert baseline.calibrated("Produtivo", 0.65) == 0.65
+
+
+def test_confident_baseline_answers_without_llm() -> None:
+    class Baseline:
+        def predict(self, text_clean):
+            return ("Improdutivo", 0.97) if "natal" in text_clean else None
+
+        def is_confident(self, label, prob):
+            return prob >= 0.9
+
+        def calibrated(self, label, prob):
+            return 0.93
+
+    class NoLLM:
+        def classify_text(self, email_original, email_clean):
+            raise AssertionError("LLM called for a confident baseline")
+
+    analyzer = AnalyzerService()
+    analyzer.baseline_service, analyzer.llm_service = Baseline(), NoLLM()
+    result, source, prob = analyzer._baseline_with_llm("Feliz natal!", "feliz natal")
+    assert (source, prob, result.category) == ("baseline", 0.97, "Improdutivo")
+    assert result.confidence == 0.93
+
+
+def test_replay_feedback_uses_stored_features(tmp_path, monkeypatch) -> None:
+    from sklearn.pipeline import Pipeline
+
+    from app.services.feedback_store import FeedbackRow, FeedbackStore
+    from app.services.incremental_learner import (
+        CLASSES,
+        make_classifier,
+        make_vectorizer,
+        to_blobs,
+    )
+    from scripts import calibrate_baseline
+
+    vectorizer = make_vectorizer()
+    texts = ["preciso status chamado urgente", "obrigado feliz natal"]
+    classifier = make_classifier().partial_fit(
+        vectorizer.transform(texts), ["Produtivo", "Improdutivo"], classes=CLASSES
+    )
+    baseline = BaselineService()
+    baseline.swap_model(Pipeline([("hash", vectorizer), ("clf", classifier)]))
+
+    store = FeedbackStore(tmp_path / "feedback.db")
+    features = vectorizer.transform(texts)
+    store.put_features(
+        [
+            ("hash-a", *to_blobs(features[0]), "Produtivo"),
+            ("hash-b", *to_blobs(features[1]), None),
+        ]
+    )
+    store.write_many(
+        [
+            FeedbackRow.now("hash-a", "Produtivo"),
+            FeedbackRow.now("hash-b", "Improdutivo"),
+            FeedbackRow.now("hash-c", "Produtivo"),
+        ]
+    )
+    monkeypatch.setattr(calibrate_baseline, "get_feedback_store", lambda: store)
+
+    samples = calibrate_baseline.replay_feedback(baseline)
+    assert [(label, ok) for label, _, ok in samples] == [
+        ("Produtivo", True),
+        ("Improdutivo", True),
+    ]
+
+
+def test_swapped_model_drops_calibrated_thresholds(tmp_path, monkeypatch) -> None:
+    path = tmp_path / "thresholds.json"
+    path.write_text(
+        '{"thresholds": {"Produtivo": 0.6}, '
+        '"calibration": {"Produtivo": {"x": [0.0, 1.0], "y": [0.2, 0.3]}}}',
+        encoding="utf-8",
+    )
+    monkeypatch.setattr("app.config.settings.baseline_thresholds_path", str(path))
+    monkeypatch.setattr("app.config.settings.baseline_threshold", 0.85)
+    baseline = BaselineService()
+    assert baseline.is_confident("Produtivo", 0.65)
+    assert baseline.calibrated("Produtivo", 0.5) == 0.25
+
+    baseline.swap_model(None)
+    assert not baseline.is_confident("Produtivo", 0.65)
+    assert baseline.is_confident("Produtivo", 0.9)
+    assert baseline.calibrated("Produtivo", 0.5) == 0.5
@@ -0,0 +1,132 @@
+import pytest
+
+from app.clients.gemini_client import LLMServiceError
+from app.schemas.triage import EmailTriageResult
+from app.services.cascade import Cascade, Tier, parse_tier
+from app.utils.metrics import metrics
+
+
+class FakeBaseline:
+    def __init__(self, prediction):
+        self.prediction = prediction
+
+    def predict(self, text_clean):
+        return self.prediction
+
+    def is_confident(self, label, prob):
+        return prob >= 0.85
+
+    def calibrated(self, label, prob):
+        return prob
+
+
+class FakeLLM:
+    def __init__(self, answers):
+        self.answers = answers
+        self.calls = []
+
+    def classify_text(self, email_original, email_clean, model=None):
+        return self.classify_and_reply(email_original, email_clean, model)
+
+    def classify_and_reply(self, email_original, email_clean, model=None):
+        self.calls.append(model)
+        answer = self.answers[model]
+        if isinstance(answer, Exception):
+            raise answer
+        confidence, review = answer
+        return EmailTriageResult(
+            category="Produtivo",
+            confidence=confidence,
+            summary=f"por {model}",
+            suggested_reply="Vamos verificar.",
+            tags=["status", "pedido", "cliente"],
+            needs_human_review=review,
+            reasons=["Pede status", "Requer acao"],
+        )
+
+
+def _cascade(prediction, answers, specs):
+    baseline, llm = FakeBaseline(prediction), FakeLLM(answers)
+    tiers = [parse_tier(spec, baseline, llm) for spec in specs]
+    return Cascade(tiers), llm
+
+
+SPECS = ["baseline", "llm/cheap:0.8:1", "llm/strong::10"]
+
+
+def test_confident_baseline_skips_llm() -> None:
+    cascade, llm = _cascade(("Improdutivo", 0.97), {}, SPECS)
+    outcome, tier = cascade.run("Feliz natal a todos!", "feliz natal")
+    assert tier.name == "baseline"
+    assert llm.calls == []
+    assert outcome.result.category == "Improdutivo"
+    assert outcome.baseline_prob == 0.97
+    assert not outcome.result.needs_human_review
+
+
+def test_escalates_on_low_confidence_and_review_flag() -> None:
+    cascade, llm = _cascade(
+        ("Produtivo", 0.6), {"cheap": (0.95, True), "strong": (0.9, False)}, SPECS
+    )
+    outcome, tier = cascade.run("Status do pedido?", "status pedido")
+    assert tier.name == "llm:strong"
+    assert llm.calls == ["cheap", "strong"]
+    assert outcome.result.summary == "por strong"
+
+    cascade, llm = _cascade(("Produtivo", 0.6), {"cheap": (0.85, False)}, SPECS)
+    outcome, tier = cascade.run("Status do pedido?", "status pedido")
+    assert tier.name == "llm:cheap"
+    assert llm.calls == ["cheap"]
+
+
+def test_admission_is_asked_only_before_llm_tiers() -> None:
+    asked = []
+
+    def refuse():
+        asked.append(True)
+        return False
+
+    cascade, llm = _cascade(("Improdutivo", 0.97), {}, SPECS)
+    outcome, tier = cascade.run("Feliz natal!", "feliz natal", admit=refuse)
+    assert tier.name == "baseline" and asked == []
+
+    cascade, llm = _cascade(("Produtivo", 0.6), {"cheap": (0.95, False)}, SPECS)
+    assert cascade.run("Status do pedido?", "status pedido", admit=refuse) is None
+    assert asked == [True] and llm.calls == []
+
+
+def test_failing_tiers_fall_back_to_last_answer() -> None:
+    before = metrics.counter("cascade_llm:strong_errors")
+    cascade, llm = _cascade(
+        ("Produtivo", 0.6),
+        {"cheap": (0.5, False), "strong": LLMServiceError("timeout")},
+        SPECS,
+    )
+    outcome, tier = cascade.run("Status do pedido?", "status pedido")
+    assert tier.name == "llm:cheap"
+    assert outcome.result.needs_human_review
+    assert metrics.counter("cascade_llm:strong_errors") == before + 1
+
+    cascade, _ = _cascade(
+        None, {"strong": LLMServiceError("timeout")}, ["baseline", "llm/strong"]
+    )
+    with pytest.raises(LLMServiceError):
+        cascade.run("Status do pedido?", "status pedido")
+
+
+def test_report_and_parse() -> None:
+    cascade, _ = _cascade(("Improdutivo", 0.99), {}, ["baseline::0.5"])
+    cascade.run("Obrigado!", "obrigado")
+    report = cascade.report()["baseline"]
+    assert report["resolution_rate"] > 0
+    assert report["cost_per_call"] == 0.5
+    with pytest.raises(ValueError):
+        parse_tier("rules", None, None)
+
+
+def test_tier_without_run_cannot_be_built() -> None:
+    class Incomplete(Tier):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete("incompleto", None, 0.0)
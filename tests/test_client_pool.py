@@ -0,0 +1,61 @@
+import socket
+import threading
+import time
+
+import uvicorn
+
+from app.clients import gemini_client
+from app.clients.client_pool import GeminiClientPool
+from app.clients.llm_standin import create_app
+from app.config import settings
+
+
+def _serve_standin():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(
+            create_app(), host="127.0.0.1", port=port, log_level="warning", ws="none"
+        )
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread, f"http://127.0.0.1:{port}/"
+
+
+def test_pool_creates_one_client_under_concurrent_first_use() -> None:
+    pool = GeminiClientPool("key")
+    clients = []
+    threads = [
+        threading.Thread(target=lambda: clients.append(pool.get())) for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(client) for client in clients}) == 1
+    pool.close()
+    assert pool.stats()["open"] is False
+
+
+def test_pool_reuses_connections_against_standin(monkeypatch) -> None:
+    server, thread, base_url = _serve_standin()
+    pool = GeminiClientPool("key", base_url=base_url)
+    monkeypatch.setattr(settings, "gemini_api_key", "key")
+    monkeypatch.setattr(gemini_client, "get_client_pool", lambda: pool)
+    try:
+        assert pool.warm_up("gemini-standin")
+        for _ in range(3):
+            result = gemini_client.classify_and_reply("Qual o status?", "status")
+        assert result.summary == "Resposta do stand-in local do LLM."
+        stats = pool.stats()
+        assert stats["requests"] == 4
+        assert stats["connections_opened"] == 1
+        assert stats["reused"] == 3
+    finally:
+        pool.close()
+        server.should_exit = True
+        thread.join()
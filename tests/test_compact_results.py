@@ -0,0 +1,45 @@
+from app.schemas.triage import EmailTriageResult, TriageResult
+from app.services.analyzer_service import AnalysisOutput
+from app.utils.preprocessing import ProcessedText
+
+
+def _model() -> EmailTriageResult:
+    return EmailTriageResult(
+        category="Produtivo",
+        confidence=0.8,
+        summary="Pede status do contrato.",
+        suggested_reply="Ola! Vamos verificar.",
+        tags=["contrato", "status", "prazo"],
+        needs_human_review=False,
+        reasons=["Pede status", "Requer acao"],
+    )
+
+
+def test_processed_text_is_compact_and_dict_compatible() -> None:
+    processed = ProcessedText("contrat status venc", 42, 6)
+    assert not hasattr(processed, "__dict__")
+    assert processed.tokens == ["contrat", "status", "venc"]
+    assert processed["clean_text"] == "contrat status venc"
+    assert processed["stats"] == {"num_chars": 42, "num_words": 6}
+
+
+def test_analysis_output_holds_compact_result_until_response() -> None:
+    model = _model()
+    output = AnalysisOutput(
+        result=model,
+        source="llm",
+        email_hash="hash",
+        stats={"num_chars": 10, "num_words": 2},
+        baseline_prob=0.7,
+    )
+    assert isinstance(output.result, TriageResult)
+    assert not hasattr(output, "__dict__")
+    assert output.result.category == "Produtivo"
+
+    response = output.to_response()
+    assert response.result == model
+    assert response.model_dump(mode="json")["stats"] == output.stats
+    response.result.tags.append("extra")
+    response.stats["num_chars"] = 0
+    assert output.result.tags == ["contrato", "status", "prazo"]
+    assert output.stats["num_chars"] == 10
@@ -0,0 +1,39 @@
+import json
+
+from app.clients.gemini_client import _parse_json_response
+from app.schemas.triage import EmailTriageResult, TriageResponse
+from app.utils.fast_json import FastJSONResponse, extract_json_object
+
+PAYLOAD = {
+    "category": "Produtivo",
+    "confidence": 0.8,
+    "summary": " Pedido de status ",
+    "suggested_reply": "Vamos verificar.",
+    "tags": ["Status", "contrato", "prazo"],
+    "needs_human_review": False,
+    "reasons": ["Pede status", "Requer acao"],
+}
+
+
+def test_llm_reply_validated_from_fenced_text_and_bytes() -> None:
+    raw = json.dumps(PAYLOAD)
+    assert extract_json_object(raw) is raw
+    fenced = f"Claro! Segue:\n```json\n{raw}\n```"
+    assert extract_json_object(fenced) == raw
+    result = _parse_json_response(fenced)
+    assert result.summary == "Pedido de status"
+    assert result.tags[0] == "status"
+    assert _parse_json_response(fenced.encode()) == result
+
+
+def test_fast_json_response_matches_model_dump() -> None:
+    response = TriageResponse(
+        result=EmailTriageResult.model_validate(PAYLOAD),
+        source="llm",
+        email_hash="abc12345",
+        stats={"num_chars": 10},
+    )
+    assert json.loads(FastJSONResponse(response).body) == response.model_dump(
+        mode="json"
+    )
+    assert json.loads(FastJSONResponse({"status": "ok"}).body) == {"status": "ok"}
@@ -0,0 +1,47 @@
+import asyncio
+import csv
+import io
+
+from app.services.feedback_store import (
+    CSV_COLUMNS,
+    BufferedWriter,
+    FeedbackRow,
+    FeedbackStore,
+)
+
+
+def test_legacy_csv_imported_once_and_exported_with_same_columns(tmp_path) -> None:
+    legacy = tmp_path / "feedback.csv"
+    legacy.write_text(
+        ",".join(CSV_COLUMNS) + "\n2026-01-15T14:13:50,abcdef123456,Produtivo,,llm\n",
+        encoding="utf-8",
+    )
+    store = FeedbackStore(tmp_path / "feedback.db", legacy_csv=legacy)
+    FeedbackStore(tmp_path / "feedback.db", legacy_csv=legacy)
+
+    output = io.StringIO()
+    assert store.export_csv(output) == 1
+    rows = list(csv.reader(io.StringIO(output.getvalue())))
+    assert rows[0] == CSV_COLUMNS
+    assert rows[1] == ["2026-01-15T14:13:50", "abcdef123456", "Produtivo", "", "llm"]
+
+
+def test_buffered_writer_batches_until_flush(tmp_path) -> None:
+    store = FeedbackStore(tmp_path / "feedback.db")
+
+    async def scenario() -> None:
+        writer = BufferedWriter(store, batch_size=3, flush_interval=60)
+        writer.start()
+        await writer.add(FeedbackRow.now("hash-aaaa", "Produtivo"))
+        await writer.add(FeedbackRow.now("hash-bbbb", "Improdutivo"))
+        assert writer.pending == 2
+        assert store.by_email_hash("hash-aaaa") == []
+        await writer.add(FeedbackRow.now("hash-aaaa", "Improdutivo", "Produtivo"))
+        assert writer.pending == 0
+        await writer.add(FeedbackRow.now("hash-cccc", "Produtivo"))
+        await writer.stop()
+
+    asyncio.run(scenario())
+    labels = [row.correct_label for row in store.by_email_hash("hash-aaaa")]
+    assert labels == ["Produtivo", "Improdutivo"]
+    assert [row_id for row_id, _ in store.iter_since(3)] == [4]
@@ -0,0 +1,111 @@
+import numpy as np
+
+from app.config import settings
+from app.services.baseline_service import BaselineService
+from app.services.feedback_store import FeedbackRow, FeedbackStore
+from app.services.incremental_learner import IncrementalLearner
+
+PRODUTIVO = "preciso status chamado urgente contrato envio boleto"
+IMPRODUTIVO = "obrigado parabens feliz natal abraco equipe festa"
+
+
+class AlwaysProdutivo:
+    """Stands in for the shipped TF-IDF + LR pipeline."""
+
+    classes_ = np.array(["Improdutivo", "Produtivo"])
+
+    def predict_proba(self, texts):
+        return np.array([[0.2, 0.8]] * len(texts))
+
+
+def _feedback(learner, store, count=60):
+    rows = []
+    for index in range(count):
+        email_hash = f"hash-{index:04d}"
+        produtivo = index % 2 == 0
+        learner.remember(email_hash, PRODUTIVO if produtivo else IMPRODUTIVO)
+        label = "Produtivo" if produtivo else "Improdutivo"
+        rows.append(FeedbackRow.now(email_hash, label))
+    store.write_many(rows)
+
+
+def test_learner_trains_on_new_feedback_and_promotes(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "learner_min_holdout", 2)
+    monkeypatch.setattr(settings, "learner_min_accuracy", 0.5)
+    store = FeedbackStore(tmp_path / "feedback.db")
+    learner = IncrementalLearner(
+        store,
+        state_path=tmp_path / "state.joblib",
+        model_path=tmp_path / "baseline.joblib",
+    )
+    baseline = BaselineService()
+    baseline.swap_model(None)
+    learner.attach(baseline)
+
+    _feedback(learner, store)
+
+    result = learner.step()
+    assert result["rows"] == 60
+    assert result["trained"] + len(learner.holdout) == 60
+    assert result["promoted"] is True
+    assert baseline.predict("status do chamado urgente")[0] == "Produtivo"
+    assert (tmp_path / "baseline.joblib").exists()
+
+    assert learner.step()["rows"] == 0
+    resumed = IncrementalLearner(
+        store,
+        state_path=tmp_path / "state.joblib",
+        model_path=tmp_path / "baseline.joblib",
+    )
+    assert resumed.last_feedback_id == 60
+
+
+def test_first_promotion_must_beat_the_loaded_baseline(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "learner_min_holdout", 2)
+    monkeypatch.setattr(settings, "learner_min_accuracy", 0.5)
+    store = FeedbackStore(tmp_path / "feedback.db")
+    base_path = tmp_path / "baseline.joblib"
+    base_path.write_bytes(b"trained artifact")
+
+    def learner():
+        return IncrementalLearner(
+            store,
+            state_path=tmp_path / "state.joblib",
+            model_path=tmp_path / "incremental.joblib",
+            base_path=base_path,
+        )
+
+    # Baseline attached only after the emails were seen: nothing recorded
+    # to compare against, so the shipped model stays.
+    unscored = learner()
+    _feedback(unscored, store)
+    baseline = BaselineService()
+    baseline.swap_model(AlwaysProdutivo())
+    unscored.attach(baseline)
+    result = unscored.step()
+    assert result["promoted"] is False
+    assert isinstance(baseline.model, AlwaysProdutivo)
+
+    (tmp_path / "state.joblib").unlink()
+    store = FeedbackStore(tmp_path / "feedback2.db")
+    leader = learner()
+    leader.store = store
+    baseline = BaselineService()
+    baseline.swap_model(AlwaysProdutivo())
+    leader.attach(baseline)
+    _feedback(leader, store)
+    result = leader.tick()
+    assert result["served_accuracy"] < 1.0 <= result["candidate_accuracy"]
+    assert result["promoted"] is True
+    assert (tmp_path / "incremental.joblib").exists()
+    assert base_path.read_bytes() == b"trained artifact"
+
+    # A second process does not train; it loads what the leader promoted.
+    follower = learner()
+    follower.store = store
+    other = BaselineService()
+    other.swap_model(AlwaysProdutivo())
+    follower.attach(other)
+    assert follower.tick() is None
+    assert other.predict("status do chamado urgente")[0] == "Produtivo"
+    assert other.predict("feliz natal equipe")[0] == "Improdutivo"
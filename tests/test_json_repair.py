@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from app.clients.gemini_client import _parse_json_response
+from app.utils.json_repair import repair_triage_payload
+from app.utils.metrics import metrics
+
+
+def _reply(**overrides) -> str:
+    payload = {
+        "category": "Produtivo",
+        "confidence": 0.8,
+        "summary": "Pedido de status",
+        "suggested_reply": "Vamos verificar.",
+        "tags": ["status", "contrato", "prazo"],
+        "needs_human_review": False,
+        "reasons": ["Pede status", "Requer acao"],
+    }
+    payload.update(overrides)
+    return json.dumps(payload) + "\n\nEspero ter ajudado!"
+
+
+def test_near_miss_replies_are_repaired_locally() -> None:
+    before = metrics.counter("llm_json_repaired")
+    result = _parse_json_response(
+        _reply(
+            tags=[f"tag{index}" for index in range(9)],
+            reasons=["Pede status"],
+            summary="x" * 250,
+            confidence=1.3,
+        )
+    )
+    assert len(result.tags) == 8
+    assert result.reasons == [
+        "Pede status",
+        "Resposta do LLM ajustada automaticamente.",
+    ]
+    assert len(result.summary) == 200 and result.summary.endswith("...")
+    assert result.confidence == 1.0
+    assert result.needs_human_review is True
+    assert metrics.counter("llm_json_repaired") == before + 1
+    assert metrics.counter("llm_json_repaired_tags") >= 1
+
+
+def test_repair_reports_fields_and_rejects_unknown_category() -> None:
+    payload, repaired = repair_triage_payload(_reply(category="produtivo", tags="a, b"))
+    assert payload["category"] == "Produtivo"
+    assert payload["tags"] == ["a", "b", "produtivo"]
+    assert repaired == ["category", "tags"]
+
+    with pytest.raises(ValueError):
+        repair_triage_payload(_reply(category="Spam"))
+    with pytest.raises(ValueError):
+        _parse_json_response("sem json nenhum")
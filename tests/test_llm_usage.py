@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+
+from app.clients.gemini_client import _record_usage
+from app.services.llm_service import LLMService
+from app.utils import llm_usage
+from app.utils.hashing import hash_text
+from app.utils.llm_usage import LLMUsage, UsageLedger
+
+
+def test_ledger_attributes_usage_and_enforces_daily_budget() -> None:
+    day = ["2026-05-01"]
+    ledger = UsageLedger(daily_token_budget=100, max_clients=2, today=lambda: day[0])
+    call = LLMUsage(calls=1, prompt_tokens=60, response_tokens=20, latency=1.5)
+    ledger.record_call("gemini-flash", call)
+    assert not ledger.budget_exhausted()
+    ledger.record_call("gemini-flash", call)
+    assert ledger.budget_exhausted()
+
+    for client in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):
+        ledger.attribute("api", "llm", client, call)
+    ledger.attribute("page", "baseline", "10.0.0.3", LLMUsage())
+    report = ledger.report()
+    assert report["by_model"]["gemini-flash"]["calls"] == 2
+    assert report["by_route"]["api"]["prompt_tokens"] == 180
+    assert "page" not in report["by_route"]
+    assert len(report["by_client"]) == 2
+    assert "10.0.0.3" not in report["by_client"]
+    assert hash_text("10.0.0.3")[:12] not in report["by_client"]
+
+    day[0] = "2026-05-02"
+    assert not ledger.budget_exhausted()
+    assert ledger.report()["today"]["calls"] == 0
+
+
+def test_usage_reaches_the_analysis_tally_across_threads(monkeypatch) -> None:
+    def fake_client(email_original, email_clean, model=None):
+        response = SimpleNamespace(
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=120, candidates_token_count=None
+            )
+        )
+        _record_usage("gemini-test", response, 0.25)
+        return "ok"
+
+    monkeypatch.setattr("app.services.llm_service.classify_and_reply", fake_client)
+    with llm_usage.tally() as usage:
+        assert LLMService().classify_and_reply("email", "email") == "ok"
+    assert (usage.calls, usage.prompt_tokens, usage.response_tokens) == (1, 120, 0)
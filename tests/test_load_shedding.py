@@ -0,0 +1,91 @@
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.services.analyzer_service import AnalyzerService
+from app.services.load_shedding import OverloadController
+from main import app
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _slow_call(controller: OverloadController, clock: Clock, seconds: float) -> None:
+    with controller.track():
+        clock.now += seconds
+
+
+def test_slow_llm_sheds_then_recovers_gradually() -> None:
+    clock = Clock()
+    controller = OverloadController(
+        latency_threshold=2.0, max_in_flight=4, window_seconds=10.0, clock=clock
+    )
+    _slow_call(controller, clock, 5.0)
+    assert controller.admit_ratio == 0.5 and controller.level == 1
+    _slow_call(controller, clock, 1.0)  # mean still above the threshold
+    assert controller.admit_ratio == 0.25
+    for _ in range(2):
+        _slow_call(controller, clock, 3.0)
+    assert controller.admit_ratio == 0.0 and controller.level == 2
+    assert controller.admit() is False
+
+    ratios = []
+    for _ in range(5):
+        clock.now += 10.0
+        controller.admit()
+        ratios.append(controller.admit_ratio)
+    assert ratios == [0.25, 0.5, 0.75, 1.0, 1.0]
+    assert controller.report()["state"] == "normal"
+
+
+def test_backlog_of_calls_sheds() -> None:
+    clock = Clock()
+    controller = OverloadController(
+        latency_threshold=2.0, max_in_flight=1, window_seconds=10.0, clock=clock
+    )
+    with controller.track():
+        controller.admit()
+        assert controller.admit_ratio == 0.5
+        assert controller.report()["in_flight"] == 1
+
+
+def test_shed_analysis_serves_baseline_only(monkeypatch) -> None:
+    class Closed:
+        level = 2
+
+        def admit(self) -> bool:
+            return False
+
+    monkeypatch.setattr(
+        "app.services.analyzer_service.get_overload_controller", lambda: Closed()
+    )
+    monkeypatch.setattr(settings, "load_shedding_enabled", True)
+    analyzer = AnalyzerService()
+    analyzer.baseline_service.model = None
+    result, source, baseline_prob = analyzer._classify("Qual o status?", "status")
+    assert source == "degraded"
+    assert result.needs_human_review is True
+    assert result.category == "Produtivo"
+    assert baseline_prob is None
+
+    class Confident:
+        def predict(self, text_clean):
+            return ("Improdutivo", 0.97)
+
+        def is_confident(self, label, prob):
+            return True
+
+        def calibrated(self, label, prob):
+            return prob
+
+    # A confident baseline never needed the LLM, so shedding leaves it alone.
+    analyzer.baseline_service = Confident()
+    result, source, baseline_prob = analyzer._classify("Feliz natal!", "feliz natal")
+    assert (source, result.needs_human_review) == ("baseline", False)
+
+    response = TestClient(app).get("/health")
+    assert response.headers["x-degradation-level"] in {"0", "1", "2"}
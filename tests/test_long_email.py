@@ -0,0 +1,134 @@
+import threading
+import time
+
+import pytest
+
+from app.clients.gemini_client import LLMServiceError
+from app.config import settings
+from app.schemas.triage import EmailTriageResult
+from app.services import long_email
+from app.services.long_email import chunk_paragraphs, classify_long, merge_results
+from app.utils.metrics import metrics
+from app.utils.preprocessing import ProcessedText
+
+
+def _result(category: str, confidence: float, summary: str) -> EmailTriageResult:
+    return EmailTriageResult(
+        category=category,
+        confidence=confidence,
+        summary=summary,
+        suggested_reply=f"Resposta {summary}",
+        tags=["contrato", "anexo", summary.lower()],
+        needs_human_review=False,
+        reasons=[f"Motivo {summary}", "Requer leitura"],
+    )
+
+
+class FakeLLM:
+    def __init__(self, fail_merge: bool = False, flag_chunk: int = 0) -> None:
+        self.fail_merge = fail_merge
+        self.flag_chunk = flag_chunk
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+        self.prompts = []
+
+    def classify_and_reply(self, email_original, email_clean, model=None):
+        with self.lock:
+            self.prompts.append(email_original)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            if email_original.startswith("Email longo"):
+                if self.fail_merge:
+                    raise LLMServiceError("merge down")
+                return _result("Produtivo", 0.9, "Final")
+            time.sleep(0.02)
+            result = _result("Produtivo", 0.8, f"P{len(self.prompts)}")
+            if email_original.startswith(f"[Parte {self.flag_chunk} "):
+                result.needs_human_review = True
+            return result
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def test_chunks_respect_paragraphs_and_limit() -> None:
+    text = "\n\n".join(f"Paragrafo {i} " + "x" * 50 for i in range(10))
+    chunks = chunk_paragraphs(text, 200)
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    assert "\n\n".join(chunks) == text
+    assert chunk_paragraphs("y" * 450, 200) == ["y" * 200, "y" * 200, "y" * 50]
+
+
+def test_classify_long_maps_concurrently_and_merges(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "long_email_chunk_chars", 1000)
+    monkeypatch.setattr(settings, "llm_max_concurrency", 3)
+    monkeypatch.setattr(
+        long_email,
+        "preprocess_text",
+        lambda text: ProcessedText(text.lower(), len(text), 0),
+    )
+    llm = FakeLLM()
+    text = "\n\n".join("Clausula " + "z" * 900 for _ in range(6))
+    before = metrics.counter("long_email_chunks")
+
+    result = classify_long(llm, text)
+    assert result.summary == "Final"
+    assert not result.needs_human_review
+    assert result.confidence == pytest.approx(0.8)
+    assert len(llm.prompts) == 7
+    assert 1 < llm.peak <= 3
+    assert metrics.counter("long_email_chunks") - before == 6
+    assert llm.prompts[-1].count("Parte ") >= 6
+
+
+def test_merge_fallback_is_deterministic(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "long_email_chunk_chars", 1000)
+    monkeypatch.setattr(
+        long_email,
+        "preprocess_text",
+        lambda text: ProcessedText(text.lower(), len(text), 0),
+    )
+    text = "\n\n".join("Clausula " + "z" * 900 for _ in range(3))
+    result = classify_long(FakeLLM(fail_merge=True), text)
+    assert result.category == "Produtivo"
+    assert len(result.tags) <= 8
+
+    merged = merge_results(
+        [_result("Produtivo", 0.9, "A"), _result("Improdutivo", 0.6, "B")]
+    )
+    assert merged.category == "Produtivo"
+    assert merged.needs_human_review
+
+
+def test_llm_merge_keeps_chunk_review_flags(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "long_email_chunk_chars", 1000)
+    monkeypatch.setattr(
+        long_email,
+        "preprocess_text",
+        lambda text: ProcessedText(text.lower(), len(text), 0),
+    )
+    text = "\n\n".join("Clausula " + "z" * 900 for _ in range(3))
+    result = classify_long(FakeLLM(flag_chunk=2), text)
+    assert result.summary == "Final"
+    assert result.needs_human_review
+
+
+def test_chunks_past_the_limit_are_flagged_and_counted(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "long_email_chunk_chars", 1000)
+    monkeypatch.setattr(settings, "long_email_max_chunks", 2)
+    monkeypatch.setattr(
+        long_email,
+        "preprocess_text",
+        lambda text: ProcessedText(text.lower(), len(text), 0),
+    )
+    before = metrics.counter("long_email_chunks_dropped")
+    chars_before = metrics.counter("long_email_chars_dropped")
+    text = "\n\n".join("Clausula " + "z" * 900 for _ in range(3))
+    llm = FakeLLM()
+    result = classify_long(llm, text)
+    assert len(llm.prompts) == 3
+    assert result.needs_human_review
+    assert metrics.counter("long_email_chunks_dropped") - before == 1
+    assert metrics.counter("long_email_chars_dropped") - chars_before == 909
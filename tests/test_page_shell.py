@@ -0,0 +1,43 @@
+from fastapi.testclient import TestClient
+
+from app.routes.pages import page_shell
+from app.schemas.triage import EmailTriageResult, TriageResponse
+from main import app
+
+
+def test_index_is_gzipped_shell_with_fresh_token_and_nonce() -> None:
+    client = TestClient(app)
+    response = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert "__shell_" not in response.text
+    assert response.cookies.get("csrf_token") in response.text
+    assert 'id="server-result"' not in response.text
+
+    plain = client.get("/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+
+def test_shell_escapes_error_and_renders_result_card() -> None:
+    page = page_shell.render("tok", "non", error="<b>falhou</b>")
+    assert "&lt;b&gt;falhou&lt;/b&gt;" in page
+    assert 'value="tok"' in page and 'nonce="non"' in page
+
+    result = TriageResponse(
+        result=EmailTriageResult(
+            category="Improdutivo",
+            confidence=0.9,
+            summary="__shell_csrf_token__ no resumo",
+            suggested_reply="Obrigado!",
+            tags=["a", "b", "c"],
+            needs_human_review=False,
+            reasons=["x", "y"],
+        ),
+        source="llm",
+        email_hash="hash1234",
+        stats={},
+    )
+    page = page_shell.render("tok", "non", result=result)
+    assert 'data-email-hash="hash1234"' in page
+    assert "__shell_csrf_token__ no resumo" in page
+    assert page.count('value="tok"') == 1
@@ -0,0 +1,44 @@
+import pytest
+
+from app.utils.pdf_pool import PdfWorkerPool
+from app.utils.pdf_reader import PdfTextLimitError
+from tests.pdf_helpers import make_pdf
+
+
+@pytest.fixture
+def pool():
+    pool = PdfWorkerPool(size=2)
+    pool.start()
+    yield pool
+    pool.shutdown()
+
+
+def test_pool_extracts_pages_in_order(pool) -> None:
+    pdf = make_pdf(["Pagina um", "Pagina dois", "Pagina tres"])
+    extraction = pool.extract(pdf, max_pages=10, max_chars=1000, timeout=10)
+    assert extraction.page_count == 3
+    assert extraction.text.split("\n") == ["Pagina um", "Pagina dois", "Pagina tres"]
+    assert sorted(extraction.page_seconds) == [0, 1, 2]
+
+
+def test_pool_stops_at_char_limit(pool) -> None:
+    pdf = make_pdf(["a" * 40, "b" * 40, "c" * 40])
+    with pytest.raises(PdfTextLimitError):
+        pool.extract(pdf, max_pages=10, max_chars=50, timeout=10)
+    extraction = pool.extract(pdf, max_pages=10, max_chars=200, timeout=10)
+    assert extraction.page_count == 3
+
+
+def test_pool_timeout_replaces_worker(pool) -> None:
+    pdf = make_pdf(["Pagina um"])
+    before = {worker.process.pid for worker in pool._idle}
+    with pytest.raises(TimeoutError):
+        pool.extract(pdf, max_pages=10, max_chars=1000, timeout=0)
+    after = {worker.process.pid for worker in pool._idle}
+    assert len(after) == 2
+    assert before != after
+
+
+def test_pool_rejects_invalid_pdf(pool) -> None:
+    with pytest.raises(ValueError):
+        pool.extract(b"%PDF-1.4 broken", max_pages=10, max_chars=1000, timeout=10)
@@ -0,0 +1,78 @@
+from app.config import settings
+from app.services.analyzer_service import AnalyzerService
+from app.services.rules import Rule, RuleEngine, rules_path
+from app.utils.metrics import metrics
+
+
+def _engine(mode: str) -> RuleEngine:
+    return RuleEngine(
+        [
+            Rule(
+                id="test_thanks",
+                category="Improdutivo",
+                patterns=("obrigado", "muito obrigado"),
+                summary="Agradecimento.",
+                mode=mode,
+                max_chars=60,
+            ),
+            Rule(
+                id="test_ooo",
+                category="Improdutivo",
+                patterns=("out of office",),
+                summary="Ausencia.",
+                mode=mode,
+            ),
+        ],
+        exclude=["?", "preciso"],
+    )
+
+
+def test_rules_match_raw_text_with_limits_and_vetoes() -> None:
+    engine = _engine("enforce")
+    assert engine.match("Muito OBRIGADO pelo retorno!").id == "test_thanks"
+    assert engine.match("Automatic reply: Out of Office ate segunda").id == "test_ooo"
+    assert engine.match("Obrigado! Pode confirmar o status?") is None
+    assert engine.match("Obrigado, preciso do relatorio") is None
+    assert engine.match("obrigadoo") is None
+    assert engine.match("Obrigado. " + "x" * 80) is None
+    assert metrics.counter("rules_test_thanks_vetoed") >= 2
+    assert RuleEngine.load(rules_path()).rules
+
+
+def test_short_rule_hit_first_does_not_hide_a_longer_rule() -> None:
+    engine = RuleEngine(
+        [
+            Rule("greeting", "Improdutivo", ("bom dia",), "Saudacao.", "enforce", 120),
+            Rule("ooo", "Improdutivo", ("estou ausente",), "Ausencia.", "enforce", 800),
+        ]
+    )
+    body = (
+        "Estou ausente do escritorio ate o dia 20 com acesso limitado aos "
+        "emails. Retorno as mensagens assim que voltar. Em caso de assunto "
+        "comercial, procure a equipe de atendimento."
+    )
+    assert len("Bom dia! " + body) > 120
+    assert engine.match("Bom dia! " + body).id == "ooo"
+    assert engine.match(body + " Bom dia!").id == "ooo"
+    assert engine.match("Bom dia!").id == "greeting"
+
+
+def test_enforced_rule_skips_preprocessing_and_dry_run_measures(monkeypatch) -> None:
+    def fail(_text):
+        raise AssertionError("preprocess_text should not run")
+
+    monkeypatch.setattr("app.services.analyzer_service.preprocess_text", fail)
+    analyzer = AnalyzerService()
+    analyzer.rules = _engine("enforce")
+    output = analyzer.analyze("Muito obrigado!")
+    assert output.source == "rules"
+    assert output.result.category == "Improdutivo"
+    assert output.result.tags == ["improdutivo", "rules", "test_thanks"]
+
+    analyzer.rules = _engine("dry_run")
+    monkeypatch.setattr(settings, "thread_mode_enabled", False)
+    monkeypatch.setattr(analyzer, "_analyze", lambda email_hash, text: output)
+    before = metrics.counter("rules_test_thanks_agreed")
+    analyzer.analyze("Obrigado!")
+    assert metrics.counter("rules_test_thanks_agreed") == before + 1
+    assert analyzer.rules.report()["test_thanks"]["precision"] is not None
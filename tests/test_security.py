@@ -1,6 +1,9 @@
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
+from app.config import settings
 from app.schemas.triage import EmailTriageResult
+from app.security.headers import SecurityMiddleware
 from app.services.analyzer_service import AnalysisOutput
 from app.utils.rate_limit import RateLimiter
 from main import app
@@ -30,6 +33,36 @@ def test_security_headers_present() -> None:
     assert response.headers.get("Referrer-Policy") == "strict-origin-when-cross-origin"
 
 
+def test_csp_nonce_matches_rendered_page() -> None:
+    client = TestClient(app)
+    first = client.get("/")
+    second = client.get("/")
+    csp = first.headers["Content-Security-Policy"]
+    nonce = csp.split("'nonce-")[1].split("'")[0]
+    assert f'nonce="{nonce}"' in first.text
+    assert nonce not in second.headers["Content-Security-Policy"]
+    assert len(first.headers.get_list("Cache-Control")) == 1
+
+
+def test_https_redirect_carries_security_headers() -> None:
+    secured = FastAPI()
+
+    @secured.get("/ping")
+    async def ping() -> dict:
+        return {"ok": True}
+
+    secured.add_middleware(SecurityMiddleware, https_redirect=True, hsts=True)
+    client = TestClient(secured)
+    response = client.get("/ping", follow_redirects=False)
+    assert response.status_code == 307
+    assert response.headers["location"] == "https://testserver/ping"
+    assert response.headers["X-Frame-Options"] == "DENY"
+
+    response = client.get("/ping", headers={"X-Forwarded-Proto": "https"})
+    assert response.status_code == 200
+    assert "includeSubDomains" in response.headers["Strict-Transport-Security"]
+
+
 def test_upload_too_large() -> None:
     client = TestClient(app)
     token = _get_csrf_token(client)
@@ -99,3 +132,15 @@ def test_rate_limit_api(monkeypatch) -> None:
     response_block = client.post("/api/analyze", data=payload, headers=headers)
     assert response_ok.status_code in {200, 502, 429}
     assert response_block.status_code == 429
+
+
+def test_metrics_require_token(monkeypatch) -> None:
+    client = TestClient(app)
+    monkeypatch.setattr(settings, "metrics_token", "")
+    assert client.get("/metrics").status_code == 404
+    monkeypatch.setattr(settings, "metrics_token", "segredo")
+    assert client.get("/metrics").status_code == 401
+    wrong = {"Authorization": "Bearer outro"}
+    assert client.get("/metrics", headers=wrong).status_code == 401
+    right = {"Authorization": "Bearer segredo"}
+    assert "counters" in client.get("/metrics", headers=right).json()
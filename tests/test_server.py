@@ -0,0 +1,56 @@
+import os
+
+from app import server
+from app.config import settings
+
+
+def test_parse_smaps_rollup() -> None:
+    sample = (
+        "55d0c0000000-7ffd00000000 ---p 00000000 00:00 0  [rollup]\n"
+        "Rss:              147456 kB\n"
+        "Pss:               28160 kB\n"
+        "Shared_Clean:     138240 kB\n"
+        "Shared_Dirty:       4096 kB\n"
+        "Private_Clean:       512 kB\n"
+        "Private_Dirty:      4608 kB\n"
+        "Swap:                  0 kB\n"
+    )
+    usage = server.parse_smaps_rollup(sample)
+    assert usage["Rss"] == 147456 * 1024
+    assert "Swap" not in usage
+
+
+def test_memory_usage_and_worker_count(monkeypatch) -> None:
+    usage = server.memory_usage(os.getpid())
+    if usage:
+        assert usage["rss"] >= usage["private"] > 0
+    monkeypatch.setattr(settings, "server_workers", 3)
+    assert server.default_workers() == 3
+    monkeypatch.setattr(settings, "server_workers", 0)
+    assert server.default_workers() >= 1
+
+
+def test_quick_worker_exits_back_off_then_give_up(monkeypatch) -> None:
+    master = server.Master(app=None, sock=None, workers=1)
+    stopped = []
+    monkeypatch.setattr(master, "stop", lambda *_: stopped.append(True))
+    now = 1000.0
+    for pid in range(1, server.MAX_QUICK_EXITS):
+        master.children.append(pid)
+        master.spawned_at[pid] = now
+        master.reaped(pid, 256, now + 1)
+        assert master.respawn_at[-1] == now + 1 + server.respawn_delay(pid)
+    assert master.respawn_at[-1] > master.respawn_at[-2] and not stopped
+
+    # A worker that stayed up resets the count.
+    master.children.append(99)
+    master.spawned_at[99] = now
+    master.reaped(99, 0, now + server.QUICK_EXIT_SECONDS + 1)
+    assert master.quick_exits == 0
+
+    for pid in range(100, 100 + server.MAX_QUICK_EXITS):
+        master.children.append(pid)
+        master.spawned_at[pid] = now
+        master.reaped(pid, 256, now + 1)
+    assert master.failed and stopped
+    assert server.respawn_delay(50) == server.MAX_RESPAWN_DELAY
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from app.utils.metrics import metrics
+from app.utils.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution() -> None:
+    flights = SingleFlight("test_coalesced")
+    calls = []
+
+    async def work() -> dict:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"value": 42}
+
+    async def main():
+        return await asyncio.gather(*(flights.do("key", work) for _ in range(5)))
+
+    before = metrics.counter("test_coalesced")
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(result == {"value": 42} for result in results)
+    assert metrics.counter("test_coalesced") - before == 4
+    assert len(flights) == 0
+
+
+def test_errors_reach_every_waiter_and_are_not_cached() -> None:
+    flights = SingleFlight("test_coalesced")
+    calls = []
+
+    async def failing() -> None:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("llm down")
+
+    async def main():
+        results = await asyncio.gather(
+            *(flights.do("key", failing) for _ in range(3)), return_exceptions=True
+        )
+        assert all(isinstance(result, RuntimeError) for result in results)
+        with pytest.raises(RuntimeError):
+            await flights.do("key", failing)
+
+    asyncio.run(main())
+    assert len(calls) == 2
+
+
+def test_cancelled_waiter_does_not_cancel_others() -> None:
+    flights = SingleFlight("test_coalesced")
+    started = []
+
+    async def work() -> str:
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(flights.do("key", work))
+        second = asyncio.ensure_future(flights.do("key", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+    asyncio.run(main())
+    assert len(started) == 1
+
+
+def test_last_waiter_leaving_cancels_the_call() -> None:
+    flights = SingleFlight("test_coalesced")
+    finished = []
+
+    async def work() -> None:
+        await asyncio.sleep(1)
+        finished.append(1)
+
+    async def main():
+        waiter = asyncio.ensure_future(flights.do("key", work))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.sleep(0.01)
+        assert len(flights) == 0
+
+    asyncio.run(main())
+    assert finished == []
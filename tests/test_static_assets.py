@@ -0,0 +1,41 @@
+import gzip
+
+from fastapi.testclient import TestClient
+
+from app.utils.static_assets import FingerprintedStaticFiles
+from main import app
+
+
+def test_page_references_fingerprinted_assets() -> None:
+    client = TestClient(app)
+    page = client.get("/")
+    assert page.headers["Cache-Control"] == "no-store"
+    assert "/static/css/styles.css" not in page.text
+    fingerprinted = None
+    for line in page.text.splitlines():
+        if "stylesheet" in line and "/static/css/styles." in line:
+            fingerprinted = line.split('href="')[1].split('"')[0]
+    assert fingerprinted
+
+    response = client.get(fingerprinted, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Pragma" not in response.headers
+
+    etag = response.headers["ETag"]
+    cached = client.get(
+        fingerprinted, headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+    )
+    assert cached.status_code == 304
+
+
+def test_plain_name_revalidates_and_identity_matches(tmp_path) -> None:
+    body = b"body { color: red; }\n" * 40
+    (tmp_path / "site.css").write_bytes(body)
+    static = FingerprintedStaticFiles(directory=str(tmp_path))
+    asset, immutable = static.assets["site.css"]
+    assert not immutable
+    assert gzip.decompress(asset.variants["gzip"]) == body
+    assert static.url("site.css") == f"/static/site.{asset.digest}.css"
+    assert static.url("missing.js") == "/static/missing.js"
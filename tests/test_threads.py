@@ -0,0 +1,81 @@
+from app.config import settings
+from app.schemas.triage import EmailTriageResult
+from app.services.analysis_store import AnalysisStore
+from app.services.analyzer_service import AnalyzerService
+from app.utils.preprocessing import ProcessedText
+from app.utils.threads import message_hash, split_thread
+
+THREAD = """Oi Ana, segue o contrato revisado.
+Pode confirmar ate sexta?
+
+Em seg., 3 de jun. de 2024 10:00, Joao <joao@x.com> escreveu:
+> Ola, qual o status do contrato 4587?
+> Preciso disso hoje.
+"""
+
+OUTLOOK = """Aprovado, pode seguir.
+
+-----Original Message-----
+From: Ana
+Sent: Monday
+Subject: Orcamento
+
+Segue o orcamento para aprovacao.
+"""
+
+
+def test_split_thread_newest_first() -> None:
+    assert split_thread(THREAD) == [
+        "Oi Ana, segue o contrato revisado.\nPode confirmar ate sexta?",
+        "Ola, qual o status do contrato 4587?\nPreciso disso hoje.",
+    ]
+    assert split_thread(OUTLOOK) == [
+        "Aprovado, pode seguir.",
+        "Segue o orcamento para aprovacao.",
+    ]
+    assert split_thread("Email simples") == ["Email simples"]
+    assert message_hash("a  b\nc") == message_hash("a b c")
+
+
+def test_thread_mode_sends_only_new_message(monkeypatch, tmp_path) -> None:
+    store = AnalysisStore(tmp_path / "analysis.db")
+    prompts = []
+
+    def fake_classify(self, email_original, email_clean):
+        prompts.append(email_original)
+        return EmailTriageResult(
+            category="Produtivo",
+            confidence=0.9,
+            summary=f"Resumo {len(prompts)}",
+            suggested_reply="Vamos verificar.",
+            tags=["contrato", "status", "prazo"],
+            needs_human_review=False,
+            reasons=["Pede status", "Requer acao"],
+        )
+
+    monkeypatch.setattr(settings, "thread_mode_enabled", True)
+    monkeypatch.setattr(
+        "app.services.analyzer_service.get_analysis_store", lambda: store
+    )
+    monkeypatch.setattr(
+        "app.services.analyzer_service.preprocess_text",
+        lambda text: ProcessedText(text.lower(), len(text), len(text.split())),
+    )
+    monkeypatch.setattr(
+        "app.services.llm_service.LLMService.classify_and_reply", fake_classify
+    )
+    analyzer = AnalyzerService()
+    analyzer.baseline_service.model = None
+
+    older = "Ola, qual o status do contrato 4587?\nPreciso disso hoje."
+    analyzer.analyze(older)
+    first = analyzer.analyze(THREAD)
+    assert first.stats["thread_messages"] == 2
+    assert prompts[-1].startswith("Oi Ana, segue o contrato revisado.")
+    assert "Resumo 1" in prompts[-1]
+    assert "contrato 4587" not in prompts[-1]
+
+    repeated = analyzer.analyze(THREAD + "\n")
+    assert len(prompts) == 2
+    assert repeated.result.summary == first.result.summary
+    assert repeated.email_hash != first.email_hash
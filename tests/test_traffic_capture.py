@@ -0,0 +1,72 @@
+import base64
+import json
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.utils.traffic_capture import (
+    CSRF_PLACEHOLDER,
+    CaptureWriter,
+    TrafficCaptureMiddleware,
+    annotate_capture,
+)
+
+
+def _make_app(writer: CaptureWriter, capture_bodies: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/api/analyze")
+    async def analyze(request: Request) -> dict:
+        await request.body()
+        annotate_capture(request, email_hash="abc123", input_type="text")
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health() -> dict:
+        return {"status": "ok"}
+
+    app.add_middleware(
+        TrafficCaptureMiddleware,
+        writer=writer,
+        capture_bodies=capture_bodies,
+        max_body_bytes=1024,
+    )
+    return app
+
+
+def _records(writer: CaptureWriter) -> list:
+    writer.close()
+    with writer.path.open(encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle]
+
+
+def test_capture_records_anonymized_descriptor(tmp_path) -> None:
+    writer = CaptureWriter(tmp_path / "capture.jsonl")
+    client = TestClient(_make_app(writer, capture_bodies=False))
+    client.get("/health")
+    client.post(
+        "/api/analyze",
+        data={"text_input": "Email secreto"},
+        headers={"X-Forwarded-For": "203.0.113.9"},
+    )
+
+    records = _records(writer)
+    assert len(records) == 1
+    record = records[0]
+    assert record["path"] == "/api/analyze"
+    assert record["status"] == 200
+    assert record["email_hash"] == "abc123"
+    assert record["body_bytes"] > 0
+    assert "body" not in record
+    assert "203.0.113.9" not in json.dumps(record)
+
+
+def test_capture_bodies_replaces_csrf_token(tmp_path) -> None:
+    writer = CaptureWriter(tmp_path / "capture.jsonl")
+    client = TestClient(_make_app(writer, capture_bodies=True))
+    client.cookies.set("csrf_token", "tok-123")
+    client.post("/api/analyze", data={"text_input": "Oi", "csrf_token": "tok-123"})
+
+    body = base64.b64decode(_records(writer)[0]["body"])
+    assert b"tok-123" not in body
+    assert CSRF_PLACEHOLDER in body
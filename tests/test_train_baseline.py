@@ -0,0 +1,62 @@
+import csv
+
+import joblib
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from app.services.calibration import is_calibration_row
+from scripts import train_baseline
+
+PRODUTIVO = "preciso do status do chamado {} com urgencia"
+IMPRODUTIVO = "obrigado pela festa de natal {} abracos"
+
+
+def _dataset(path, count=60):
+    rows = [
+        (
+            (IMPRODUTIVO.format(index), "Improdutivo")
+            if index % 2
+            else (PRODUTIVO.format(index), "Produtivo")
+        )
+        for index in range(count)
+    ]
+    with path.open("w", encoding="utf-8", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["text", "label"])
+        writer.writerows(rows)
+        writer.writerow(["sem rotulo", ""])
+    return rows
+
+
+def test_iter_chunks_streams_training_rows(tmp_path) -> None:
+    path = tmp_path / "emails.csv"
+    rows = _dataset(path)
+    chunks = list(train_baseline.iter_chunks(path, chunk_size=7))
+    texts = [text for chunk, _ in chunks for text in chunk]
+    assert all(len(chunk) == 7 for chunk, _ in chunks[:-1])
+    assert 0 < len(chunks[-1][0]) <= 7
+    assert texts == [text for text, _ in rows if not is_calibration_row(text)]
+
+
+def test_train_streaming_saves_hashing_pipeline(tmp_path) -> None:
+    path, output = tmp_path / "emails.csv", tmp_path / "model.joblib"
+    _dataset(path)
+    fold, accuracies, total, _peak = train_baseline.evaluate_fold(
+        path, [1e-5, 1e-4], fold=0, folds=2, chunk_size=7, epochs=2, preprocess=False
+    )
+    assert fold == 0 and total > 0 and len(accuracies) == 2
+
+    train_baseline.train_streaming(
+        path,
+        output,
+        chunk_size=7,
+        folds=2,
+        alphas=[1e-5, 1e-4],
+        jobs=1,
+        epochs=2,
+        preprocess=False,
+    )
+    pipeline = joblib.load(output)
+    assert [name for name, _ in pipeline.steps] == ["hash", "clf"]
+    assert isinstance(pipeline.steps[0][1], HashingVectorizer)
+    assert list(pipeline.classes_) == ["Improdutivo", "Produtivo"]
+    assert pipeline.predict(["status do chamado com urgencia"])[0] == "Produtivo"
@@ -0,0 +1,78 @@
+import tempfile
+
+import anyio
+import pytest
+from starlette.datastructures import UploadFile
+
+from app.security.exceptions import PayloadTooLargeError, UploadValidationError
+from app.security.upload_guard import _decode_text, extract_text_from_upload
+
+
+def _upload(filename: str, payload: bytes, max_size: int = 1024) -> UploadFile:
+    spooled = tempfile.SpooledTemporaryFile(max_size=max_size)
+    spooled.write(payload)
+    spooled.seek(0)
+    return UploadFile(file=spooled, filename=filename)
+
+
+def test_decode_text_falls_back_to_latin1() -> None:
+    assert _decode_text("Olá, reunião".encode("latin-1")) == "Olá, reunião"
+
+
+def test_decode_text_rejects_nul_and_binary() -> None:
+    with pytest.raises(UploadValidationError):
+        _decode_text(b"texto\x00oculto")
+    with pytest.raises(UploadValidationError):
+        _decode_text(bytes(range(1, 32)) * 10)
+
+
+@pytest.mark.parametrize("max_size", [1024 * 1024, 16])
+def test_upload_reads_memory_and_disk_spools(max_size: int) -> None:
+    upload = _upload("email.txt", b"Bom dia,\n  status do pedido?", max_size)
+    text, filename = anyio.run(extract_text_from_upload, upload)
+    assert text == "Bom dia, status do pedido?"
+    assert filename == "email.txt"
+    upload.file.close()
+
+
+def test_upload_over_limit_rejected(monkeypatch) -> None:
+    monkeypatch.setattr("app.security.upload_guard.MAX_FILE_BYTES", 8)
+    upload = _upload("email.txt", b"conteudo longo demais", max_size=4)
+    with pytest.raises(PayloadTooLargeError):
+        anyio.run(extract_text_from_upload, upload)
+
+
+def test_repeat_pdf_upload_served_from_cache(monkeypatch) -> None:
+    from app.security import upload_guard
+    from app.utils.extraction_cache import ExtractionCache
+
+    cache = ExtractionCache(max_bytes=1024)
+    monkeypatch.setattr(upload_guard, "extraction_cache", cache)
+    calls = []
+
+    async def fake_read_pdf(file_bytes) -> str:
+        calls.append(len(file_bytes))
+        return "Fatura   de marco"
+
+    monkeypatch.setattr(upload_guard, "_read_pdf_with_timeout", fake_read_pdf)
+    payload = b"%PDF-1.4 fatura"
+    for _ in range(3):
+        text, _ = anyio.run(extract_text_from_upload, _upload("fatura.pdf", payload))
+        assert text == "Fatura de marco"
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["bytes_saved"] == 2 * len(payload)
+
+
+def test_extraction_cache_evicts_lru_and_persists(tmp_path) -> None:
+    from app.utils.extraction_cache import ExtractionCache
+
+    cache = ExtractionCache(max_bytes=10, directory=tmp_path, max_disk_bytes=1024)
+    cache.put("a", "12345")
+    cache.put("b", "12345")
+    cache.get("a", 1)
+    cache.put("c", "12345")
+    assert cache.stats()["entries"] == 2
+    reloaded = ExtractionCache(max_bytes=10, directory=tmp_path, max_disk_bytes=1024)
+    assert reloaded.get("b", 1) == "12345"
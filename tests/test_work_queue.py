@@ -0,0 +1,101 @@
+import json
+import threading
+import time
+
+import pytest
+
+from app.services.work_queue import SQLiteWorkQueue, open_work_queue
+from app.worker import Deferred, Worker, read_tasks
+
+
+def test_claims_are_leased_retried_and_fenced(tmp_path) -> None:
+    queue = SQLiteWorkQueue(tmp_path / "queue.db", max_attempts=2)
+    assert queue.enqueue([("a", "texto a"), ("b", "texto b"), ("c", "texto c")]) == 3
+
+    first = queue.claim(2, lease_seconds=60)
+    assert [task.ref for task in first] == ["a", "b"]
+    assert [task.ref for task in queue.claim(5, lease_seconds=60)] == ["c"]
+    assert queue.claim(5, lease_seconds=60) == []
+
+    assert queue.complete(first[0], '{"ok": true}')
+    assert not queue.complete(first[0], '{"ok": true}')
+    assert queue.fail(first[1], "erro", retry_seconds=0)
+    assert queue.stats() == {"queued": 1, "leased": 1, "done": 1, "failed": 0}
+
+    # An expired lease hands the task to the next claim; the old holder is
+    # fenced off.
+    retried = queue.claim(5, lease_seconds=0)
+    assert [(task.ref, task.attempts) for task in retried] == [("b", 2)]
+    again = queue.claim(5, lease_seconds=60)
+    assert again == []
+    assert queue.stats()["failed"] == 1
+    assert not queue.complete(retried[0], "{}")
+    assert queue.results() == [(1, "a", '{"ok": true}')]
+
+
+def test_workers_share_a_queue_without_duplicates(tmp_path) -> None:
+    queue = SQLiteWorkQueue(tmp_path / "queue.db")
+    queue.enqueue((str(index), f"email {index}") for index in range(40))
+    seen = []
+    lock = threading.Lock()
+    attempts = {}
+
+    def handler(task):
+        with lock:
+            attempts[task.ref] = attempts.get(task.ref, 0) + 1
+            if task.ref == "7" and attempts[task.ref] == 1:
+                raise RuntimeError("falha transitoria")
+            seen.append(task.ref)
+        time.sleep(0.005)
+        return json.dumps({"text": task.payload})
+
+    workers = [
+        Worker(queue, handler, concurrency=3, retry_seconds=0, poll_seconds=0.01)
+        for _ in range(2)
+    ]
+    threads = [
+        threading.Thread(target=worker.run, kwargs={"exit_when_idle": True})
+        for worker in workers
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert sorted(seen, key=int) == [str(index) for index in range(40)]
+    assert attempts["7"] == 2
+    assert queue.stats() == {"queued": 0, "leased": 0, "done": 40, "failed": 0}
+    assert sum(worker.completed for worker in workers) == 40
+
+
+def test_deferred_tasks_do_not_use_attempts(tmp_path) -> None:
+    queue = SQLiteWorkQueue(tmp_path / "queue.db", max_attempts=2)
+    queue.enqueue([("a", "texto a")])
+    calls = []
+
+    def handler(task):
+        calls.append(task.attempts)
+        if len(calls) < 4:
+            raise Deferred("LLM indisponivel")
+        return "{}"
+
+    worker = Worker(queue, handler, concurrency=1, retry_seconds=0, poll_seconds=0)
+    for _ in range(4):
+        worker.run(max_tasks=1)
+    assert calls == [1, 1, 1, 1]
+    assert (worker.deferred, worker.completed) == (3, 1)
+    assert queue.stats()["done"] == 1
+
+
+def test_open_work_queue_and_read_tasks(tmp_path) -> None:
+    queue = open_work_queue(f"sqlite:///{tmp_path / 'queue.db'}")
+    assert isinstance(queue, SQLiteWorkQueue)
+    assert queue.path == tmp_path / "queue.db"
+    shared = open_work_queue(f"sqlite:///{tmp_path / 'shared.db'}?journal=delete")
+    assert shared.enqueue([("1", "Ola")]) == 1
+    assert not (tmp_path / "shared.db-wal").exists()
+    with pytest.raises(ValueError):
+        open_work_queue("redis://localhost:6379/0")
+
+    lines = ['{"ref": "x1", "text": "Ola"}', "", '{"text": "Bom dia"}']
+    assert list(read_tasks(lines)) == [("x1", "Ola"), ("3", "Bom dia")]